@@ -0,0 +1,915 @@
+"""Analytics engine shared by the dashboard (app.py) and the EDA notebook.
+
+Loading, KPIs and chart specs live here rather than in the Streamlit script,
+so a notebook session computes exactly what the dashboard shows and reuses
+its machinery: the same typed `DataSource` (see data_sources.py) under the
+same memory budget, aggregates memoised per source and persisted in the
+shared disk cache, and figures built through the same `FigureCache`.  A
+notebook whose working directory and environment match the dashboard's
+reads the aggregates and figures the dashboard's workers already computed:
+
+    import analytics
+    source = analytics.open_dataset()
+    analytics.kpi_table(source)
+    analytics.fuel_by_tire_chart(source, percentage=False).figure
+
+KPI functions return lists of `Metric` (the arguments of ``st.metric``) and
+chart functions return a `Chart`: the figure, plus the columns a click on
+one of its bars drills down into.  Layout and widgets stay in app.py.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import plotly.express
+import plotly.graph_objects as go
+
+from data_sources import DEFAULT_CSV, open_source, spill_to_sqlite, use_disk_cache
+from diagnostics import TARGET
+from disk_cache import DiskCache, user_cache_dir
+from figure_cache import FigureCache
+from instrumentation import span
+from memory_governor import MB, MemoryGovernor
+from risk import BAND_WIDTH, HIGH_RISK_SCORE
+
+# --- Configuration, read from the same environment variables by every process ---
+# CSV path, partition directory, .db/.sqlite file or sqlite:///path URI (see data_sources.py)
+DATA_SOURCE = os.environ.get("EDA_DATA_SOURCE", DEFAULT_CSV)
+# Aggregation engine for file-based sources: "pandas" or "arrow" (pyarrow.compute)
+EDA_ENGINE = os.environ.get("EDA_ENGINE", "pandas")
+
+# Per-process memory budget (0 disables) and what to do with a CSV that would not fit:
+# "aggregate" spills it to SQLite, "sample" loads a random fraction of its rows
+MEMORY_BUDGET_MB = int(os.environ.get("EDA_MEMORY_BUDGET_MB", "2048"))
+OVER_BUDGET_MODE = os.environ.get("EDA_OVER_BUDGET_MODE", "aggregate")
+
+# Disk cache of aggregates and figures shared by the processes on this host (0 MB disables it)
+# (a per-user directory; an existing one must belong to this user and have mode 0700)
+DISK_CACHE_DIR = os.environ.get("EDA_DISK_CACHE_DIR", user_cache_dir("results"))
+DISK_CACHE_MB = int(os.environ.get("EDA_DISK_CACHE_MB", "512"))
+
+# px.* figures are memoised on their inputs and timed
+figure_cache = FigureCache()
+px = figure_cache.wrap(plotly.express)
+
+Metric = namedtuple("Metric", "label value delta delta_color", defaults=(None, "normal"))
+Chart = namedtuple("Chart", "figure drill", defaults=(None,))
+
+
+# =============================== #
+# Loading
+# =============================== #
+def open_disk_cache(directory=DISK_CACHE_DIR, max_mb=DISK_CACHE_MB):
+    """Persist aggregates and figures of this process in the shared disk cache; None when disabled."""
+    if not max_mb:
+        return None
+    cache = DiskCache(directory, max_mb * MB)
+    use_disk_cache(cache)
+    figure_cache.disk = cache
+    return cache
+
+
+def make_governor(budget_mb=MEMORY_BUDGET_MB, over_budget=OVER_BUDGET_MODE):
+    governor = MemoryGovernor(budget_mb * MB, over_budget=over_budget)
+    governor.register_cache(figure_cache)
+    return governor
+
+
+def load(uri, engine, governor):
+    """Open `uri` in the load mode `governor` plans for it: in full, sampled or as an SQLite snapshot."""
+    with span("dataset_load", uri):
+        load_mode, sample = governor.plan_load(uri)
+        if load_mode == "aggregate-only":
+            data = open_source(spill_to_sqlite(uri))
+        else:
+            data = open_source(uri, engine, sample=sample)
+        data.load_mode = load_mode
+    return data
+
+
+def open_dataset(uri=DATA_SOURCE, engine=EDA_ENGINE):
+    """Load a dataset as the dashboard does, for notebooks and scripts.
+
+    The disk cache is enabled first, so aggregates and figures already
+    computed by the dashboard (or an earlier session) are read, not redone.
+    """
+    open_disk_cache()
+    governor = make_governor()
+    source = load(uri, engine, governor)
+    governor.enforce(source)
+    return source
+
+
+def _percent(part, whole):
+    return round((part / whole) * 100, 2)
+
+
+# =============================== #
+# KPIs
+# =============================== #
+def vehicle_category_kpis(source):
+    return [
+        Metric("Total Vehicle Models", source.stat('Vehicle_Model', 'nunique')),
+        Metric("Total Vehicles", source.stat('Vehicle_Model', 'count')),
+        Metric("Most Common Model", source.stat('Vehicle_Model', 'mode') or "N/A"),
+        Metric("Average Mileage", round(source.stat('Mileage', 'mean'), 2) if 'Mileage' in source.columns else "N/A"),
+        Metric(
+            "Average Reported Issues",
+            round(source.stat('Reported_Issues', 'mean'), 2) if 'Reported_Issues' in source.columns else "N/A"
+        ),
+    ]
+
+
+def maintenance_kpis(source):
+    row_count = source.row_count()
+    return [
+        Metric("% Needing Maintenance", f"{_percent(source.stat('Need_Maintenance', 'sum'), row_count)}%"),
+        Metric("Bad Tire Condition (%)", f"{_percent(source.row_count([('Tire_Condition', '==', 'Worn Out')]), row_count)}%"),
+        Metric("Poor Brake Condition (%)", f"{_percent(source.row_count([('Brake_Condition', '==', 'Worn Out')]), row_count)}%"),
+        Metric("Weak Battery (%)", f"{_percent(source.row_count([('Battery_Status', '==', 'Weak')]), row_count)}%"),
+        Metric("Avg Accident History", round(source.stat('Accident_History', 'mean'), 2)),
+    ]
+
+
+def fuel_engine_kpis(source):
+    mean_engine = source.stat('Engine_Size', 'mean')
+    return [
+        Metric("% High Engine Size", f"{_percent(source.row_count([('Engine_Size', '>', mean_engine)]), source.row_count())}"),
+        Metric("% Low Engine Size", f"{_percent(source.row_count([('Engine_Size', '<', mean_engine)]), source.row_count())}"),
+        Metric("STDEV of Odometer", f"{round(source.stat('Odometer_Reading', 'std'), 2) / 1000:.2f}K"),
+        Metric("STDEV of Fuel Efficiency", round(source.stat('Fuel_Efficiency', 'std'), 2)),
+    ]
+
+
+def issue_risk_kpis(source):
+    share = lambda where: round(source.row_count(where) / source.row_count(), 2)
+    return [
+        Metric("% Vehicles with Reported Issues", f"{share([('Reported_Issues', '>', 0)]) * 100:.2f}%"),
+        Metric("% Vehicles with Accident History", f"{share([('Accident_History', '>', 0)]) * 100:.2f}%"),
+        Metric(
+            "% Vehicles with Both Issues & Accidents",
+            f"{share([('Reported_Issues', '>', 0), ('Accident_History', '>', 0)]) * 100:.2f}%"
+        ),
+        Metric("STDEV of Fuel Efficiency", round(source.stat('Fuel_Efficiency', 'std'), 2)),
+    ]
+
+
+def risk_watchlist_kpis(source):
+    risk_bands = source.risk_bands()
+    scored_vehicles = int(risk_bands['Count'].sum())
+    high_risk = int(risk_bands['Count'].iloc[HIGH_RISK_SCORE // BAND_WIDTH:].sum())
+    return [
+        Metric("Vehicles Scored", scored_vehicles),
+        Metric(f"High Risk (score ≥ {HIGH_RISK_SCORE})", high_risk),
+        Metric("% High Risk", f"{(high_risk / scored_vehicles * 100 if scored_vehicles else 0):.2f}%"),
+    ]
+
+
+def descriptive_kpis(source):
+    return [
+        Metric("Total Vehicles", source.stat('Vehicle_Model', 'nunique')),
+        Metric("Average Fuel Efficiency", round(source.stat('Fuel_Efficiency', 'mean'), 3)),
+        Metric("Average Accident History", round(source.stat('Accident_History', 'mean'), 3)),
+        Metric("Average Mileage", round(source.stat('Mileage', 'mean'), 3)),
+        Metric("Average Reported Issues", round(source.stat('Reported_Issues', 'mean'), 3)),
+    ]
+
+
+def diagnostic_kpis(source):
+    vehicle_count = source.row_count()
+    maintenance_rate = round((source.row_count([('Need_Maintenance', '==', 'Yes')]) / vehicle_count) * 100, 3)
+    recurrent_issue_rate = round((source.row_count([('Reported_Issues', '>', 1)]) / vehicle_count) * 100, 3)
+    return [
+        Metric("Vehicle Count", vehicle_count),
+        Metric("MTBF (km)", round(source.stat('Mean_Time_Between_Failures', 'mean'), 2)),
+        Metric("% Maintenance Rate", f"{maintenance_rate}%"),
+        Metric("Avg Mileage", round(source.stat('Mileage', 'mean'), 2)),
+        Metric("% Recurrent Issues", f"{recurrent_issue_rate}%"),
+    ]
+
+
+def data_quality_kpis(source):
+    quality = source.quality()  # scanned at ingest, before numeric columns were coerced
+    column_issues = quality.columns()
+    clean_rows = round((1 - quality.incomplete_rows / quality.rows) * 100, 3) if quality.rows else 0.0
+    return [
+        Metric("Rows Scanned", quality.rows),
+        Metric("% Clean Rows", f"{clean_rows}%"),  # no missing, non-numeric or out-of-range value
+        Metric("Missing Values", int(column_issues['Missing'].sum())),
+        Metric("Non-numeric Values", int(column_issues['Not_Numeric'].sum())),
+        Metric("Out-of-range Values", int((column_issues['Below_Range'] + column_issues['Above_Range']).sum())),
+    ]
+
+
+def comparison_kpis(comparison):
+    """KPIs of a comparison.Comparison with their change; shown in whole numbers when both values are."""
+    metrics = []
+    for kpi in comparison.kpis.itertuples():
+        decimals = 0 if float(kpi.Current).is_integer() and float(kpi.Baseline).is_integer() else 2
+        metrics.append(Metric(
+            kpi.KPI, f"{kpi.Current:,.{decimals}f}", f"{kpi.Delta:+,.{decimals}f}",
+            "inverse" if kpi.Lower_Is_Better else "normal"
+        ))
+    return metrics
+
+
+# Analysis category -> its KPIs, in page order
+SECTION_KPIS = {
+    "Vehicle Category Analysis": vehicle_category_kpis,
+    "Maintenance and Condition Analysis": maintenance_kpis,
+    "Fuel and Engine Performance Analysis": fuel_engine_kpis,
+    "Reported Issue and Risk Analysis": issue_risk_kpis,
+    "Risk Watchlist": risk_watchlist_kpis,
+    "Descriptive Analysis": descriptive_kpis,
+    "Diagnostic Analysis": diagnostic_kpis,
+    "Data Quality": data_quality_kpis,
+}
+
+
+def kpi_table(source, sections=None):
+    """Frame of ``['Section', 'KPI', 'Value']`` for every section's KPIs, as the dashboard shows them."""
+    records = [
+        (section, metric.label, metric.value)
+        for section in sections or SECTION_KPIS
+        for metric in SECTION_KPIS[section](source)
+    ]
+    return pd.DataFrame(records, columns=['Section', 'KPI', 'Value'])
+
+
+# =============================== #
+# Chart helpers
+# =============================== #
+def _category_share(counts, column, label, percentage, pie_of_counts=False):
+    """Bar of counts per category, or a donut of their shares."""
+    if percentage:
+        if not pie_of_counts:
+            counts['Percentage'] = round((counts['Count'] / counts['Count'].sum()) * 100, 2)
+        fig = px.pie(
+            counts,
+            names=column,
+            values='Count' if pie_of_counts else 'Percentage',
+            title=f'{label} (Percentage)',
+            hole=0.4
+        )
+    else:
+        fig = px.bar(
+            counts,
+            x=column,
+            y='Count',
+            color=column,
+            title=f'{label} (Count)',
+            text='Count'
+        )
+    return Chart(fig, {'x': column})
+
+
+def _share_of_total(frame, names, value, percentage, pie_title, bar_title, color=None, hover='%{label}: %{percent:.3%}'):
+    """Bar of `value` per group, or a donut of each group's share of the total."""
+    frame[value] = frame[value].round(3)
+    if percentage:
+        total = frame[value].sum()
+        frame['Percentage'] = (frame[value] / total) * 100
+        frame['Percentage'] = frame['Percentage'].round(3)
+        fig = px.pie(
+            frame,
+            names=names,
+            values='Percentage',
+            hole=0.4,
+            title=pie_title
+        )
+        fig.update_traces(textinfo='label+percent', hovertemplate=hover)
+    else:
+        fig = px.bar(
+            frame,
+            x=names,
+            y=value,
+            color=color,
+            text=value,
+            title=bar_title
+        )
+        fig.update_traces(textangle=0)
+    return Chart(fig, {'x': names})
+
+
+def _label_bars_outside(fig):
+    for data in fig.data:
+        if isinstance(data, go.Bar):
+            data.update(text=data.y, textposition='outside')
+    return fig
+
+
+def _label_bars(fig):
+    for trace in fig.data:
+        trace.update(text=trace.y, textposition='outside', textangle=0, texttemplate='%{text:.3f}')
+    return fig
+
+
+# =============================== #
+# Vehicle Category Analysis
+# =============================== #
+def owner_type_chart(source, percentage):
+    return _category_share(source.value_counts('Owner_Type'), 'Owner_Type', 'Owner Type', percentage)
+
+
+def fuel_type_chart(source, percentage):
+    return _category_share(source.value_counts('Fuel_Type'), 'Fuel_Type', 'Fuel Type', percentage)
+
+
+def transmission_type_chart(source, percentage):
+    return _category_share(
+        source.value_counts('Transmission_Type'), 'Transmission_Type', 'Transmission Type', percentage
+    )
+
+
+def vehicle_model_chart(source, percentage):
+    return _category_share(source.value_counts('Vehicle_Model').head(10), 'Vehicle_Model', 'Vehicle Models', percentage)
+
+
+# =============================== #
+# Maintenance and Condition Analysis
+# =============================== #
+def maintenance_by_fuel_chart(source, percentage):
+    return _category_share(
+        source.value_counts('Fuel_Type'), 'Fuel_Type', 'Maintenance History by Fuel Type', percentage,
+        pie_of_counts=True
+    )
+
+
+def need_maintenance_chart(source, percentage):
+    return _category_share(
+        source.value_counts('Need_Maintenance'), 'Need_Maintenance', 'Vehicles Needing Maintenance', percentage,
+        pie_of_counts=True
+    )
+
+
+def condition_chart(source, column, label, percentage):
+    """Tire, brake or battery condition counts."""
+    return _category_share(source.value_counts(column), column, label, percentage, pie_of_counts=True)
+
+
+# =============================== #
+# Fuel and Engine Performance Analysis
+# =============================== #
+def fuel_by_tire_chart(source, percentage):
+    return _share_of_total(
+        source.group_agg('Tire_Condition', 'Fuel_Efficiency', 'mean'), 'Tire_Condition', 'Fuel_Efficiency', percentage,
+        'Fuel Efficiency by Tire Condition (%)', 'Fuel Efficiency by Tire Condition (Count)', color='Tire_Condition'
+    )
+
+
+def fuel_by_fuel_transmission_chart(source, percentage):
+    combo_df = source.group_agg(['Fuel_Type', 'Transmission_Type'], 'Fuel_Efficiency', 'mean')
+    combo_df['Fuel_Efficiency'] = combo_df['Fuel_Efficiency'].round(3)
+
+    if percentage:
+        total = combo_df['Fuel_Efficiency'].sum()
+        combo_df['Percentage'] = (combo_df['Fuel_Efficiency'] / total) * 100
+        combo_df['Percentage'] = combo_df['Percentage'].round(3)
+        combo_df['Label'] = combo_df['Fuel_Type'] + " - " + combo_df['Transmission_Type']
+
+        fig_combo = px.pie(
+            combo_df,
+            names='Label',
+            values='Percentage',
+            hole=0.4,
+            title='Fuel vs Transmission Type (%)'
+        )
+        fig_combo.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.3%}')
+    else:
+        fig_combo = px.bar(
+            combo_df,
+            x='Fuel_Type',
+            y='Fuel_Efficiency',
+            color='Transmission_Type',
+            barmode='group',
+            text='Fuel_Efficiency',
+            title='Fuel Type vs Transmission Type (Count)'
+        )
+        fig_combo.update_traces(textangle=0)
+    return Chart(fig_combo, {'x': 'Fuel_Type', 'legendgroup': 'Transmission_Type'})
+
+
+def fuel_by_engine_chart(source, percentage):
+    return _share_of_total(
+        source.group_agg('Engine_Size', 'Fuel_Efficiency', 'mean'), 'Engine_Size', 'Fuel_Efficiency', percentage,
+        'Fuel Efficiency by Engine Size (%)', 'Fuel Efficiency by Engine Size (Count)', color='Engine_Size'
+    )
+
+
+def premium_by_fuel_chart(source, percentage):
+    return _share_of_total(
+        source.group_agg('Fuel_Type', 'Insurance_Premium', 'mean'), 'Fuel_Type', 'Insurance_Premium', percentage,
+        'Insurance Premium by Fuel Type (%)', 'Insurance Premium by Fuel Type (Count)', color='Fuel_Type'
+    )
+
+
+# =============================== #
+# Reported Issue and Risk Analysis
+# =============================== #
+def premium_by_issues_chart(source, percentage):
+    return _share_of_total(
+        source.group_agg('Reported_Issues', 'Insurance_Premium', 'mean'), 'Reported_Issues', 'Insurance_Premium',
+        percentage, 'Avg Insurance Premium by Issue Count (%)', 'Avg Insurance Premium by Issue Count',
+        hover='%{label}: %{percent:.2f}%'
+    )
+
+
+def issues_by_model_chart(source, percentage):
+    return _share_of_total(
+        source.group_agg('Vehicle_Model', 'Reported_Issues', 'sum'), 'Vehicle_Model', 'Reported_Issues', percentage,
+        'Reported Issues by Vehicle Model (%)', 'Reported Issues by Vehicle Model', hover='%{label}: %{percent:.2f}%'
+    )
+
+
+def accidents_by_age_chart(source, percentage):
+    return _share_of_total(
+        source.group_agg('Vehicle_Age', 'Accident_History', 'mean'), 'Vehicle_Age', 'Accident_History', percentage,
+        'Average Accident History by Vehicle Age (%)', 'Average Accident History by Vehicle Age',
+        hover='%{label}: %{percent:.2f}%'
+    )
+
+
+def engine_size_chart(source, percentage):
+    return _share_of_total(
+        source.value_counts('Engine_Size'), 'Engine_Size', 'Count', percentage,
+        'Engine Size Distribution (%)', 'Engine Size Distribution', hover='%{label}: %{percent:.2f}%'
+    )
+
+
+def risk_band_chart(source, percentage):
+    risk_bands = source.risk_bands()
+    if percentage:
+        scored_vehicles = int(risk_bands['Count'].sum())
+        risk_bands['Percentage'] = round((risk_bands['Count'] / max(scored_vehicles, 1)) * 100, 3)
+        fig_risk = px.pie(
+            risk_bands,
+            names='Risk_Band',
+            values='Percentage',
+            hole=0.4,
+            title='Vehicles by Risk Score (%)'
+        )
+    else:
+        fig_risk = px.bar(
+            risk_bands,
+            x='Risk_Band',
+            y='Count',
+            text='Count',
+            title='Vehicles by Risk Score (Count)'
+        )
+        fig_risk.update_traces(textangle=0)
+    return Chart(fig_risk)
+
+
+# =============================== #
+# Descriptive Analysis
+# =============================== #
+def mileage_by_model_owner_chart(source, percentage):
+    mileage_summary = source.group_agg(['Vehicle_Model', 'Owner_Type'], 'Mileage', 'mean')
+    mileage_summary = mileage_summary.sort_values(by='Mileage', ascending=False)
+
+    if not percentage:
+        mileage_summary['Mileage'] = mileage_summary['Mileage'].round(3)
+        fig_mileage = px.bar(
+            mileage_summary,
+            x='Vehicle_Model',
+            y='Mileage',
+            color='Owner_Type',
+            title='Avg Mileage by Vehicle Model & Owner Type (Count)',
+            labels={'Mileage': 'Avg Mileage (km)', 'Vehicle_Model': 'Vehicle Model'},
+            hover_data=['Mileage']
+        )
+    else:
+        mileage_summary['Mileage_Percentage'] = (mileage_summary['Mileage'] / mileage_summary['Mileage'].max()) * 100
+        fig_mileage = px.pie(
+            mileage_summary,
+            names='Vehicle_Model',
+            values='Mileage_Percentage',
+            title='Mileage by Vehicle Model (Percentage)',
+            hole=0.4
+        )
+    return Chart(_label_bars_outside(fig_mileage), {'x': 'Vehicle_Model', 'legendgroup': 'Owner_Type'})
+
+
+def maintenance_frequency_chart(source, percentage):
+    maintenance_freq = source.group_size('Vehicle_Model', name='Maintenance_Count')
+    maintenance_freq = maintenance_freq.sort_values(by='Maintenance_Count', ascending=False)
+
+    if not percentage:
+        maintenance_freq['Maintenance_Count'] = maintenance_freq['Maintenance_Count'].round(3)
+        fig_maintenance = px.bar(
+            maintenance_freq.head(10),
+            x='Vehicle_Model',
+            y='Maintenance_Count',
+            title='Vehicle Models by Maintenance Count',
+            labels={'Maintenance_Count': 'Maintenance Count', 'Vehicle_Model': 'Vehicle Model'},
+            hover_data=['Maintenance_Count'],
+            color='Vehicle_Model'
+        )
+    else:
+        maintenance_freq['Maintenance_Percentage'] = round((maintenance_freq['Maintenance_Count'] / maintenance_freq['Maintenance_Count'].sum()) * 100, 3)
+        fig_maintenance = px.pie(
+            maintenance_freq.head(10),
+            names='Vehicle_Model',
+            values='Maintenance_Percentage',
+            title='Vehicle Models by Maintenance (%)',
+            hole=0.4
+        )
+    return Chart(_label_bars_outside(fig_maintenance), {'x': 'Vehicle_Model'})
+
+
+def accident_prone_chart(source, percentage):
+    accident_prone = source.group_agg('Vehicle_Model', 'Accident_History', 'mean').sort_values(by='Accident_History', ascending=False)
+
+    if percentage:
+        accident_prone['Accident_Percentage'] = round((accident_prone['Accident_History'] / accident_prone['Accident_History'].max()) * 100, 3)
+        fig_accident = px.pie(
+            accident_prone.head(10),
+            names='Vehicle_Model',
+            values='Accident_Percentage',
+            title='Vehcile Models by Accident History (%)',
+            hole=0.4
+        )
+    else:
+        accident_prone['Accident_History'] = accident_prone['Accident_History'].round(3)
+        fig_accident = px.bar(
+            accident_prone.head(10),
+            x='Vehicle_Model',
+            y='Accident_History',
+            title='Vehicle Models by Avg Accident History (Count)',
+            color='Vehicle_Model'
+        )
+    return Chart(_label_bars_outside(fig_accident), {'x': 'Vehicle_Model'})
+
+
+def age_maintenance_chart(source, percentage):
+    age_vs_maintenance = source.group_size('Vehicle_Age', name='Maintenance_Count').sort_values('Vehicle_Age')
+
+    if percentage:
+        age_vs_maintenance['Maintenance_Percentage'] = round((age_vs_maintenance['Maintenance_Count'] / age_vs_maintenance['Maintenance_Count'].max()) * 100, 3)
+        fig_age = px.pie(
+            age_vs_maintenance,
+            names='Vehicle_Age',
+            values='Maintenance_Percentage',
+            title='Maintenance by Age (Percentage)',
+            hole=0.4
+        )
+    else:
+        age_vs_maintenance['Maintenance_Count'] = age_vs_maintenance['Maintenance_Count'].round(3)
+        fig_age = px.bar(
+            age_vs_maintenance,
+            x='Vehicle_Age',
+            y='Maintenance_Count',
+            title='Maintenance Count by Age (Count)',
+            color='Vehicle_Age'
+        )
+    return Chart(_label_bars_outside(fig_age), {'x': 'Vehicle_Age'})
+
+
+def issue_pattern_chart(source, percentage):
+    issue_pattern = source.group_size(['Vehicle_Model', 'Reported_Issues'], name='Issue_Count')
+    top_models = issue_pattern.groupby('Vehicle_Model')['Issue_Count'].sum().sort_values(ascending=False).head(10).index
+    filtered_issue_pattern = issue_pattern[issue_pattern['Vehicle_Model'].isin(top_models)].copy()
+
+    if not percentage:
+        filtered_issue_pattern['Issue_Count'] = filtered_issue_pattern['Issue_Count'].round(3)
+        fig_issue = px.bar(
+            filtered_issue_pattern,
+            x='Vehicle_Model',
+            y='Issue_Count',
+            color='Reported_Issues',
+            title="Issue Pattern by Vehicle Model (Count)",
+            labels={'Issue_Count': 'Issue Count', 'Vehicle_Model': 'Vehicle Model'},
+            hover_data=['Issue_Count']
+        )
+    else:
+        filtered_issue_pattern['Issue_Percentage'] = round((filtered_issue_pattern['Issue_Count'] / filtered_issue_pattern['Issue_Count'].sum()) * 100, 3)
+        fig_issue = px.pie(
+            filtered_issue_pattern,
+            names='Vehicle_Model',
+            values='Issue_Percentage',
+            title="Issue Pattern by Vehicle Model (Percentage)",
+            hole=0.4
+        )
+    return Chart(_label_bars_outside(fig_issue), {'x': 'Vehicle_Model'})
+
+
+def part_condition_chart(source, column, label, percentage):
+    """Tire, brake or battery condition as in the part condition overview."""
+    condition_counts = source.value_counts(column)
+
+    if percentage:
+        condition_counts['Percentage'] = round((condition_counts['Count'] / condition_counts['Count'].sum()) * 100, 3)
+        fig_part = px.pie(
+            condition_counts,
+            names=column,
+            values='Percentage',
+            title=f'{label} (Percentage)',
+            hole=0.4
+        )
+    else:
+        condition_counts['Count'] = condition_counts['Count'].round(3)
+        fig_part = px.bar(
+            condition_counts,
+            x=column,
+            y='Count',
+            title=f'{label} (Count)',
+            color=column
+        )
+    return Chart(_label_bars_outside(fig_part), {'x': column})
+
+
+# =============================== #
+# Diagnostic Analysis
+# =============================== #
+def premium_by_history_chart(source, percentage):
+    premium_df = source.group_agg('Maintenance_History', 'Insurance_Premium', 'mean')
+
+    if not percentage:
+        premium_df['Insurance_Premium'] = premium_df['Insurance_Premium'].round(3)
+        fig1 = px.bar(
+            premium_df,
+            x='Maintenance_History',
+            y='Insurance_Premium',
+            color='Maintenance_History',
+            title='Avg Insurance Premium by Maintenance History (Count)',
+            labels={'Insurance_Premium': 'Avg Premium', 'Maintenance_History': 'Maintenance History'},
+            hover_data=['Insurance_Premium']
+        )
+        return Chart(_label_bars(fig1), {'x': 'Maintenance_History'})
+    premium_df['Insurance_Premium_Percentage'] = (premium_df['Insurance_Premium'] / premium_df['Insurance_Premium'].max()) * 100
+    premium_df['Insurance_Premium_Percentage'] = premium_df['Insurance_Premium_Percentage'].round(3)
+    fig1_pie = px.pie(
+        premium_df,
+        names='Maintenance_History',
+        values='Insurance_Premium_Percentage',
+        title='Avg Insurance Premium by Maintenance History (Percentage)',
+        hole=0.4
+    )
+    fig1_pie.update_traces(textinfo='percent+label')
+    return Chart(fig1_pie)
+
+
+def reported_issues_chart(source, percentage):
+    issue_df = source.value_counts('Reported_Issues')
+
+    if not percentage:
+        issue_df['Count'] = issue_df['Count'].round(3)
+        fig2 = px.bar(
+            issue_df,
+            x='Reported_Issues',
+            y='Count',
+            title='Reported Issues Distribution (Count)',
+            labels={'Count': 'Reported Issues Count', 'Reported_Issues': 'Reported Issues'},
+            hover_data=['Count']
+        )
+        return Chart(_label_bars(fig2), {'x': 'Reported_Issues'})
+    issue_df['Percentage'] = (issue_df['Count'] / issue_df['Count'].sum()) * 100
+    issue_df['Percentage'] = issue_df['Percentage'].round(3)
+    fig2_pie = px.pie(
+        issue_df,
+        names='Reported_Issues',
+        values='Percentage',
+        title='Reported Issues Distribution (Percentage)',
+        hole=0.4,
+        color='Reported_Issues',
+        labels={'Percentage': 'Reported Issues (%)'}
+    )
+    fig2_pie.update_traces(textinfo='percent+label', pull=[0.1] * len(issue_df))
+    return Chart(fig2_pie)
+
+
+def diagnostic_mileage_chart(source, percentage):
+    mileage_df = source.group_agg(['Vehicle_Model', 'Owner_Type'], 'Mileage', 'mean')
+
+    if not percentage:
+        mileage_df['Mileage'] = mileage_df['Mileage'].round(3)
+        fig_mileage = px.bar(
+            mileage_df,
+            x='Vehicle_Model',
+            y='Mileage',
+            color='Owner_Type',
+            title='Avg Mileage by Vehicle Model & Owner Type (Count)',
+            labels={'Mileage': 'Avg Mileage (km)', 'Vehicle_Model': 'Vehicle Model'},
+            hover_data=['Mileage']
+        )
+        return Chart(_label_bars(fig_mileage), {'x': 'Vehicle_Model', 'legendgroup': 'Owner_Type'})
+    mileage_df['Mileage_Percentage'] = (mileage_df['Mileage'] / mileage_df['Mileage'].max()) * 100
+    mileage_df['Mileage_Percentage'] = mileage_df['Mileage_Percentage'].round(3)
+    fig_mileage_pie = px.pie(
+        mileage_df,
+        names='Vehicle_Model',
+        values='Mileage_Percentage',
+        title='Mileage by Vehicle Model (Percentage)',
+        hole=0.4
+    )
+    fig_mileage_pie.update_traces(textinfo='percent+label')
+    return Chart(fig_mileage_pie)
+
+
+def diagnostic_maintenance_chart(source, percentage):
+    maintenance_freq = source.group_size('Vehicle_Model', name='Maintenance_Count')
+    maintenance_freq = maintenance_freq.sort_values(by='Maintenance_Count', ascending=False)
+
+    if not percentage:
+        maintenance_freq['Maintenance_Count'] = maintenance_freq['Maintenance_Count'].round(3)
+        fig_maintenance = px.bar(
+            maintenance_freq.head(10),
+            x='Vehicle_Model',
+            y='Maintenance_Count',
+            title='Vehicle Models by Maintenance Count',
+            labels={'Maintenance_Count': 'Maintenance Count', 'Vehicle_Model': 'Vehicle Model'},
+            hover_data=['Maintenance_Count'],
+            color='Vehicle_Model'
+        )
+        return Chart(_label_bars(fig_maintenance), {'x': 'Vehicle_Model'})
+    maintenance_freq['Maintenance_Percentage'] = (maintenance_freq['Maintenance_Count'] / maintenance_freq['Maintenance_Count'].sum()) * 100
+    maintenance_freq['Maintenance_Percentage'] = maintenance_freq['Maintenance_Percentage'].round(3)
+    fig_maintenance_pie = px.pie(
+        maintenance_freq.head(10),
+        names='Vehicle_Model',
+        values='Maintenance_Percentage',
+        title='Vehicle Models by Maintenance (%)',
+        hole=0.4
+    )
+    fig_maintenance_pie.update_traces(textinfo='percent+label')
+    return Chart(fig_maintenance_pie)
+
+
+def fuel_triggers_chart(source, percentage):
+    fuel_df = source.group_agg(['Tire_Condition', 'Engine_Size'], 'Fuel_Efficiency', 'mean')
+
+    if not percentage:
+        fuel_df['Fuel_Efficiency'] = fuel_df['Fuel_Efficiency'].round(3)
+        fig3 = px.bar(
+            fuel_df,
+            x='Tire_Condition',
+            y='Fuel_Efficiency',
+            color='Engine_Size',
+            title='Fuel Efficiency by Tire Condition & Engine Size (Count)'
+        )
+        return Chart(_label_bars(fig3), {'x': 'Tire_Condition'})
+    fuel_df['Fuel_Efficiency_Percentage'] = (fuel_df['Fuel_Efficiency'] / fuel_df['Fuel_Efficiency'].max()) * 100
+    fuel_df['Fuel_Efficiency_Percentage'] = fuel_df['Fuel_Efficiency_Percentage'].round(3)
+    fig3_pie = px.pie(
+        fuel_df,
+        names='Tire_Condition',
+        values='Fuel_Efficiency_Percentage',
+        title='Fuel Efficiency by Tire Condition & Engine Size (Percentage)',
+        hole=0.4
+    )
+    fig3_pie.update_traces(textinfo='percent+label')
+    return Chart(fig3_pie)
+
+
+def drivers_chart(associations, percentage):
+    """Top associations with Need Maintenance (`diagnostics.Moments.association()`), as r or variance explained."""
+    drivers = associations.head(15).copy()
+    if not percentage:
+        drivers['Correlation'] = drivers['Correlation'].round(3)
+        fig_drivers = px.bar(
+            drivers.iloc[::-1],
+            x='Correlation',
+            y='Feature',
+            orientation='h',
+            text='Correlation',
+            title='Correlation with Need Maintenance'
+        )
+    else:
+        drivers['Variance_Explained'] = (drivers['Correlation'] ** 2 * 100).round(3)
+        fig_drivers = px.bar(
+            drivers.iloc[::-1],
+            x='Variance_Explained',
+            y='Feature',
+            orientation='h',
+            text='Variance_Explained',
+            title='Need Maintenance Variance Explained (%)'
+        )
+    fig_drivers.update_traces(textangle=0)
+    return Chart(fig_drivers)
+
+
+def driver_correlation_chart(moments, associations):
+    top_features = [f for f in [TARGET] + associations['Feature'].head(11).tolist() if f in moments.features]
+    fig_corr = px.imshow(
+        moments.correlation().loc[top_features, top_features].round(2),
+        text_auto=True,
+        color_continuous_scale='RdBu_r',
+        zmin=-1,
+        zmax=1,
+        title='Correlation of Top Drivers'
+    )
+    return Chart(fig_corr)
+
+
+# =============================== #
+# Data Quality
+# =============================== #
+def quality_issues_chart(quality, percentage):
+    """Missing, non-numeric and out-of-range values per column; None when there are none."""
+    issue_counts = quality.columns().melt(
+        id_vars='Column', value_vars=['Missing', 'Not_Numeric', 'Below_Range', 'Above_Range'],
+        var_name='Issue', value_name='Count'
+    )
+    issue_counts = issue_counts[issue_counts['Count'] > 0].copy()
+    if issue_counts.empty:
+        return None
+    if percentage:
+        issue_counts['Percentage'] = round((issue_counts['Count'] / quality.rows) * 100, 3)
+    fig_issues = px.bar(
+        issue_counts,
+        x='Column',
+        y='Percentage' if percentage else 'Count',
+        color='Issue',
+        text='Percentage' if percentage else 'Count',
+        title='Data Issues by Column (%)' if percentage else 'Data Issues by Column (Count)'
+    )
+    return Chart(fig_issues)
+
+
+def outlier_chart(quality, percentage):
+    outlier_counts = quality.outliers().melt(
+        id_vars='Column', value_vars=['IQR_Outliers', 'Z_Outliers'], var_name='Rule', value_name='Count'
+    )
+    outlier_counts['Rule'] = outlier_counts['Rule'].map({'IQR_Outliers': 'IQR fences', 'Z_Outliers': 'z-score'})
+    if percentage:
+        outlier_counts['Percentage'] = round((outlier_counts['Count'] / max(quality.rows, 1)) * 100, 3)
+    fig_outliers = px.bar(
+        outlier_counts,
+        x='Column',
+        y='Percentage' if percentage else 'Count',
+        color='Rule',
+        barmode='group',
+        text='Percentage' if percentage else 'Count',
+        title='Outliers by Rule (%)' if percentage else 'Outliers by Rule (Count)'
+    )
+    return Chart(fig_outliers)
+
+
+# =============================== #
+# Snapshot Comparison
+# =============================== #
+def comparison_figure(frame, keys, title, current, baseline, delta, chart_style, delta_unit=""):
+    """Grouped current-vs-baseline bars, or bars of the change, for a joined comparison frame."""
+    frame = frame.copy()
+    frame['Label'] = frame[keys].astype(str).agg(' - '.join, axis=1)
+    labels = {'Label': ' - '.join(keys)}
+    if chart_style == "Delta":
+        frame[delta] = frame[delta].round(3)
+        frame['Change'] = np.where(frame[delta] >= 0, 'Increase', 'Decrease')
+        return px.bar(
+            frame,
+            x='Label',
+            y=delta,
+            color='Change',
+            color_discrete_map={'Increase': '#2ca02c', 'Decrease': '#d62728'},
+            text=delta,
+            title=f'{title} (Change vs Baseline{delta_unit})',
+            labels=labels
+        )
+    long = frame.melt(id_vars='Label', value_vars=[current, baseline], var_name='Snapshot', value_name='Value')
+    long['Snapshot'] = long['Snapshot'].map({current: 'Current', baseline: 'Baseline'})
+    long['Value'] = long['Value'].round(3)
+    return px.bar(
+        long,
+        x='Label',
+        y='Value',
+        color='Snapshot',
+        barmode='group',
+        text='Value',
+        title=title,
+        labels=labels
+    )
+
+
+def share_comparison_charts(comparison, percentage, chart_style):
+    """Category shares: counts in count mode, percentage points in percentage mode."""
+    charts = []
+    for column, shares in comparison.shares.items():
+        if percentage:
+            fig_share = comparison_figure(
+                shares, [column], f'{column} Share', 'Current', 'Baseline', 'Delta', chart_style, ', pp'
+            )
+        else:
+            fig_share = comparison_figure(
+                shares, [column], f'{column} Count', 'Count', 'Baseline_Count', 'Count_Delta', chart_style
+            )
+        charts.append(Chart(fig_share))
+    return charts
+
+
+def mean_comparison_charts(comparison, percentage, chart_style):
+    """Group means: absolute change in count mode, relative change in percentage mode."""
+    charts = []
+    for (*by, column), means in comparison.means.items():
+        title = f"Avg {column} by {' & '.join(by)}"
+        if percentage:
+            means = means.assign(Change_Percentage=(means['Delta'] / means['Baseline']) * 100)
+            fig_mean = comparison_figure(
+                means, by, title, 'Current', 'Baseline', 'Change_Percentage', chart_style, ', %'
+            )
+        else:
+            fig_mean = comparison_figure(means, by, title, 'Current', 'Baseline', 'Delta', chart_style)
+        charts.append(Chart(fig_mean))
+    return charts
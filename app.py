@@ -2,22 +2,91 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+import os
 from datetime import datetime
 
+import analytics
+from analytics import DATA_SOURCE, DISK_CACHE_DIR, EDA_ENGINE
+from comparison import compare
+from data_quality import IQR_FENCE, Z_LIMIT
+from exports import figure_data, start_export_server
+from instrumentation import current, enter_section, finish_rerun, profile_report, span, start_rerun
+from memory_governor import MB
+from metrics import REGISTRY, start_metrics_server
+from risk import RISK_COLUMNS, WATCHLIST_SIZE
+
 # --- Page Configuration ---
 st.set_page_config(page_title="Vehicle Category Analysis", layout="wide")
 
+# --- Rerun Timing ---
+# JSON-lines log with one record per rerun, e.g. EDA_TIMING_LOG=eda_timings.jsonl (off by default:
+# it grows without bound, so rotate it with logrotate or similar when enabled)
+TIMING_LOG = os.environ.get("EDA_TIMING_LOG", "")
+start_rerun(
+    profile=st.session_state.pop("profile_next_rerun", False),
+    user=st.session_state.get("username"),
+)
+
+# Index of this process when a host runs several dashboard workers (e.g. supervisord's
+# %(process_num)d); each serves its sidecars on the base port plus this index
+WORKER_INDEX = int(os.environ.get("EDA_WORKER_INDEX", "0"))
+
+# Local Prometheus endpoint at http://127.0.0.1:<port + worker index>/metrics (0 disables it)
+METRICS_PORT = int(os.environ.get("EDA_METRICS_PORT", "9464"))
+
+@st.cache_resource
+def get_metrics_server(port=METRICS_PORT):
+    return start_metrics_server(port + WORKER_INDEX) if port else None
+
+get_metrics_server()
+
+# Streaming CSV/Parquet export sidecar on EDA_EXPORT_HOST, port EDA_EXPORT_PORT plus the worker index
+# (0 disables).  EDA_EXPORT_URL is where browsers reach this worker's sidecar, with {port} and {worker}
+# filled in: links are only valid in the worker that issued them, so a proxy must route each worker's
+# URL to its own port.  For browsers on other machines set EDA_EXPORT_HOST=0.0.0.0 and a routable URL.
+EXPORT_HOST = os.environ.get("EDA_EXPORT_HOST", "127.0.0.1")
+EXPORT_PORT = int(os.environ.get("EDA_EXPORT_PORT", "9465"))
+EXPORT_URL = os.environ.get("EDA_EXPORT_URL", "http://localhost:{port}")
+EXPORT_MAX_ROWS = int(os.environ.get("EDA_EXPORT_MAX_ROWS", "10000000"))  # 0 = unlimited
+EXPORT_MAX_MB = int(os.environ.get("EDA_EXPORT_MAX_MB", "2048"))  # 0 = unlimited
+
+@st.cache_resource
+def get_export_server(port=EXPORT_PORT):
+    if not port:
+        return None
+    port += WORKER_INDEX
+    return start_export_server(
+        port, EXPORT_HOST, EXPORT_URL.format(port=port, worker=WORKER_INDEX),
+        max_rows=EXPORT_MAX_ROWS, max_bytes=EXPORT_MAX_MB * MB,
+    )
+
+# Loading, KPIs and chart specs come from analytics.py, shared with EDA.ipynb; its px.* figures
+# are memoised on their inputs, and with the disk cache (EDA_DISK_CACHE_DIR/_MB) shared across workers
+@st.cache_resource
+def get_disk_cache():
+    cache = analytics.open_disk_cache()
+    if cache is not None:
+        REGISTRY.register_disk_cache(cache)
+    return cache
+
+get_disk_cache()
+
 # Hardcoded user credentials
 USER_CREDENTIALS = {
     "admin": "admin123",
     "analyst": "veh2024"
 }
 
+# Pre-rendered read-only report (see report.py), offered on the login page when set
+REPORT_URL = os.environ.get("EDA_REPORT_URL", "")
+
 # Login page function
 def login_page():
     st.title("🔐 Login to Vehicle Dashboard")
+    if REPORT_URL:
+        st.info(f"Only need the overview? The [static report]({REPORT_URL}) needs no login and loads instantly.")
 
     username = st.text_input("Username")
     password = st.text_input("Password", type="password")
@@ -25,17 +94,29 @@ def login_page():
     if st.button("Login"):
         if username in USER_CREDENTIALS and USER_CREDENTIALS[username] == password:
             st.session_state.logged_in = True
+            st.session_state.username = username
             # Streamlit will automatically rerun after the session state is updated
         else:
             st.error("❌ Invalid username or password")
 
 # --- Load Data ---
-@st.cache_data
-def load_data():
-    df = pd.read_csv('vehicle_maintenance_data.csv')
-    return df
+# Dataset, engine and memory budget: EDA_DATA_SOURCE, EDA_ENGINE, EDA_MEMORY_BUDGET_MB and
+# EDA_OVER_BUDGET_MODE (see analytics.py)
+@st.cache_resource
+def get_governor():
+    return analytics.make_governor()
+
+@st.cache_resource
+def load_data(uri=DATA_SOURCE, engine=EDA_ENGINE):
+    return analytics.load(uri, engine, get_governor())
+
+# Other versions of the dataset offered as comparison baselines (paths or URIs separated by os.pathsep)
+SNAPSHOTS = [uri for uri in os.environ.get("EDA_SNAPSHOTS", "").split(os.pathsep) if uri]
 
-df = load_data()
+with span("data_load", DATA_SOURCE):
+    source = load_data()
+    source.refresh()  # only new or changed partitions are reloaded
+memory_status = get_governor().enforce(source)
 
 # --- Sidebar Filters ---
 st.sidebar.header("🔍 Filters")
@@ -47,7 +128,8 @@ if st.sidebar.button("Logout"):
 selected_filter = st.sidebar.selectbox(
     "Select Analysis Category:",
     ["All", "Vehicle Category Analysis", "Maintenance and Condition Analysis","Fuel and Engine Performance Analysis",
-     "Reported Issue and Risk Analysis","Descriptive Analysis","Diagnostic Analysis"]
+     "Reported Issue and Risk Analysis","Descriptive Analysis","Diagnostic Analysis","Data Quality",
+     "Snapshot Comparison"]
 )
 
 # Filter 2: Value Type
@@ -56,38 +138,276 @@ value_type = st.sidebar.radio(
     ["Show as Count", "Show as Percentage"]
 )
 
+current().context.update(category=selected_filter, value_type=value_type, load_mode=source.load_mode)
+
+# Filter 3: Chart Payload
+compact_charts = st.sidebar.checkbox(
+    "Compact chart payloads",
+    help="Send rounded binary arrays, single-trace bars and WebGL traces to the browser."
+)
+
+# Filter 4: Partitions (partitioned datasets only; unselected partitions are never read)
+partition_selection = {}
+for key, values in source.partition_values().items():
+    chosen = st.sidebar.multiselect(f"{key}:", values, default=values)
+    if len(chosen) < len(values):
+        partition_selection[key] = chosen
+source = source.select(partition_selection)
+
+# --- Memory Usage ---
+st.sidebar.header("💾 Memory")
+st.sidebar.progress(
+    memory_status.fraction,
+    text=f"{memory_status.rss / MB:,.0f} MB of {memory_status.budget / MB:,.0f} MB" if memory_status.budget
+    else f"{memory_status.rss / MB:,.0f} MB (no budget)"
+)
+st.sidebar.caption(
+    f"Dataset: {memory_status.dataset / MB:,.1f} MB · Caches: {memory_status.caches / MB:,.1f} MB · "
+    f"Mode: {memory_status.load_mode}"
+)
+for action in memory_status.actions:
+    st.sidebar.warning(f"Memory budget: {action}")
+if memory_status.load_mode == "sampled":
+    st.sidebar.warning("Dataset exceeds the memory budget: charts show a random sample of rows.")
+elif memory_status.load_mode == "aggregate-only":
+    st.sidebar.info("Dataset exceeds the memory budget: aggregates are computed from an on-disk SQLite snapshot.")
+
+# =============================== #
+# 📦 Compact Figure Payloads
+# =============================== #
+DISPLAY_DECIMALS = 3       # precision the charts are labelled with
+WEBGL_MIN_POINTS = 1000    # switch scatter traces to WebGL above this size
+ARRAY_FIELDS = ("x", "y", "z", "text", "values", "customdata")
+
+def compact_array(values, decimals=DISPLAY_DECIMALS):
+    """Round a numeric array to display precision and pick the smallest typed-array dtype."""
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "iufb" or arr.ndim != 1 or arr.size == 0:
+        return values
+    arr = np.round(arr.astype("float64"), decimals)
+    if np.isnan(arr).any():
+        return arr
+    if np.array_equal(arr, np.trunc(arr)):
+        for dtype in ("int8", "int16", "int32"):
+            info = np.iinfo(dtype)
+            if arr.min() >= info.min and arr.max() <= info.max:
+                return arr.astype(dtype)
+        return arr
+    as_f4 = arr.astype("float32")
+    if np.allclose(as_f4, arr, rtol=0, atol=0.5 * 10 ** -decimals):
+        return as_f4
+    return arr
+
+def merge_bar_traces(fig):
+    """Collapse one-trace-per-category bars (px.bar with color=x) into a single coloured trace."""
+    traces = fig.data
+    if len(traces) < 2 or not all(isinstance(t, go.Bar) for t in traces):
+        return list(traces)
+    categories = [v for t in traces for v in (t.x if t.x is not None else [])]
+    if len(set(map(str, categories))) != len(categories):
+        return list(traces)  # grouped/stacked bars share categories, keep them apart
+    if len({t.hovertemplate for t in traces}) > 1:
+        return list(traces)
+
+    merged = traces[0].to_plotly_json()
+    for key in ("name", "legendgroup", "showlegend", "type"):
+        merged.pop(key, None)
+    merged["x"] = categories
+    merged["y"] = np.concatenate([np.asarray(t.y) for t in traces])
+    if all(t.text is not None for t in traces):
+        merged["text"] = np.concatenate([np.atleast_1d(np.asarray(t.text)) for t in traces])
+    merged["marker"] = dict(merged.get("marker", {}), color=[t.marker.color for t in traces for _ in t.x])
+    return [go.Bar(merged, showlegend=False)]
+
+def compact_figure(fig):
+    """Return a copy of `fig` that serialises to a smaller, typed-array payload."""
+    traces = []
+    for trace in merge_bar_traces(fig):
+        if isinstance(trace, go.Scatter) and trace.x is not None and len(trace.x) >= WEBGL_MIN_POINTS:
+            props = trace.to_plotly_json()
+            props.pop("type", None)
+            trace = go.Scattergl(props)
+        for field in ARRAY_FIELDS:
+            values = getattr(trace, field, None)
+            if values is not None and not isinstance(values, str):
+                trace[field] = compact_array(values)
+        if isinstance(trace, go.Bar) and trace.text is not None and trace.y is not None \
+                and np.asarray(trace.y).dtype.kind in "iuf" \
+                and np.array_equal(np.asarray(trace.text), np.asarray(trace.y, dtype="float64")):
+            # Bar labels that repeat the bar height are drawn from y instead of a second array
+            trace.texttemplate = (trace.texttemplate or "%{text}").replace("%{text", "%{y")
+            if trace.hovertemplate:
+                trace.hovertemplate = trace.hovertemplate.replace("%{text", "%{y")
+            trace.text = None
+        traces.append(trace)
+    return go.Figure(data=traces, layout=fig.layout)
+
+def render_chart(fig, container=st, drill=None):
+    """Draw a Plotly figure, applying the compact payload mode when it is enabled.
+
+    `drill` maps fields of a clicked bar ("x", "legendgroup") to the columns they
+    hold; clicking a bar then opens the drill-down row explorer for its rows.
+    """
+    original_fig = fig
+    if compact_charts:
+        full_size = len(pio.to_json(fig, validate=False))
+        fig = compact_figure(fig)
+        compact_size = len(pio.to_json(fig, validate=False))
+    title = fig.layout.title.text or "untitled"
+    rendered_charts.append((title, original_fig))
+    with span("figure_serialise", title):
+        if drill and any(isinstance(trace, go.Bar) for trace in fig.data):
+            key = chart_key(title)
+            container.plotly_chart(
+                fig, use_container_width=True, key=key, selection_mode="points",
+                on_select=lambda: select_drill_down(key, title, drill)
+            )
+        else:
+            container.plotly_chart(fig, use_container_width=True)
+    if compact_charts:
+        container.caption(f"Payload: {compact_size / 1024:.1f} KB (full: {full_size / 1024:.1f} KB)")
+
+def show_chart(chart, container=st):
+    """Draw an analytics.Chart, with drill-down on the columns it names."""
+    render_chart(chart.figure, container, chart.drill)
+
+def show_kpis(metrics, per_row=None):
+    """One st.metric per analytics.Metric, `per_row` to a row (all in one row by default)."""
+    columns = st.columns(per_row or len(metrics))
+    for i, metric in enumerate(metrics):
+        columns[i % len(columns)].metric(*metric)
+
+# =============================== #
+# 🔎 Drill-down Row Explorer
+# =============================== #
+DRILL_PAGE_SIZES = [25, 50, 100, 250]
+DATASET_ORDER = "(dataset order)"
+_chart_keys = {}
+rendered_charts = []  # (title, figure) of every chart on the page, for export
+
+def chart_key(title):
+    """Widget key for a chart: unique within the page and stable across reruns."""
+    _chart_keys[title] = _chart_keys.get(title, 0) + 1
+    return f"chart_{title}_{_chart_keys[title]}"
+
+def select_drill_down(key, title, drill):
+    points = st.session_state[key].selection.points
+    if points:
+        st.session_state.drill_down = dict(chart=title, drill=drill, point=dict(points[0]))
+        st.session_state.drill_page = 1
+        st.session_state.drill_open = True
+
+def drill_filters(drill, point):
+    """Filters selecting the rows behind a clicked bar, with values typed as in the data."""
+    where = []
+    for field, column in drill.items():
+        if field not in point:
+            continue
+        clicked, value = point[field], point[field]
+        for candidate in source.value_counts(column)[column]:
+            if str(candidate) == str(clicked) or (not isinstance(candidate, str) and candidate == clicked):
+                value = candidate.item() if isinstance(candidate, np.generic) else candidate
+                break
+        where.append((column, '==', value))
+    return where
+
+@st.dialog("🔎 Drill-down", width="large")
+def drill_down_explorer():
+    # Paging, sorting and column changes rerun only this dialog, and only one page of rows is sent
+    selected = st.session_state.drill_down
+    where = drill_filters(selected["drill"], selected["point"])
+    st.subheader(selected["chart"])
+    st.caption(" · ".join(f"{column} = {value}" for column, _, value in where))
+
+    if not memory_status.raw_rows_allowed:
+        st.info(
+            f"Row-level drill-down is unavailable: the dataset is {memory_status.load_mode} "
+            "or the server is over its memory budget."
+        )
+        return
+
+    total = source.row_count(where)
+    col1, col2, col3, col4 = st.columns([4, 2, 1, 1])
+    columns = col1.multiselect("Columns", source.columns, default=source.columns, key="drill_columns")
+    sort = col2.selectbox("Sort by", [DATASET_ORDER] + source.columns, key="drill_sort")
+    descending = col3.toggle("Descending", key="drill_descending")
+    page_size = col4.selectbox("Rows per page", DRILL_PAGE_SIZES, key="drill_page_size")
+
+    pages = max(1, -(-total // page_size))
+    st.session_state.drill_page = min(st.session_state.get("drill_page", 1), pages)
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, key="drill_page")
+
+    offset = (page - 1) * page_size
+    rows = source.rows(
+        where, columns or None, None if sort == DATASET_ORDER else sort, not descending, offset, page_size
+    )
+    rows.index = range(offset + 1, offset + len(rows) + 1)
+    st.dataframe(rows, use_container_width=True)
+    st.caption(f"Rows {offset + 1:,}–{offset + len(rows):,} of {total:,}" if total else "No matching rows")
+
+    if get_export_server() is not None:
+        col_csv, col_parquet, _ = st.columns([1, 1, 4])
+        for fmt, col in (("csv", col_csv), ("parquet", col_parquet)):
+            export_rows_button(col, fmt, where, columns or None, selected["chart"], label=f"⬇️ {fmt.upper()}")
+
+# =============================== #
+# 📤 Streaming Export
+# =============================== #
+def export_rows_button(container, fmt, where=None, columns=None, name="rows", label=None):
+    """Link to a streamed export of the matching rows, if the dataset and limits allow it."""
+    server = get_export_server()
+    if memory_status.load_mode == "sampled":
+        container.caption("Row export is unavailable: the dataset is sampled.")
+        return
+    total = source.row_count(where)
+    if server.too_large(total):
+        container.caption(f"{total:,} rows exceeds the export limit of {server.max_rows:,} rows.")
+        return
+    container.link_button(
+        label or f"Rows ({total:,})", server.rows_url(source, where, columns, fmt, name), use_container_width=True
+    )
+
+def export_panel():
+    st.sidebar.header("📤 Export")
+    server = get_export_server()
+    if server is None:
+        st.sidebar.caption("Exports are disabled (EDA_EXPORT_PORT=0).")
+        return
+    fmt = st.sidebar.radio("Format:", ["csv", "parquet"], format_func=str.upper, horizontal=True)
+    if rendered_charts:
+        chart_data = pd.concat([figure_data(title, fig) for title, fig in rendered_charts], ignore_index=True)
+        st.sidebar.link_button(
+            f"Chart data ({len(rendered_charts)} charts)",
+            server.frame_url(chart_data, fmt, f"{selected_filter} {value_type}"),
+            use_container_width=True
+        )
+    export_rows_button(st.sidebar, fmt, name="vehicle_maintenance_rows")
+    max_rows = f"{server.max_rows:,} rows" if server.max_rows else "unlimited rows"
+    max_size = f"{EXPORT_MAX_MB:,} MB" if EXPORT_MAX_MB else "unlimited size"
+    st.sidebar.caption(f"Streamed in chunks · limits: {max_rows}, {max_size}")
+
 # =============================== #
 # 📊 Vehicle Category Analysis
 # =============================== #
 def vehicle_eda_page():
     st.title("Vehicle Maintenance - Exploratory Data Analysis")
+    percentage = value_type == "Show as Percentage"
+    if source.row_count() == 0:
+        # e.g. a partition filter cleared in the sidebar; every KPI would divide by zero
+        st.info("No rows match the selected partitions. Choose at least one value for each partition filter.")
+        return
     
     # --- Vehicle Category Analysis ---
     if selected_filter == "All" or selected_filter == "Vehicle Category Analysis":
-        # --- KPIs Section ---
-        st.header("📊 Key Performance Indicators")
-    
-        # KPIs based on Vehicle Model
-        total_models = df['Vehicle_Model'].nunique()
-        total_vehicles = df['Vehicle_Model'].count()
-        most_common_model = df['Vehicle_Model'].mode()[0] if not df['Vehicle_Model'].isnull().all() else "N/A"
-        avg_mileage = round(df['Mileage'].mean(), 2) if 'Mileage' in df.columns else "N/A"
-        avg_issues = round(df['Reported_Issues'].mean(), 2) if 'Reported_Issues' in df.columns else "N/A"
-    
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            st.metric("Total Vehicle Models", total_models)
-        with col2:
-            st.metric("Total Vehicles", total_vehicles)
-        with col3:
-            st.metric("Most Common Model", most_common_model)
-        with col4:
-            st.metric("Average Mileage", avg_mileage)
-        with col5:
-            st.metric("Average Reported Issues", avg_issues)
+        enter_section("Vehicle Category Analysis")
+        with span("kpi", "Vehicle Category Analysis KPIs"):
+            # --- KPIs Section ---
+            st.header("📊 Key Performance Indicators")
+            show_kpis(analytics.vehicle_category_kpis(source))
     
     # --- Vehicle Category Analysis ---
     if selected_filter == "All" or selected_filter == "Vehicle Category Analysis":
+        enter_section("Vehicle Category Analysis")
         st.header("🚙 Vehicle Category Analysis")
     
         # Row 1: Owner Type and Fuel Type
@@ -95,106 +415,22 @@ def vehicle_eda_page():
     
         with col1:
             st.subheader("Owner Type Distribution")
-            owner_counts = df['Owner_Type'].value_counts().reset_index()
-            owner_counts.columns = ['Owner_Type', 'Count']
-    
-            if value_type == "Show as Percentage":
-                owner_counts['Percentage'] = round((owner_counts['Count'] / owner_counts['Count'].sum()) * 100, 2)
-                fig_owner = px.pie(
-                    owner_counts,
-                    names='Owner_Type',
-                    values='Percentage',
-                    title='Owner Type (Percentage)',
-                    hole=0.4
-                )
-            else:
-                fig_owner = px.bar(
-                    owner_counts,
-                    x='Owner_Type',
-                    y='Count',
-                    color='Owner_Type',
-                    title='Owner Type (Count)',
-                    text='Count'
-                )
-            st.plotly_chart(fig_owner, use_container_width=True)
+            show_chart(analytics.owner_type_chart(source, percentage))
     
         with col2:
             st.subheader("Fuel Type Distribution")
-            fuel_counts = df['Fuel_Type'].value_counts().reset_index()
-            fuel_counts.columns = ['Fuel_Type', 'Count']
-    
-            if value_type == "Show as Percentage":
-                fuel_counts['Percentage'] = round((fuel_counts['Count'] / fuel_counts['Count'].sum()) * 100, 2)
-                fig_fuel = px.pie(
-                    fuel_counts,
-                    names='Fuel_Type',
-                    values='Percentage',
-                    title='Fuel Type (Percentage)',
-                    hole=0.4
-                )
-            else:
-                fig_fuel = px.bar(
-                    fuel_counts,
-                    x='Fuel_Type',
-                    y='Count',
-                    color='Fuel_Type',
-                    title='Fuel Type (Count)',
-                    text='Count'
-                )
-            st.plotly_chart(fig_fuel, use_container_width=True)
+            show_chart(analytics.fuel_type_chart(source, percentage))
     
         # Row 2: Transmission Type and Top 10 Vehicle Models
         col3, col4 = st.columns(2)
     
         with col3:
             st.subheader("Transmission Type Distribution")
-            transmission_counts = df['Transmission_Type'].value_counts().reset_index()
-            transmission_counts.columns = ['Transmission_Type', 'Count']
-    
-            if value_type == "Show as Percentage":
-                transmission_counts['Percentage'] = round((transmission_counts['Count'] / transmission_counts['Count'].sum()) * 100, 2)
-                fig_transmission = px.pie(
-                    transmission_counts,
-                    names='Transmission_Type',
-                    values='Percentage',
-                    title='Transmission Type (Percentage)',
-                    hole=0.4
-                )
-            else:
-                fig_transmission = px.bar(
-                    transmission_counts,
-                    x='Transmission_Type',
-                    y='Count',
-                    color='Transmission_Type',
-                    title='Transmission Type (Count)',
-                    text='Count'
-                )
-            st.plotly_chart(fig_transmission, use_container_width=True)
+            show_chart(analytics.transmission_type_chart(source, percentage))
     
         with col4:
             st.subheader("Vehicle Models by Count")
-            model_counts = df['Vehicle_Model'].value_counts().head(10).reset_index()
-            model_counts.columns = ['Vehicle_Model', 'Count']
-    
-            if value_type == "Show as Percentage":
-                model_counts['Percentage'] = round((model_counts['Count'] / model_counts['Count'].sum()) * 100, 2)
-                fig_model = px.pie(
-                    model_counts,
-                    names='Vehicle_Model',
-                    values='Percentage',
-                    title='Vehicle Models (Percentage)',
-                    hole=0.4
-                )
-            else:
-                fig_model = px.bar(
-                    model_counts,
-                    x='Vehicle_Model',
-                    y='Count',
-                    color='Vehicle_Model',
-                    title='Vehicle Models (Count)',
-                    text='Count'
-                )
-            st.plotly_chart(fig_model, use_container_width=True)
+            show_chart(analytics.vehicle_model_chart(source, percentage))
     
     # =============================== #
     # Maintenance and Condition Analysis
@@ -202,22 +438,13 @@ def vehicle_eda_page():
     
     # --- Maintenance and Condition Analysis ---
     if selected_filter == "All" or selected_filter == "Maintenance and Condition Analysis":
-        st.header("📊 Key Performance Indicators")
-    
-        percent_needing_maintenance = round((df['Need_Maintenance'].sum() / len(df)) * 100, 2)
-        bad_tire_condition = round((df[df['Tire_Condition'] == 'Worn Out'].shape[0] / len(df)) * 100, 2)
-        poor_brake_condition = round((df[df['Brake_Condition'] == 'Worn Out'].shape[0] / len(df)) * 100, 2)
-        weak_battery = round((df[df['Battery_Status'] == 'Weak'].shape[0] / len(df)) * 100, 2)
-        avg_accident_history = round(df['Accident_History'].mean(), 2)
-    
-        col1, col2, col3, col4, col5 = st.columns(5)
-        col1.metric("% Needing Maintenance", f"{percent_needing_maintenance}%")
-        col2.metric("Bad Tire Condition (%)", f"{bad_tire_condition}%")
-        col3.metric("Poor Brake Condition (%)", f"{poor_brake_condition}%")
-        col4.metric("Weak Battery (%)", f"{weak_battery}%")
-        col5.metric("Avg Accident History", avg_accident_history)
+        enter_section("Maintenance and Condition Analysis")
+        with span("kpi", "Maintenance and Condition Analysis KPIs"):
+            st.header("📊 Key Performance Indicators")
+            show_kpis(analytics.maintenance_kpis(source))
     
     if selected_filter == "All" or selected_filter == "Maintenance and Condition Analysis":
+        enter_section("Maintenance and Condition Analysis")
         st.header("🔧 Maintenance and Condition Analysis")
     
         # Row 1
@@ -225,149 +452,28 @@ def vehicle_eda_page():
     
         with col1:
             st.subheader("Maintenance History by Fuel Type")
-            fuel_data = df['Fuel_Type'].value_counts().reset_index()
-            fuel_data.columns = ['Fuel_Type', 'Count']
-    
-            if value_type == "Show as Count":
-                fig = px.bar(
-                    fuel_data,
-                    x='Fuel_Type',
-                    y='Count',
-                    color='Fuel_Type',
-                    text='Count',
-                    title='Maintenance History by Fuel Type (Count)'
-                )
-            else:
-                fig = px.pie(
-                    fuel_data,
-                    names='Fuel_Type',
-                    values='Count',
-                    title='Maintenance History by Fuel Type (Percentage)',
-                    hole=0.4
-                )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(analytics.maintenance_by_fuel_chart(source, percentage))
     
         with col2:
             st.subheader("Need Maintenance (Yes/No)")
-            maintenance_data = df['Need_Maintenance'].value_counts().reset_index()
-            maintenance_data.columns = ['Need_Maintenance', 'Count']
-    
-            if value_type == "Show as Count":
-                fig = px.bar(
-                    maintenance_data,
-                    x='Need_Maintenance',
-                    y='Count',
-                    color='Need_Maintenance',
-                    text='Count',
-                    title='Vehicles Needing Maintenance (Count)'
-                )
-            else:
-                fig = px.pie(
-                    maintenance_data,
-                    names='Need_Maintenance',
-                    values='Count',
-                    title='Vehicles Needing Maintenance (Percentage)',
-                    hole=0.4
-                )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(analytics.need_maintenance_chart(source, percentage))
     
         # Row 2
-        col3, col4, col5 = st.columns(3)
-    
-        with col3:
-            st.subheader("Tire Condition")
-            tire_data = df['Tire_Condition'].value_counts().reset_index()
-            tire_data.columns = ['Tire_Condition', 'Count']
-    
-            if value_type == "Show as Count":
-                fig = px.bar(
-                    tire_data,
-                    x='Tire_Condition',
-                    y='Count',
-                    color='Tire_Condition',
-                    text='Count',
-                    title='Tire Condition (Count)'
-                )
-            else:
-                fig = px.pie(
-                    tire_data,
-                    names='Tire_Condition',
-                    values='Count',
-                    title='Tire Condition (Percentage)',
-                    hole=0.4
-                )
-            st.plotly_chart(fig, use_container_width=True)
-    
-        with col4:
-            st.subheader("Brake Condition")
-            brake_data = df['Brake_Condition'].value_counts().reset_index()
-            brake_data.columns = ['Brake_Condition', 'Count']
-    
-            if value_type == "Show as Count":
-                fig = px.bar(
-                    brake_data,
-                    x='Brake_Condition',
-                    y='Count',
-                    color='Brake_Condition',
-                    text='Count',
-                    title='Brake Condition (Count)'
-                )
-            else:
-                fig = px.pie(
-                    brake_data,
-                    names='Brake_Condition',
-                    values='Count',
-                    title='Brake Condition (Percentage)',
-                    hole=0.4
-                )
-            st.plotly_chart(fig, use_container_width=True)
-    
-        with col5:
-            st.subheader("Battery Status")
-            battery_data = df['Battery_Status'].value_counts().reset_index()
-            battery_data.columns = ['Battery_Status', 'Count']
-    
-            if value_type == "Show as Count":
-                fig = px.bar(
-                    battery_data,
-                    x='Battery_Status',
-                    y='Count',
-                    color='Battery_Status',
-                    text='Count',
-                    title='Battery Status (Count)'
-                )
-            else:
-                fig = px.pie(
-                    battery_data,
-                    names='Battery_Status',
-                    values='Count',
-                    title='Battery Status (Percentage)',
-                    hole=0.4
-                )
-            st.plotly_chart(fig, use_container_width=True)
+        conditions = {'Tire_Condition': 'Tire Condition', 'Brake_Condition': 'Brake Condition', 'Battery_Status': 'Battery Status'}
+        for (part, title), col in zip(conditions.items(), st.columns(3)):
+            with col:
+                st.subheader(title)
+                show_chart(analytics.condition_chart(source, part, title, percentage))
     
     # =============================== #
     # Fuel and Engine Performance Analysis
     # =============================== #
     
     if selected_filter == "All" or selected_filter == "Fuel and Engine Performance Analysis":
-        st.header("📊 Key Performance Indicators")
-    
-        # --- KPIs ---
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            high_engine = round((df[df['Engine_Size'] > df['Engine_Size'].mean()].shape[0] / df.shape[0]) * 100, 2)
-            st.metric("% High Engine Size", f"{high_engine}")
-        with col2:
-            low_engine = round((df[df['Engine_Size'] < df['Engine_Size'].mean()].shape[0] / df.shape[0]) * 100, 2)
-            st.metric("% Low Engine Size", f"{low_engine}")
-        with col3:
-            odometer_std = round(df['Odometer_Reading'].std(), 2)
-            st.metric("STDEV of Odometer", f"{odometer_std/1000:.2f}K")
-        with col4:
-            fuel_eff_std = round(df['Fuel_Efficiency'].std(), 2)
-            st.metric("STDEV of Fuel Efficiency", fuel_eff_std)
-    
+        enter_section("Fuel and Engine Performance Analysis")
+        with span("kpi", "Fuel and Engine Performance Analysis KPIs"):
+            st.header("📊 Key Performance Indicators")
+            show_kpis(analytics.fuel_engine_kpis(source))
     
         st.header("⛽ Fuel and Engine Performance Analysis")
     
@@ -379,67 +485,12 @@ def vehicle_eda_page():
         # --- Tire Condition Analysis ---
         with col1:
             st.subheader("Fuel Efficiency by Tire Condition")
-            tire_df = df.groupby('Tire_Condition')['Fuel_Efficiency'].mean().reset_index()
-            tire_df['Fuel_Efficiency'] = tire_df['Fuel_Efficiency'].round(3)
-    
-            if value_type == "Show as Percentage":
-                total = tire_df['Fuel_Efficiency'].sum()
-                tire_df['Percentage'] = (tire_df['Fuel_Efficiency'] / total) * 100
-                tire_df['Percentage'] = tire_df['Percentage'].round(3)
-                fig_tire = px.pie(
-                    tire_df,
-                    names='Tire_Condition',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Fuel Efficiency by Tire Condition (%)'
-                )
-                fig_tire.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.3%}')
-            else:
-                fig_tire = px.bar(
-                    tire_df,
-                    x='Tire_Condition',
-                    y='Fuel_Efficiency',
-                    color='Tire_Condition',
-                    text='Fuel_Efficiency',
-                    title='Fuel Efficiency by Tire Condition (Count)'
-                )
-                fig_tire.update_traces(textangle=0)
-    
-            st.plotly_chart(fig_tire, use_container_width=True)
+            show_chart(analytics.fuel_by_tire_chart(source, percentage))
     
         # --- Fuel vs Transmission Analysis ---
         with col2:
             st.subheader("Fuel Type vs Transmission Type")
-            combo_df = df.groupby(['Fuel_Type', 'Transmission_Type'])['Fuel_Efficiency'].mean().reset_index()
-            combo_df['Fuel_Efficiency'] = combo_df['Fuel_Efficiency'].round(3)
-    
-            if value_type == "Show as Percentage":
-                total = combo_df['Fuel_Efficiency'].sum()
-                combo_df['Percentage'] = (combo_df['Fuel_Efficiency'] / total) * 100
-                combo_df['Percentage'] = combo_df['Percentage'].round(3)
-                combo_df['Label'] = combo_df['Fuel_Type'] + " - " + combo_df['Transmission_Type']
-    
-                fig_combo = px.pie(
-                    combo_df,
-                    names='Label',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Fuel vs Transmission Type (%)'
-                )
-                fig_combo.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.3%}')
-            else:
-                fig_combo = px.bar(
-                    combo_df,
-                    x='Fuel_Type',
-                    y='Fuel_Efficiency',
-                    color='Transmission_Type',
-                    barmode='group',
-                    text='Fuel_Efficiency',
-                    title='Fuel Type vs Transmission Type (Count)'
-                )
-                fig_combo.update_traces(textangle=0)
-    
-            st.plotly_chart(fig_combo, use_container_width=True)
+            show_chart(analytics.fuel_by_fuel_transmission_chart(source, percentage))
     
         # ------------------------------- #
         # Row 2: Engine Size & Insurance
@@ -449,66 +500,12 @@ def vehicle_eda_page():
         # --- Engine Size Analysis ---
         with col3:
             st.subheader("Fuel Efficiency by Engine Size")
-            engine_df = df.groupby('Engine_Size')['Fuel_Efficiency'].mean().reset_index()
-            engine_df['Fuel_Efficiency'] = engine_df['Fuel_Efficiency'].round(3)
-    
-            if value_type == "Show as Percentage":
-                total = engine_df['Fuel_Efficiency'].sum()
-                engine_df['Percentage'] = (engine_df['Fuel_Efficiency'] / total) * 100
-                engine_df['Percentage'] = engine_df['Percentage'].round(3)
-    
-                fig_engine = px.pie(
-                    engine_df,
-                    names='Engine_Size',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Fuel Efficiency by Engine Size (%)'
-                )
-                fig_engine.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.3%}')
-            else:
-                fig_engine = px.bar(
-                    engine_df,
-                    x='Engine_Size',
-                    y='Fuel_Efficiency',
-                    color='Engine_Size',
-                    text='Fuel_Efficiency',
-                    title='Fuel Efficiency by Engine Size (Count)'
-                )
-                fig_engine.update_traces(textangle=0)
-    
-            st.plotly_chart(fig_engine, use_container_width=True)
+            show_chart(analytics.fuel_by_engine_chart(source, percentage))
     
         # --- Insurance Premium Analysis ---
         with col4:
             st.subheader("Average Insurance Premium by Fuel Type")
-            insurance_df = df.groupby('Fuel_Type')['Insurance_Premium'].mean().reset_index()
-            insurance_df['Insurance_Premium'] = insurance_df['Insurance_Premium'].round(3)
-    
-            if value_type == "Show as Percentage":
-                total = insurance_df['Insurance_Premium'].sum()
-                insurance_df['Percentage'] = (insurance_df['Insurance_Premium'] / total) * 100
-                insurance_df['Percentage'] = insurance_df['Percentage'].round(3)
-    
-                fig_insurance = px.pie(
-                    insurance_df,
-                    names='Fuel_Type',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Insurance Premium by Fuel Type (%)'
-                )
-                fig_insurance.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.3%}')
-            else:
-                fig_insurance = px.bar(
-                    insurance_df,
-                    x='Fuel_Type',
-                    y='Insurance_Premium',
-                    color='Fuel_Type',
-                    text='Insurance_Premium',
-                    title='Insurance Premium by Fuel Type (Count)'
-                )
-                fig_insurance.update_traces(textangle=0)
-    
-            st.plotly_chart(fig_insurance, use_container_width=True)
+            show_chart(analytics.premium_by_fuel_chart(source, percentage))
     
     
     # =============================== #
@@ -516,22 +513,10 @@ def vehicle_eda_page():
     # =============================== #
     
     if selected_filter == "All" or selected_filter == "Reported Issue and Risk Analysis":
-        st.header("📊 Key Performance Indicators")
-    
-        # --- KPIs from Image & Additional ---
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            percent_reported_issues = round((df[df['Reported_Issues'] > 0].shape[0] / df.shape[0]), 2)
-            st.metric("% Vehicles with Reported Issues", f"{percent_reported_issues * 100:.2f}%")
-        with col2:
-            percent_accident = round((df[df['Accident_History'] > 0].shape[0] / df.shape[0]), 2)
-            st.metric("% Vehicles with Accident History", f"{percent_accident * 100:.2f}%")
-        with col3:
-            percent_both = round((df[(df['Reported_Issues'] > 0) & (df['Accident_History'] > 0)].shape[0] / df.shape[0]), 2)
-            st.metric("% Vehicles with Both Issues & Accidents", f"{percent_both * 100:.2f}%")
-        with col4:
-            std_fuel_eff = round(df['Fuel_Efficiency'].std(), 2)
-            st.metric("STDEV of Fuel Efficiency", std_fuel_eff)
+        enter_section("Reported Issue and Risk Analysis")
+        with span("kpi", "Reported Issue and Risk Analysis KPIs"):
+            st.header("📊 Key Performance Indicators")
+            show_kpis(analytics.issue_risk_kpis(source))
     
         # -------------------------- #
         st.header("⚠️ Reported Issue and Risk Analysis")
@@ -540,125 +525,54 @@ def vehicle_eda_page():
         # -------------------------- #
         with col1:
             st.subheader("Average Insurance Premium by Reported Issue Count")
-            premium_df = df.groupby('Reported_Issues')['Insurance_Premium'].mean().reset_index()
-            premium_df['Insurance_Premium'] = premium_df['Insurance_Premium'].round(3)
-    
-            if value_type == "Show as Percentage":
-                total = premium_df['Insurance_Premium'].sum()
-                premium_df['Percentage'] = (premium_df['Insurance_Premium'] / total) * 100
-                premium_df['Percentage'] = premium_df['Percentage'].round(3)
-                fig_premium = px.pie(
-                    premium_df,
-                    names='Reported_Issues',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Avg Insurance Premium by Issue Count (%)'
-                )
-                fig_premium.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.2f}%')
-            else:
-                fig_premium = px.bar(
-                    premium_df,
-                    x='Reported_Issues',
-                    y='Insurance_Premium',
-                    text='Insurance_Premium',
-                    title='Avg Insurance Premium by Issue Count'
-                )
-                fig_premium.update_traces(textangle=0)
-    
-            st.plotly_chart(fig_premium, use_container_width=True)
+            show_chart(analytics.premium_by_issues_chart(source, percentage))
     
         # -------------------------- #
         with col2:
             st.subheader("Reported Issue Count by Vehicle Model")
-            model_df = df.groupby('Vehicle_Model')['Reported_Issues'].sum().reset_index()
-            model_df['Reported_Issues'] = model_df['Reported_Issues'].round(3)
-    
-            if value_type == "Show as Percentage":
-                total = model_df['Reported_Issues'].sum()
-                model_df['Percentage'] = (model_df['Reported_Issues'] / total) * 100
-                model_df['Percentage'] = model_df['Percentage'].round(3)
-                fig_model = px.pie(
-                    model_df,
-                    names='Vehicle_Model',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Reported Issues by Vehicle Model (%)'
-                )
-                fig_model.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.2f}%')
-            else:
-                fig_model = px.bar(
-                    model_df,
-                    x='Vehicle_Model',
-                    y='Reported_Issues',
-                    text='Reported_Issues',
-                    title='Reported Issues by Vehicle Model'
-                )
-                fig_model.update_traces(textangle=0)
-    
-            st.plotly_chart(fig_model, use_container_width=True)
+            show_chart(analytics.issues_by_model_chart(source, percentage))
     
         # -------------------------- #
         col3, col4 = st.columns(2)
         with col3:
             st.subheader("Accident History vs Vehicle Age")
-            age_df = df.groupby('Vehicle_Age')['Accident_History'].mean().reset_index()
-            age_df['Accident_History'] = age_df['Accident_History'].round(3)
-        
-            if value_type == "Show as Percentage":
-                total = age_df['Accident_History'].sum()
-                age_df['Percentage'] = (age_df['Accident_History'] / total) * 100
-                age_df['Percentage'] = age_df['Percentage'].round(3)
-        
-                fig_age = px.pie(
-                    age_df,
-                    names='Vehicle_Age',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Average Accident History by Vehicle Age (%)'
-                )
-                fig_age.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.2f}%')
-            else:
-                fig_age = px.bar(
-                    age_df,
-                    x='Vehicle_Age',
-                    y='Accident_History',
-                    text='Accident_History',
-                    title='Average Accident History by Vehicle Age'
-                )
-                fig_age.update_traces(textangle=0)
-        
-            st.plotly_chart(fig_age, use_container_width=True)
+            show_chart(analytics.accidents_by_age_chart(source, percentage))
     
         # -------------------------- #
         with col4:
             st.subheader("Engine Size Distribution")
-            engine_df = df['Engine_Size'].value_counts().reset_index()
-            engine_df.columns = ['Engine_Size', 'Count']
-            engine_df['Count'] = engine_df['Count'].round(3)
-    
-            if value_type == "Show as Percentage":
-                total = engine_df['Count'].sum()
-                engine_df['Percentage'] = (engine_df['Count'] / total) * 100
-                engine_df['Percentage'] = engine_df['Percentage'].round(3)
-                fig_engine = px.pie(
-                    engine_df,
-                    names='Engine_Size',
-                    values='Percentage',
-                    hole=0.4,
-                    title='Engine Size Distribution (%)'
-                )
-                fig_engine.update_traces(textinfo='label+percent', hovertemplate='%{label}: %{percent:.2f}%')
-            else:
-                fig_engine = px.bar(
-                    engine_df,
-                    x='Engine_Size',
-                    y='Count',
-                    text='Count',
-                    title='Engine Size Distribution'
-                )
-                fig_engine.update_traces(textangle=0)
+            show_chart(analytics.engine_size_chart(source, percentage))
+    
+        # -------------------------- #
+        st.header("🚨 Risk Watchlist")
+        with span("kpi", "Risk Watchlist KPIs"):
+            show_kpis(analytics.risk_watchlist_kpis(source))
+    
+        col5, col6 = st.columns([1, 2])
+        with col5:
+            st.subheader("Risk Score Distribution")
+            show_chart(analytics.risk_band_chart(source, percentage))
     
-            st.plotly_chart(fig_engine, use_container_width=True)
+        with col6:
+            st.subheader("Highest-Risk Vehicles")
+            watchlist_size = st.select_slider(
+                "Watchlist size", [10, 25, 50, 100, 250, 500], value=WATCHLIST_SIZE, key="watchlist_size"
+            )
+            watch_columns = ['Vehicle_Model'] + [c for c in RISK_COLUMNS if c in source.columns] + ['Need_Maintenance']
+            watchlist = source.watchlist(watchlist_size, [c for c in watch_columns if c in source.columns])
+            st.dataframe(
+                watchlist,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    'Risk_Score': st.column_config.ProgressColumn("Risk Score", min_value=0, max_value=100, format="%.1f"),
+                    'Mean_Time_Between_Failures': st.column_config.NumberColumn("MTBF (km)", format="%.0f"),
+                }
+            )
+            st.caption(
+                "Score 0-100 from reported issues, accidents, tire/brake/battery condition, age and MTBF (see risk.py)."
+                + (" Computed on a random sample of rows." if source.load_mode == "sampled" else "")
+            )
     
     
     
@@ -668,184 +582,40 @@ def vehicle_eda_page():
     
     # --- KPIs Filter and Section ---
     if selected_filter == "All" or selected_filter == "Descriptive Analysis":
-        st.header("📊 Key Performance Indicators")
-    
-        # Calculate the KPIs
-        total_vehicles = df['Vehicle_Model'].nunique()
-        avg_fuel_efficiency = round(df['Fuel_Efficiency'].mean(), 3)
-        avg_accident_history = round(df['Accident_History'].mean(), 3)
-        avg_mileage = round(df['Mileage'].mean(), 3)
-        avg_reported_issues = round(df['Reported_Issues'].mean(), 3)
-    
-        # Display the KPIs
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            st.metric("Total Vehicles", total_vehicles)
-        with col2:
-            st.metric("Average Fuel Efficiency", avg_fuel_efficiency)
-        with col3:
-            st.metric("Average Accident History", avg_accident_history)
-        with col4:
-            st.metric("Average Mileage", avg_mileage)
-        with col5:
-            st.metric("Average Reported Issues", avg_reported_issues)
+        enter_section("Descriptive Analysis")
+        with span("kpi", "Descriptive Analysis KPIs"):
+            st.header("📊 Key Performance Indicators")
+            show_kpis(analytics.descriptive_kpis(source))
     
     # --- Descriptive Analysis Section ---
     if selected_filter == "All" or selected_filter == "Descriptive Analysis":
+        enter_section("Descriptive Analysis")
         st.header("📊 Descriptive Analysis")
     
-        import plotly.graph_objects as go
-    
         # --- Mileage Consumption by Vehicle Model and Owner Type ---
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Mileage Consumption by Vehicle Model and Owner Type")
-            df['Mileage'] = pd.to_numeric(df['Mileage'], errors='coerce')
-            mileage_summary = df.groupby(['Vehicle_Model', 'Owner_Type'])['Mileage'].mean().reset_index()
-            mileage_summary = mileage_summary.sort_values(by='Mileage', ascending=False)
-    
-            if value_type == "Show as Count":
-                mileage_summary['Mileage'] = mileage_summary['Mileage'].round(3)
-                fig_mileage = px.bar(
-                    mileage_summary,
-                    x='Vehicle_Model',
-                    y='Mileage',
-                    color='Owner_Type',
-                    title='Avg Mileage by Vehicle Model & Owner Type (Count)',
-                    labels={'Mileage': 'Avg Mileage (km)', 'Vehicle_Model': 'Vehicle Model'},
-                    hover_data=['Mileage']
-                )
-            else:
-                mileage_summary['Mileage_Percentage'] = (mileage_summary['Mileage'] / mileage_summary['Mileage'].max()) * 100
-                fig_mileage = px.pie(
-                    mileage_summary,
-                    names='Vehicle_Model',
-                    values='Mileage_Percentage',
-                    title='Mileage by Vehicle Model (Percentage)',
-                    hole=0.4
-                )
-            for data in fig_mileage.data:
-                if isinstance(data, go.Bar):
-                    data.update(text=data.y, textposition='outside')
-            st.plotly_chart(fig_mileage, use_container_width=True)
+            show_chart(analytics.mileage_by_model_owner_chart(source, percentage))
     
         with col2:
             st.subheader("Maintenance Frequency by Vehicle Model")
-            maintenance_freq = df.groupby('Vehicle_Model').size().reset_index(name='Maintenance_Count')
-            maintenance_freq = maintenance_freq.sort_values(by='Maintenance_Count', ascending=False)
-    
-            if value_type == "Show as Count":
-                maintenance_freq['Maintenance_Count'] = maintenance_freq['Maintenance_Count'].round(3)
-                fig_maintenance = px.bar(
-                    maintenance_freq.head(10),
-                    x='Vehicle_Model',
-                    y='Maintenance_Count',
-                    title='Vehicle Models by Maintenance Count',
-                    labels={'Maintenance_Count': 'Maintenance Count', 'Vehicle_Model': 'Vehicle Model'},
-                    hover_data=['Maintenance_Count'],
-                    color='Vehicle_Model'
-                )
-            else:
-                maintenance_freq['Maintenance_Percentage'] = round((maintenance_freq['Maintenance_Count'] / maintenance_freq['Maintenance_Count'].sum()) * 100, 3)
-                fig_maintenance = px.pie(
-                    maintenance_freq.head(10),
-                    names='Vehicle_Model',
-                    values='Maintenance_Percentage',
-                    title='Vehicle Models by Maintenance (%)',
-                    hole=0.4
-                )
-            for data in fig_maintenance.data:
-                if isinstance(data, go.Bar):
-                    data.update(text=data.y, textposition='outside')
-            st.plotly_chart(fig_maintenance, use_container_width=True)
+            show_chart(analytics.maintenance_frequency_chart(source, percentage))
     
         # --- Accident-Prone & Age vs Maintenance Charts Side-by-Side ---
         col3, col4 = st.columns(2)
     
         with col3:
             st.subheader("Accident-Prone Vehicle Identification")
-            accident_prone = df.groupby('Vehicle_Model')['Accident_History'].mean().sort_values(ascending=False).reset_index()
-    
-            if value_type == "Show as Percentage":
-                accident_prone['Accident_Percentage'] = round((accident_prone['Accident_History'] / accident_prone['Accident_History'].max()) * 100, 3)
-                fig_accident = px.pie(
-                    accident_prone.head(10),
-                    names='Vehicle_Model',
-                    values='Accident_Percentage',
-                    title='Vehcile Models by Accident History (%)',
-                    hole=0.4
-                )
-            else:
-                accident_prone['Accident_History'] = accident_prone['Accident_History'].round(3)
-                fig_accident = px.bar(
-                    accident_prone.head(10),
-                    x='Vehicle_Model',
-                    y='Accident_History',
-                    title='Vehicle Models by Avg Accident History (Count)',
-                    color='Vehicle_Model'
-                )
-            for data in fig_accident.data:
-                if isinstance(data, go.Bar):
-                    data.update(text=data.y, textposition='outside')
-            st.plotly_chart(fig_accident, use_container_width=True)
+            show_chart(analytics.accident_prone_chart(source, percentage))
     
         with col4:
             st.subheader("Vehicle Age vs Maintenance Count")
-            age_vs_maintenance = df.groupby('Vehicle_Age').size().reset_index(name='Maintenance_Count').sort_values('Vehicle_Age')
-    
-            if value_type == "Show as Percentage":
-                age_vs_maintenance['Maintenance_Percentage'] = round((age_vs_maintenance['Maintenance_Count'] / age_vs_maintenance['Maintenance_Count'].max()) * 100, 3)
-                fig_age = px.pie(
-                    age_vs_maintenance,
-                    names='Vehicle_Age',
-                    values='Maintenance_Percentage',
-                    title='Maintenance by Age (Percentage)',
-                    hole=0.4
-                )
-            else:
-                age_vs_maintenance['Maintenance_Count'] = age_vs_maintenance['Maintenance_Count'].round(3)
-                fig_age = px.bar(
-                    age_vs_maintenance,
-                    x='Vehicle_Age',
-                    y='Maintenance_Count',
-                    title='Maintenance Count by Age (Count)',
-                    color='Vehicle_Age'
-                )
-            for data in fig_age.data:
-                if isinstance(data, go.Bar):
-                    data.update(text=data.y, textposition='outside')
-            st.plotly_chart(fig_age, use_container_width=True)
+            show_chart(analytics.age_maintenance_chart(source, percentage))
     
         # --- Issue Pattern Detection ---
         st.subheader("Issue Pattern Detection by Vehicle Model")
-        issue_pattern = df.groupby(['Vehicle_Model', 'Reported_Issues']).size().reset_index(name='Issue_Count')
-        top_models = issue_pattern.groupby('Vehicle_Model')['Issue_Count'].sum().sort_values(ascending=False).head(10).index
-        filtered_issue_pattern = issue_pattern[issue_pattern['Vehicle_Model'].isin(top_models)]
-    
-        if value_type == "Show as Count":
-            filtered_issue_pattern['Issue_Count'] = filtered_issue_pattern['Issue_Count'].round(3)
-            fig_issue = px.bar(
-                filtered_issue_pattern,
-                x='Vehicle_Model',
-                y='Issue_Count',
-                color='Reported_Issues',
-                title="Issue Pattern by Vehicle Model (Count)",
-                labels={'Issue_Count': 'Issue Count', 'Vehicle_Model': 'Vehicle Model'},
-                hover_data=['Issue_Count']
-            )
-        else:
-            filtered_issue_pattern['Issue_Percentage'] = round((filtered_issue_pattern['Issue_Count'] / filtered_issue_pattern['Issue_Count'].sum()) * 100, 3)
-            fig_issue = px.pie(
-                filtered_issue_pattern,
-                names='Vehicle_Model',
-                values='Issue_Percentage',
-                title="Issue Pattern by Vehicle Model (Percentage)",
-                hole=0.4
-            )
-        for data in fig_issue.data:
-            if isinstance(data, go.Bar):
-                data.update(text=data.y, textposition='outside')
-        st.plotly_chart(fig_issue, use_container_width=True)
+        show_chart(analytics.issue_pattern_chart(source, percentage))
     
         # --- Vehicle Part Condition Overview (Final Row with 3 Charts) ---
         st.subheader("Vehicle Part Condition Overview")
@@ -858,31 +628,7 @@ def vehicle_eda_page():
         col_tire, col_brake, col_battery = st.columns(3)
     
         for part, title, col in zip(part_conditions.keys(), part_conditions.values(), [col_tire, col_brake, col_battery]):
-            condition_counts = df[part].value_counts().reset_index()
-            condition_counts.columns = [part, 'Count']
-    
-            if value_type == "Show as Percentage":
-                condition_counts['Percentage'] = round((condition_counts['Count'] / condition_counts['Count'].sum()) * 100, 3)
-                fig_part = px.pie(
-                    condition_counts,
-                    names=part,
-                    values='Percentage',
-                    title=f'{title} (Percentage)',
-                    hole=0.4
-                )
-            else:
-                condition_counts['Count'] = condition_counts['Count'].round(3)
-                fig_part = px.bar(
-                    condition_counts,
-                    x=part,
-                    y='Count',
-                    title=f'{title} (Count)',
-                    color=part
-                )
-            for data in fig_part.data:
-                if isinstance(data, go.Bar):
-                    data.update(text=data.y, textposition='outside')
-            col.plotly_chart(fig_part, use_container_width=True)
+            show_chart(analytics.part_condition_chart(source, part, title, percentage), col)
     
     # =============================== #
     # Diagnostic Analysis
@@ -890,205 +636,195 @@ def vehicle_eda_page():
     
     # --- KPI Section ---
     if selected_filter == "All" or selected_filter == "Diagnostic Analysis":
-        st.header("📊 Key Performance Indicators")
-    
-        #Calculate KPIs
-        vehicle_count = len(df)
-    
-        df['Mean_Time_Between_Failures'] = df['Mileage'] / (df['Reported_Issues'] + 1)
-        mtbf = round(df['Mean_Time_Between_Failures'].mean(), 2)
-    
-        maintenance_rate = round((df[df['Need_Maintenance'] == 'Yes'].shape[0] / len(df)) * 100, 3)
-    
-        recurrent_issue_rate = round((df[df['Reported_Issues'] > 1].shape[0] / len(df)) * 100, 3)
-    
-        avg_mileage = round(df['Mileage'].mean(), 2)
-    
-        col1, col2, col3, col4, col5 = st.columns(5)
-        with col1:
-            st.metric("Vehicle Count", vehicle_count)
-        with col2:
-            st.metric("MTBF (km)", mtbf)
-        with col3:
-            st.metric("% Maintenance Rate", f"{maintenance_rate}%")
-        with col4:
-            st.metric("Avg Mileage", avg_mileage)
-        with col5:
-            st.metric("% Recurrent Issues", f"{recurrent_issue_rate}%")
+        enter_section("Diagnostic Analysis")
+        with span("kpi", "Diagnostic Analysis KPIs"):
+            st.header("📊 Key Performance Indicators")
+            show_kpis(analytics.diagnostic_kpis(source))
     
     
     # --- Diagnostic Analysis Section ---
     if selected_filter == "All" or selected_filter == "Diagnostic Analysis":
+        enter_section("Diagnostic Analysis")
         st.header("🔍 Diagnostic Analysis")
     
         # --- Avg Insurance Premium by Maintenance History ---
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Avg Insurance Premium by Maintenance History")
-            df['Insurance_Premium'] = pd.to_numeric(df['Insurance_Premium'], errors='coerce')
-            premium_df = df.groupby('Maintenance_History')['Insurance_Premium'].mean().reset_index()
-    
-            if value_type == "Show as Count":
-                premium_df['Insurance_Premium'] = premium_df['Insurance_Premium'].round(3)
-                fig1 = px.bar(
-                    premium_df, 
-                    x='Maintenance_History', 
-                    y='Insurance_Premium',
-                    color='Maintenance_History',
-                    title='Avg Insurance Premium by Maintenance History (Count)',
-                    labels={'Insurance_Premium': 'Avg Premium', 'Maintenance_History': 'Maintenance History'},
-                    hover_data=['Insurance_Premium']
-                )
-                for trace in fig1.data:
-                    trace.update(text=trace.y, textposition='outside', textangle=0, texttemplate='%{text:.3f}')
-                st.plotly_chart(fig1, use_container_width=True)
-            else:
-                premium_df['Insurance_Premium_Percentage'] = (premium_df['Insurance_Premium'] / premium_df['Insurance_Premium'].max()) * 100
-                premium_df['Insurance_Premium_Percentage'] = premium_df['Insurance_Premium_Percentage'].round(3)
-                fig1_pie = px.pie(
-                    premium_df, 
-                    names='Maintenance_History', 
-                    values='Insurance_Premium_Percentage',
-                    title='Avg Insurance Premium by Maintenance History (Percentage)', 
-                    hole=0.4
-                )
-                fig1_pie.update_traces(textinfo='percent+label')
-                st.plotly_chart(fig1_pie, use_container_width=True)
+            show_chart(analytics.premium_by_history_chart(source, percentage))
     
         # --- Reported Issues Count ---
         with col2:
             st.subheader("Reported Issues Count")
-            issue_df = df['Reported_Issues'].value_counts().reset_index()
-            issue_df.columns = ['Reported_Issues', 'Count']
-    
-            if value_type == "Show as Count":
-                issue_df['Count'] = issue_df['Count'].round(3)
-                fig2 = px.bar(
-                    issue_df, 
-                    x='Reported_Issues', 
-                    y='Count',
-                    title='Reported Issues Distribution (Count)', 
-                    labels={'Count': 'Reported Issues Count', 'Reported_Issues': 'Reported Issues'},
-                    hover_data=['Count']
-                )
-                for trace in fig2.data:
-                    trace.update(text=trace.y, textposition='outside', textangle=0, texttemplate='%{text:.3f}')
-                st.plotly_chart(fig2, use_container_width=True)
-            else:
-                issue_df['Percentage'] = (issue_df['Count'] / issue_df['Count'].sum()) * 100
-                issue_df['Percentage'] = issue_df['Percentage'].round(3)
-                fig2_pie = px.pie(
-                    issue_df, 
-                    names='Reported_Issues', 
-                    values='Percentage',
-                    title='Reported Issues Distribution (Percentage)', 
-                    hole=0.4, 
-                    color='Reported_Issues', 
-                    labels={'Percentage': 'Reported Issues (%)'}
-                )
-                fig2_pie.update_traces(textinfo='percent+label', pull=[0.1] * len(issue_df))
-                st.plotly_chart(fig2_pie, use_container_width=True)
+            show_chart(analytics.reported_issues_chart(source, percentage))
     
         # --- Mileage by Vehicle Model & Owner Type ---
         col3_new, col4_new = st.columns(2)
     
         with col3_new:
             st.subheader("Mileage by Vehicle Model & Owner Type")
-            mileage_df = df.groupby(['Vehicle_Model', 'Owner_Type'])['Mileage'].mean().reset_index()
-    
-            if value_type == "Show as Count":
-                mileage_df['Mileage'] = mileage_df['Mileage'].round(3)
-                fig_mileage = px.bar(
-                    mileage_df,
-                    x='Vehicle_Model',
-                    y='Mileage',
-                    color='Owner_Type',
-                    title='Avg Mileage by Vehicle Model & Owner Type (Count)',
-                    labels={'Mileage': 'Avg Mileage (km)', 'Vehicle_Model': 'Vehicle Model'},
-                    hover_data=['Mileage']
-                )
-                for trace in fig_mileage.data:
-                    trace.update(text=trace.y, textposition='outside', textangle=0, texttemplate='%{text:.3f}')
-                st.plotly_chart(fig_mileage, use_container_width=True)
-            else:
-                mileage_df['Mileage_Percentage'] = (mileage_df['Mileage'] / mileage_df['Mileage'].max()) * 100
-                mileage_df['Mileage_Percentage'] = mileage_df['Mileage_Percentage'].round(3)
-                fig_mileage_pie = px.pie(
-                    mileage_df,
-                    names='Vehicle_Model',
-                    values='Mileage_Percentage',
-                    title='Mileage by Vehicle Model (Percentage)',
-                    hole=0.4
-                )
-                fig_mileage_pie.update_traces(textinfo='percent+label')
-                st.plotly_chart(fig_mileage_pie, use_container_width=True)
+            show_chart(analytics.diagnostic_mileage_chart(source, percentage))
     
         with col4_new:
             st.subheader("Maintenance Frequency by Vehicle Model")
-            maintenance_freq = df.groupby('Vehicle_Model').size().reset_index(name='Maintenance_Count')
-            maintenance_freq = maintenance_freq.sort_values(by='Maintenance_Count', ascending=False)
-    
-            if value_type == "Show as Count":
-                maintenance_freq['Maintenance_Count'] = maintenance_freq['Maintenance_Count'].round(3)
-                fig_maintenance = px.bar(
-                    maintenance_freq.head(10),
-                    x='Vehicle_Model',
-                    y='Maintenance_Count',
-                    title='Vehicle Models by Maintenance Count',
-                    labels={'Maintenance_Count': 'Maintenance Count', 'Vehicle_Model': 'Vehicle Model'},
-                    hover_data=['Maintenance_Count'],
-                    color='Vehicle_Model'
-                )
-                for trace in fig_maintenance.data:
-                    trace.update(text=trace.y, textposition='outside', textangle=0, texttemplate='%{text:.3f}')
-                st.plotly_chart(fig_maintenance, use_container_width=True)
-            else:
-                maintenance_freq['Maintenance_Percentage'] = (maintenance_freq['Maintenance_Count'] / maintenance_freq['Maintenance_Count'].sum()) * 100
-                maintenance_freq['Maintenance_Percentage'] = maintenance_freq['Maintenance_Percentage'].round(3)
-                fig_maintenance_pie = px.pie(
-                    maintenance_freq.head(10),
-                    names='Vehicle_Model',
-                    values='Maintenance_Percentage',
-                    title='Vehicle Models by Maintenance (%)',
-                    hole=0.4
-                )
-                fig_maintenance_pie.update_traces(textinfo='percent+label')
-                st.plotly_chart(fig_maintenance_pie, use_container_width=True)
+            show_chart(analytics.diagnostic_maintenance_chart(source, percentage))
     
         st.subheader("Fuel Inefficiency Triggers")
-        df['Fuel_Efficiency'] = pd.to_numeric(df['Fuel_Efficiency'], errors='coerce')
-        fuel_df = df.groupby(['Tire_Condition', 'Engine_Size'])['Fuel_Efficiency'].mean().reset_index()
-    
-        if value_type == "Show as Count":
-            fuel_df['Fuel_Efficiency'] = fuel_df['Fuel_Efficiency'].round(3)
-            fig3 = px.bar(
-                fuel_df, 
-                x='Tire_Condition', 
-                y='Fuel_Efficiency', 
-                color='Engine_Size',
-                title='Fuel Efficiency by Tire Condition & Engine Size (Count)'
-            )
-            for trace in fig3.data:
-                trace.update(text=trace.y, textposition='outside', textangle=0, texttemplate='%{text:.3f}')
-            st.plotly_chart(fig3, use_container_width=True)
+        show_chart(analytics.fuel_triggers_chart(source, percentage))
+    
+        # --- Maintenance Drivers (correlation over numeric and one-hot categorical features) ---
+        st.header("🧭 Maintenance Drivers")
+        moments = source.moments()
+        associations = moments.association()
+    
+        col5, col6 = st.columns(2)
+        with col5:
+            st.subheader("Association with Need Maintenance")
+            show_chart(analytics.drivers_chart(associations, percentage))
+    
+        with col6:
+            st.subheader("Correlation Matrix of Top Drivers")
+            show_chart(analytics.driver_correlation_chart(moments, associations))
+    
+        with st.expander("Association and covariance tables"):
+            st.dataframe(associations.round(4), hide_index=True, use_container_width=True)
+            st.dataframe(moments.covariance().round(4), use_container_width=True)
+        st.caption(
+            f"Computed from {moments.n:,} rows"
+            + (f" ({moments.excluded:,} rows with missing values left out)" if moments.excluded else "")
+            + ". Partial coefficients are standardised coefficients of one linear model on all features together."
+        )
+    
+    # =============================== #
+    # Data Quality
+    # =============================== #
+    
+    if selected_filter == "All" or selected_filter == "Data Quality":
+        enter_section("Data Quality")
+        quality = source.quality()  # scanned at ingest, before numeric columns were coerced
+    
+        with span("kpi", "Data Quality KPIs"):
+            st.header("📊 Key Performance Indicators")
+            show_kpis(analytics.data_quality_kpis(source))
+    
+        st.header("🧪 Data Quality")
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            st.subheader("Issues by Column")
+            issues_chart = analytics.quality_issues_chart(quality, percentage)
+            if issues_chart is None:
+                st.success("No missing, non-numeric or out-of-range values.")
+            else:
+                show_chart(issues_chart)
+    
+        with col2:
+            st.subheader("Outliers")
+            show_chart(analytics.outlier_chart(quality, percentage))
+    
+        with st.expander("Data quality tables"):
+            st.dataframe(quality.columns(), hide_index=True, use_container_width=True)
+            st.dataframe(quality.outliers().round(3), hide_index=True, use_container_width=True)
+        st.caption(
+            f"IQR fences at {IQR_FENCE} × IQR beyond the quartiles; z-score outliers lie over {Z_LIMIT:g} standard deviations from the mean."
+            + (" Scanned on a random sample of rows." if source.load_mode == "sampled" else "")
+        )
+    
+    # =============================== #
+    # Snapshot Comparison (not part of "All": it loads a second dataset)
+    # =============================== #
+    
+    if selected_filter == "Snapshot Comparison":
+        enter_section("Snapshot Comparison")
+        st.header("🔁 Snapshot Comparison")
+    
+        if not SNAPSHOTS:
+            st.info(f"Set EDA_SNAPSHOTS to one or more dataset paths (separated by '{os.pathsep}') to compare against.")
         else:
-            fuel_df['Fuel_Efficiency_Percentage'] = (fuel_df['Fuel_Efficiency'] / fuel_df['Fuel_Efficiency'].max()) * 100
-            fuel_df['Fuel_Efficiency_Percentage'] = fuel_df['Fuel_Efficiency_Percentage'].round(3)
-            fig3_pie = px.pie(
-                fuel_df, 
-                names='Tire_Condition', 
-                values='Fuel_Efficiency_Percentage',
-                title='Fuel Efficiency by Tire Condition & Engine Size (Percentage)', 
-                hole=0.4
-            )
-            fig3_pie.update_traces(textinfo='percent+label')
-            st.plotly_chart(fig3_pie, use_container_width=True)
+            col1, col2 = st.columns([3, 1])
+            baseline_uri = col1.selectbox("Compare current data with:", SNAPSHOTS, key="baseline_snapshot")
+            chart_style = col2.radio("Charts:", ["Side by side", "Delta"], horizontal=True, key="comparison_style")
+            with span("data_load", baseline_uri):
+                baseline = load_data(baseline_uri)
+                baseline.refresh()
+            for action in get_governor().enforce(baseline).actions:
+                st.warning(f"Memory budget (baseline): {action}")
+            # Same partitions as the current data, for the keys the baseline is partitioned by too
+            baseline_keys = baseline.partition_values()
+            baseline = baseline.select({k: v for k, v in partition_selection.items() if k in baseline_keys})
+            with span("aggregation", "snapshot comparison"):
+                comparison = compare(source, baseline)
+            st.caption(f"Current: {DATA_SOURCE} · Baseline: {baseline_uri}")
+    
+            with span("kpi", "Snapshot Comparison KPIs"):
+                st.header("📊 Key Performance Indicators")
+                show_kpis(analytics.comparison_kpis(comparison), per_row=5)
+    
+            # Category shares: counts in count mode, percentage points in percentage mode
+            st.header("🥧 Category Shares")
+            share_columns = st.columns(2)
+            for i, chart in enumerate(analytics.share_comparison_charts(comparison, percentage, chart_style)):
+                show_chart(chart, share_columns[i % 2])
+    
+            # Group means: absolute change in count mode, relative change in percentage mode
+            st.header("📈 Group Means")
+            mean_columns = st.columns(2)
+            for i, chart in enumerate(analytics.mean_comparison_charts(comparison, percentage, chart_style)):
+                show_chart(chart, mean_columns[i % 2])
     
+# =============================== #
+# ⏱️ Performance Panel (admin only)
+# =============================== #
+def request_profile():
+    st.session_state.profile_next_rerun = True
+
+def performance_panel(timings):
+    with st.expander("⏱️ Performance (admin)"):
+        totals = ", ".join(f"{kind}: {ms:,.1f} ms" for kind, ms in timings.totals().items())
+        st.markdown(f"**Rerun:** {timings.total_ms:,.1f} ms — {totals}")
+
+        if timings.sections:
+            st.subheader("Sections")
+            st.dataframe(
+                pd.DataFrame(list(timings.sections.items()), columns=['Section', 'ms']).sort_values('ms', ascending=False),
+                hide_index=True
+            )
+
+        st.subheader("Slowest Spans")
+        spans_df = pd.DataFrame(timings.spans)
+        if not spans_df.empty:
+            st.dataframe(spans_df.sort_values('ms', ascending=False).head(50), hide_index=True)
+        st.caption(f"Structured log: {TIMING_LOG or 'disabled (set EDA_TIMING_LOG to enable)'}")
+
+        disk = get_disk_cache()
+        if disk is not None:
+            stats = disk.stats()
+            ratio = f"{stats['hit_ratio']:.0%}" if stats["hit_ratio"] is not None else "n/a"
+            st.markdown(
+                f"**Disk cache** ({DISK_CACHE_DIR}): {stats['hits']:,} hits, {stats['misses']:,} misses "
+                f"({ratio} hit ratio), {stats['writes']:,} writes, {stats['evictions']:,} evictions, "
+                f"{stats['bytes'] / MB:,.1f} of {stats['max_bytes'] / MB:,.0f} MB"
+            )
+
+        st.button("Profile a rerun (cProfile)", on_click=request_profile)
+        report = profile_report(timings)
+        if report:
+            st.code(report)
+
 # --- Session Control ---
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 
 if st.session_state.logged_in:
     vehicle_eda_page()  # Show the EDA page after successful login
+    export_panel()
+    if st.session_state.pop("drill_open", False):
+        enter_section("Drill-down")
+        drill_down_explorer()  # opened by clicking a bar; closes with the dialog
 else:
     login_page()  # Show the login page if not logged in
+
+rerun_timings = finish_rerun(TIMING_LOG)
+REGISTRY.observe_rerun(rerun_timings)
+if st.session_state.logged_in and st.session_state.get("username") == "admin":
+    performance_panel(rerun_timings)
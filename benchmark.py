@@ -0,0 +1,181 @@
+"""Scaling benchmark for the vehicle maintenance dashboard.
+
+For each dataset size, writes a synthetic CSV (see synthetic_data.py) and runs
+app.py headlessly in a fresh process with Streamlit's AppTest on the "All"
+view.  The rerun timing log (instrumentation.py) supplies the time spent in
+`load_data()` and in every section of `vehicle_eda_page()`; each process also
+reports its peak RSS.  Results are appended as JSON lines tagged with the git
+revision, so runs from two versions can be compared:
+
+    python benchmark.py --sizes 10k 100k 1M 10M 50M
+    python benchmark.py --compare bench_baseline.jsonl bench_results.jsonl
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_data import parse_rows, write_csv
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+DEFAULT_SIZES = ["10k", "100k", "1M", "10M", "50M"]
+DEFAULT_OUTPUT = "bench_results.jsonl"
+DEFAULT_DATA_DIR = "bench_data"
+
+# Metrics compared between runs; a section is compared by its warm-rerun time
+COMPARED = ("load_ms", "cold_ms", "warm_ms", "peak_rss_bytes")
+
+
+def git_revision():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=ROOT).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return revision + ("-dirty" if dirty else "")
+
+
+def dataset_path(data_dir, size, seed):
+    """Synthetic CSV for `size` rows, generated once and reused across runs."""
+    rows = parse_rows(size)
+    path = os.path.join(data_dir, f"fleet_{rows}_s{seed}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {rows:,} rows -> {path}", file=sys.stderr)
+        write_csv(path, rows, seed)
+    return path
+
+
+def measure(csv_path, repeat, engine, timeout):
+    """Run app.py on `csv_path` in this process and return one result record.
+
+    Must run in a fresh interpreter: the app's caches and the peak RSS are
+    process-wide.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    from memory_governor import peak_rss
+
+    with tempfile.TemporaryDirectory() as tmp:
+        timing_log = os.path.join(tmp, "timings.jsonl")
+        os.environ.update(
+            EDA_DATA_SOURCE=csv_path, EDA_ENGINE=engine, EDA_TIMING_LOG=timing_log, EDA_METRICS_PORT="0",
+            EDA_DISK_CACHE_DIR=os.path.join(tmp, "cache"),  # an empty disk cache keeps the cold rerun cold
+        )
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        at.session_state["logged_in"] = True
+        at.session_state["username"] = "benchmark"
+        for _ in range(1 + repeat):
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"app.py raised: {at.exception[0].value}")
+        with open(timing_log, encoding="utf-8") as log:
+            reruns = [json.loads(line) for line in log]
+
+    cold, warm = reruns[0], reruns[1:] or reruns[:1]
+    load_ms = sum(s["ms"] for s in cold["spans"] if s["kind"] == "dataset_load")
+    return dict(
+        engine=engine,
+        load_mode=cold.get("load_mode"),
+        csv_bytes=os.path.getsize(csv_path),
+        load_ms=round(load_ms, 3),
+        cold_ms=cold["total_ms"],
+        warm_ms=round(statistics.median(r["total_ms"] for r in warm), 3),
+        sections_cold=cold["sections"],
+        sections_warm={
+            name: round(statistics.median(r["sections"].get(name, 0.0) for r in warm), 3)
+            for name in cold["sections"]
+        },
+        totals_cold=cold["totals"],
+        peak_rss_bytes=peak_rss(),
+    )
+
+
+def run_size(size, args):
+    csv_path = dataset_path(args.data_dir, size, args.seed)
+    env = dict(os.environ)
+    if args.memory_budget_mb is not None:
+        env["EDA_MEMORY_BUDGET_MB"] = str(args.memory_budget_mb)
+    command = [
+        sys.executable, os.path.abspath(__file__), "--measure", csv_path,
+        "--repeat", str(args.repeat), "--engine", args.engine, "--timeout", str(args.timeout),
+    ]
+    done = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    if done.returncode != 0:
+        raise RuntimeError(f"benchmark of {size} rows failed:\n{done.stderr}")
+    record = json.loads(done.stdout.strip().splitlines()[-1])
+    record.update(rows=parse_rows(size))
+    return record
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as results:
+        return [json.loads(line) for line in results if line.strip()]
+
+
+def compare(baseline_path, candidate_path, threshold):
+    """Print per-size ratios candidate/baseline; return the number of regressions above `threshold`."""
+    latest = lambda records: {(r["rows"], r["engine"]): r for r in records}
+    baseline, candidate = latest(load_results(baseline_path)), latest(load_results(candidate_path))
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        old, new = baseline[key], candidate[key]
+        print(f"\n{key[0]:,} rows ({key[1]}): {old['version']} -> {new['version']}")
+        pairs = [(metric, old[metric], new[metric]) for metric in COMPARED]
+        pairs += [
+            (f"section: {name}", ms, new["sections_warm"].get(name))
+            for name, ms in old["sections_warm"].items()
+        ]
+        for metric, before, after in pairs:
+            if not before or after is None:
+                continue
+            ratio = after / before
+            flag = "  REGRESSION" if ratio > 1 + threshold else ""
+            regressions += bool(flag)
+            print(f"  {metric:<55} {before:>14,.1f} {after:>14,.1f} {ratio:>7.2f}x{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark app.py against synthetic datasets")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="row counts, e.g. 10k 1M 50M")
+    parser.add_argument("--repeat", type=int, default=3, help="warm reruns after the cold one")
+    parser.add_argument("--engine", default="pandas", choices=["pandas", "arrow"])
+    parser.add_argument("--memory-budget-mb", type=int, help="override EDA_MEMORY_BUDGET_MB (0 disables)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--timeout", type=float, default=3600, help="seconds allowed per rerun")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"))
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown ratio reported as a regression")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.repeat, args.engine, args.timeout)))
+    elif args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    else:
+        version = git_revision()
+        with open(args.output, "a", encoding="utf-8") as output:
+            for size in args.sizes:
+                record = dict(
+                    version=version, ts=time.time(), python=platform.python_version(),
+                    machine=platform.machine(), **run_size(size, args),
+                )
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                print(
+                    f"{record['rows']:>12,} rows  load {record['load_ms']:>10,.0f} ms  "
+                    f"cold {record['cold_ms']:>10,.0f} ms  warm {record['warm_ms']:>9,.0f} ms  "
+                    f"peak {record['peak_rss_bytes'] / 2**20:>8,.0f} MiB  ({record['load_mode']})"
+                )
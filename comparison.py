@@ -0,0 +1,131 @@
+"""Snapshot comparison for the vehicle maintenance dashboard.
+
+Compares two versions of the fleet dataset (say this month's export against
+last month's) on the aggregates behind the page's charts: headline KPIs,
+category shares and group means.  Each version stays its own `DataSource`;
+their aggregates are computed independently, both sources in parallel, and
+land in each source's memo.  Comparison frames are then joined from those
+small cached results, so switching views never concatenates or rescans the
+raw rows:
+
+    comparison = compare(current, baseline)
+    comparison.kpis                          # KPI, Current, Baseline, Delta
+    comparison.shares["Fuel_Type"]           # Fuel_Type, Current, Baseline, Delta (and counts)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+# Category columns whose value shares the page charts
+SHARE_COLUMNS = [
+    "Owner_Type", "Fuel_Type", "Transmission_Type", "Vehicle_Model", "Need_Maintenance",
+    "Tire_Condition", "Brake_Condition", "Battery_Status", "Reported_Issues", "Engine_Size",
+]
+# (group-by columns, averaged column) of the page's group-mean charts
+MEAN_GROUPS = [
+    (["Tire_Condition"], "Fuel_Efficiency"),
+    (["Fuel_Type", "Transmission_Type"], "Fuel_Efficiency"),
+    (["Engine_Size"], "Fuel_Efficiency"),
+    (["Fuel_Type"], "Insurance_Premium"),
+    (["Reported_Issues"], "Insurance_Premium"),
+    (["Vehicle_Age"], "Accident_History"),
+    (["Vehicle_Model", "Owner_Type"], "Mileage"),
+    (["Vehicle_Model"], "Accident_History"),
+    (["Maintenance_History"], "Insurance_Premium"),
+    (["Tire_Condition", "Engine_Size"], "Fuel_Efficiency"),
+]
+# KPI label -> (function of a source, lower-is-better)
+KPIS = {
+    "Total Vehicles": (lambda s: s.row_count(), False),
+    "% Needing Maintenance": (lambda s: _percent(s, s.stat("Need_Maintenance", "sum")), True),
+    "Average Mileage": (lambda s: s.stat("Mileage", "mean"), False),
+    "Average Reported Issues": (lambda s: s.stat("Reported_Issues", "mean"), True),
+    "Average Accident History": (lambda s: s.stat("Accident_History", "mean"), True),
+    "Bad Tire Condition (%)": (lambda s: _percent(s, s.row_count([("Tire_Condition", "==", "Worn Out")])), True),
+    "Poor Brake Condition (%)": (lambda s: _percent(s, s.row_count([("Brake_Condition", "==", "Worn Out")])), True),
+    "Weak Battery (%)": (lambda s: _percent(s, s.row_count([("Battery_Status", "==", "Weak")])), True),
+    "Average Fuel Efficiency": (lambda s: s.stat("Fuel_Efficiency", "mean"), False),
+    "MTBF (km)": (lambda s: s.stat("Mean_Time_Between_Failures", "mean"), False),
+}
+
+
+def _percent(source, count):
+    rows = source.row_count()
+    return count / rows * 100 if rows else float("nan")
+
+
+@dataclass
+class Comparison:
+    """Joined current-vs-baseline frames, built from the two sources' cached aggregates."""
+
+    kpis: pd.DataFrame
+    shares: dict  # {column: frame}
+    means: dict   # {(by..., column): frame}
+
+
+def _aggregates(source):
+    """Fill `source`'s memo with every aggregate a comparison reads; returns the KPI values."""
+    columns = set(source.columns)
+    for column in SHARE_COLUMNS:
+        if column in columns:
+            source.value_counts(column)
+    for by, column in MEAN_GROUPS:
+        if column in columns and columns.issuperset(by):
+            source.group_agg(by, column, "mean")
+    values = {}
+    for label, (kpi, _) in KPIS.items():
+        try:
+            values[label] = kpi(source)
+        except KeyError:  # column missing from this version of the data
+            values[label] = float("nan")
+    return values
+
+
+def _join(current, baseline, keys, value, fill=None):
+    """Outer join on `keys`; groups missing from one side count as `fill` in the Delta (NaN when None)."""
+    merged = current.merge(baseline, on=keys, how="outer", suffixes=("_current", "_baseline"))
+    merged = merged.rename(columns={f"{value}_current": "Current", f"{value}_baseline": "Baseline"})
+    if fill is None:
+        merged["Delta"] = merged["Current"] - merged["Baseline"]
+    else:
+        merged["Delta"] = merged["Current"].fillna(fill) - merged["Baseline"].fillna(fill)
+    return merged
+
+
+def compare(current, baseline):
+    """Compare two sources; their aggregates are computed in parallel and cached by each source."""
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        current_kpis, baseline_kpis = pool.map(_aggregates, [current, baseline])
+
+    kpis = pd.DataFrame({
+        "KPI": list(KPIS),
+        "Current": [current_kpis[label] for label in KPIS],
+        "Baseline": [baseline_kpis[label] for label in KPIS],
+        "Lower_Is_Better": [lower for _, lower in KPIS.values()],
+    })
+    kpis["Delta"] = kpis["Current"] - kpis["Baseline"]
+
+    shares = {}
+    both = set(current.columns) & set(baseline.columns)
+    for column in SHARE_COLUMNS:
+        if column not in both:
+            continue
+        frames = []
+        for source in (current, baseline):
+            counts = source.value_counts(column)
+            counts["Share"] = counts["Count"] / counts["Count"].sum() * 100 if len(counts) else 0.0
+            frames.append(counts)
+        joined = _join(frames[0], frames[1], [column], "Share", fill=0)  # absent category: a 0% share
+        joined = joined.rename(columns={"Count_current": "Count", "Count_baseline": "Baseline_Count"})
+        joined["Count_Delta"] = joined["Count"].fillna(0) - joined["Baseline_Count"].fillna(0)
+        shares[column] = joined.sort_values("Current", ascending=False, na_position="last").reset_index(drop=True)
+
+    means = {}
+    for by, column in MEAN_GROUPS:
+        if column in both and both.issuperset(by):
+            means[(*by, column)] = _join(
+                current.group_agg(by, column, "mean"), baseline.group_agg(by, column, "mean"), by, column
+            )
+    return Comparison(kpis, shares, means)
@@ -0,0 +1,180 @@
+"""Ingest-time data-quality scan for the vehicle maintenance dashboard.
+
+Numeric columns that arrive as text are coerced when a dataset is loaded,
+and values that fail to parse silently become nulls.  `scan()` looks at the
+rows as read, before that coercion, and counts per column:
+
+* missing values, and values that are present but not numeric;
+* values outside the physically possible range (negative mileage, fuel
+  efficiency of zero or hundreds of km/l, ...);
+* outliers on `OUTLIER_COLUMNS` by Tukey's IQR fences and by z-score.
+
+Each chunk is summarised in one vectorised pass into a `QualityStats`, and
+stats of chunks or partitions merge by addition.  Outliers are found from
+merged per-value counts, which stay small for the integer-valued odometer
+readings and premiums, so quartiles, mean and standard deviation are exact.
+"""
+
+import json
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Inclusive bounds of plausible values; None leaves a side open
+VALID_RANGES = {
+    "Mileage": (0, None),
+    "Reported_Issues": (0, None),
+    "Vehicle_Age": (0, 50),
+    "Engine_Size": (50, 10_000),  # cc
+    "Odometer_Reading": (0, None),
+    "Insurance_Premium": (0, None),
+    "Service_History": (0, None),
+    "Accident_History": (0, None),
+    "Fuel_Efficiency": (1, 100),  # km/l
+    "Need_Maintenance": (0, 1),
+}
+OUTLIER_COLUMNS = ["Odometer_Reading", "Insurance_Premium"]
+IQR_FENCE = 1.5
+Z_LIMIT = 3.0
+CHUNK_ROWS = 500_000
+
+
+@dataclass
+class QualityStats:
+    """Mergeable counts from scanning some rows."""
+
+    rows: int = 0
+    incomplete_rows: int = 0  # rows with at least one missing, unparseable or out-of-range value
+    nulls: dict = field(default_factory=dict)
+    coercion_failures: dict = field(default_factory=dict)
+    below_range: dict = field(default_factory=dict)
+    above_range: dict = field(default_factory=dict)
+    value_counts: dict = field(default_factory=dict)  # {column: Series of counts indexed by value}
+
+    def merge(self, other):
+        add = lambda a, b: {k: a.get(k, 0) + b.get(k, 0) for k in dict.fromkeys([*a, *b])}
+        counts = {
+            column: pd.concat([self.value_counts.get(column), other.value_counts.get(column)]).groupby(level=0).sum()
+            for column in dict.fromkeys([*self.value_counts, *other.value_counts])
+        }
+        return QualityStats(
+            rows=self.rows + other.rows,
+            incomplete_rows=self.incomplete_rows + other.incomplete_rows,
+            nulls=add(self.nulls, other.nulls),
+            coercion_failures=add(self.coercion_failures, other.coercion_failures),
+            below_range=add(self.below_range, other.below_range),
+            above_range=add(self.above_range, other.above_range),
+            value_counts=counts,
+        )
+
+    def columns(self):
+        """Per-column frame: missing values, coercion failures and out-of-range values."""
+        names = list(self.nulls)
+        frame = pd.DataFrame({
+            "Column": names,
+            "Missing": [self.nulls[c] for c in names],
+            "Not_Numeric": [self.coercion_failures.get(c, 0) for c in names],
+            "Below_Range": [self.below_range.get(c, 0) for c in names],
+            "Above_Range": [self.above_range.get(c, 0) for c in names],
+        })
+        frame["Valid_Range"] = [_describe_range(VALID_RANGES.get(c)) for c in names]
+        issues = frame[["Missing", "Not_Numeric", "Below_Range", "Above_Range"]].sum(axis=1)
+        frame["Issue_Percentage"] = (issues / self.rows * 100).round(3) if self.rows else 0.0
+        return frame
+
+    def outliers(self):
+        """Per-column frame of IQR fences, mean/std and the number of values flagged by each rule."""
+        records = []
+        for column, counts in self.value_counts.items():
+            values, weights = counts.index.to_numpy(np.float64), counts.to_numpy(np.float64)
+            n = weights.sum()
+            if not n:
+                continue
+            q1, q3 = _weighted_quantile(values, weights, 0.25), _weighted_quantile(values, weights, 0.75)
+            low, high = q1 - IQR_FENCE * (q3 - q1), q3 + IQR_FENCE * (q3 - q1)
+            mean = np.average(values, weights=weights)
+            std = np.sqrt(np.sum(weights * (values - mean) ** 2) / (n - 1)) if n > 1 else 0.0
+            z_flagged = np.abs(values - mean) > Z_LIMIT * std if std else np.zeros(len(values), dtype=bool)
+            records.append(dict(
+                Column=column, Q1=q1, Q3=q3, IQR_Low=low, IQR_High=high,
+                IQR_Outliers=int(weights[(values < low) | (values > high)].sum()),
+                Mean=mean, Std=std, Z_Outliers=int(weights[z_flagged].sum()),
+            ))
+        return pd.DataFrame(records, columns=[
+            "Column", "Q1", "Q3", "IQR_Low", "IQR_High", "IQR_Outliers", "Mean", "Std", "Z_Outliers"
+        ])
+
+    def to_json(self):
+        state = {k: v for k, v in self.__dict__.items() if k != "value_counts"}
+        state["value_counts"] = {
+            column: [counts.index.tolist(), counts.tolist()] for column, counts in self.value_counts.items()
+        }
+        return json.dumps(state)
+
+    @classmethod
+    def from_json(cls, text):
+        state = json.loads(text)
+        state["value_counts"] = {
+            column: pd.Series(counts, index=values) for column, (values, counts) in state["value_counts"].items()
+        }
+        return cls(**state)
+
+
+def _describe_range(bounds):
+    if bounds is None:
+        return ""
+    low, high = bounds
+    if high is None:
+        return f"≥ {low:,}"
+    if low is None:
+        return f"≤ {high:,}"
+    return f"{low:,} to {high:,}"
+
+
+def _weighted_quantile(values, weights, q):
+    """Quantile of sorted distinct `values` with repeat counts `weights`, interpolated as pandas' default."""
+    position = q * (weights.sum() - 1)
+    ends = np.cumsum(weights) - 1  # index of the last repeat of each value in the expanded data
+    lower = np.searchsorted(ends, np.floor(position))
+    upper = np.searchsorted(ends, np.ceil(position))
+    return values[lower] + (values[upper] - values[lower]) * (position - np.floor(position))
+
+
+def scan_chunk(frame):
+    """`QualityStats` of one chunk of rows as read, before numeric coercion."""
+    missing = frame.isna()
+    for column in frame.columns[frame.dtypes == object]:
+        missing[column] |= frame[column].to_numpy() == ""  # empty text fields, as pyarrow reads them
+    problems = missing.to_numpy().copy()
+    stats = QualityStats(rows=len(frame), nulls={c: int(n) for c, n in missing.sum().items()})
+    for column, (low, high) in VALID_RANGES.items():
+        if column not in frame.columns:
+            continue
+        raw = frame[column]
+        values = pd.to_numeric(raw, errors="coerce")
+        failed = values.isna() & ~missing[column]
+        stats.coercion_failures[column] = int(failed.sum())
+        below = (values < low).to_numpy() if low is not None else np.zeros(len(frame), dtype=bool)
+        above = (values > high).to_numpy() if high is not None else np.zeros(len(frame), dtype=bool)
+        stats.below_range[column] = int(below.sum())
+        stats.above_range[column] = int(above.sum())
+        problems[:, frame.columns.get_loc(column)] |= failed.to_numpy() | below | above
+        if column in OUTLIER_COLUMNS:
+            stats.value_counts[column] = values.value_counts(sort=False).sort_index()
+    stats.incomplete_rows = int(problems.any(axis=1).sum())
+    return stats
+
+
+def scan(frames):
+    """Merged `QualityStats` of an iterable of raw chunks."""
+    total = QualityStats()
+    for frame in frames:
+        total = total.merge(scan_chunk(frame))
+    return total
+
+
+def chunks(frame, chunk_rows=CHUNK_ROWS):
+    """Split an in-memory frame into row chunks (views, not copies)."""
+    for start in range(0, max(len(frame), 1), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
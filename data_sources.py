@@ -0,0 +1,1287 @@
+"""Data-source backends for the vehicle maintenance dashboard.
+
+`vehicle_eda_page()` never touches a raw DataFrame directly; it asks a
+`DataSource` for small aggregate results (value counts, group means, filtered
+row counts, column statistics).  `PandasSource` answers from an in-memory
+frame loaded from CSV, `ArrowSource` runs the same aggregates with
+multithreaded pyarrow.compute kernels on an Arrow table, and `SQLiteSource`
+pushes every aggregate down to SQL so only the result rows reach Python.  `PartitionedSource` reads a directory of
+Hive-style CSV/Parquet partitions (``Fuel_Type=Diesel/region=north/2024-05.csv``),
+caches aggregates per partition and merges them.
+
+`DataSource.rows()` serves one page of raw rows at a time for drill-down
+views: matching rows are found through a row index (row positions per value
+of the indexed columns, plus per-column sort orders) that is built on first
+use and cached alongside the aggregates.
+
+`DataSource.watchlist()` lists the highest-risk vehicles by the per-row score
+of risk.py.  Scores are computed in one vectorised pass and cached with the
+dataset; a partitioned dataset scores and caches each partition separately, so
+partitions appended later are the only rows scored on refresh.
+
+`DataSource.moments()` summarises the numeric and one-hot categorical columns
+as mergeable moments for correlation diagnostics (see diagnostics.py); they are
+accumulated chunk by chunk, per partition in parallel, or in SQL for SQLite,
+with one-hot levels chosen once from the dataset's value counts.
+
+`DataSource.quality()` reports missing, unparseable, out-of-range and outlying
+values (see data_quality.py).  The rows are scanned as they are ingested,
+before numeric columns are coerced, and SQLite snapshots store the scan of the
+CSV they were built from.
+
+With a `DiskCache` installed by `use_disk_cache()`, small aggregate results
+are also persisted on disk, keyed by the source's `dataset_key` (the file's
+path, size and mtime, plus backend and sample fraction) and the aggregate's
+filters, so other workers on the host and later deploys reuse them.
+
+Filters are lists of ``(column, op, value)`` tuples, e.g.
+``[("Reported_Issues", ">", 0), ("Accident_History", ">", 0)]``.
+"""
+
+import argparse
+import hashlib
+import operator
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_quality import CHUNK_ROWS as QUALITY_CHUNK_ROWS, OUTLIER_COLUMNS, VALID_RANGES, QualityStats, chunks, \
+    scan, scan_chunk
+from diagnostics import CATEGORICAL_FEATURES, CHUNK_ROWS as MOMENT_CHUNK_ROWS, MAX_LEVELS, NUMERIC_FEATURES, \
+    Moments, choose_levels, empty_moments, moments_of_chunks
+from disk_cache import MISSING, private_directory, user_cache_dir
+from instrumentation import span
+from risk import BANDS, BAND_WIDTH, CONDITION_FACTORS, MTBF_FACTOR, NUMERIC_FACTORS, RISK_COLUMNS, WATCHLIST_SIZE, \
+    band_counts, risk_sql, score_columns, top_n
+
+DEFAULT_CSV = "vehicle_maintenance_data.csv"
+SQLITE_TABLE = "vehicle_maintenance"
+QUALITY_TABLE_SUFFIX = "_quality"  # one-row table holding the data-quality scan of a snapshot's CSV
+
+# Columns the page derives from the raw data; every backend exposes them.
+DERIVED_SQL = {
+    "Mean_Time_Between_Failures": '"Mileage" * 1.0 / ("Reported_Issues" + 1)',
+}
+
+# Columns the dashboard groups or filters on; indexed in SQLite snapshots.
+INDEXED_COLUMNS = [
+    "Vehicle_Model", "Owner_Type", "Fuel_Type", "Transmission_Type", "Maintenance_History",
+    "Tire_Condition", "Brake_Condition", "Battery_Status", "Need_Maintenance",
+    "Reported_Issues", "Accident_History", "Vehicle_Age", "Engine_Size",
+]
+
+# Numeric columns that may arrive as text and are coerced on load.
+NUMERIC_COLUMNS = ["Mileage", "Insurance_Premium", "Fuel_Efficiency"]
+
+# Field values read as missing: pandas' read_csv defaults, also given to pyarrow so both engines agree
+CSV_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+FILTER_OPS = {
+    "==": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+}
+SQL_OPS = {"==": "=", "!=": "!=", ">": ">", ">=": ">=", "<": "<", "<=": "<="}
+
+STATS = ("mean", "std", "sum", "count", "nunique", "mode")
+GROUP_AGGS = ("mean", "sum", "count")
+
+PARTITION_SUFFIXES = (".csv", ".parquet")
+
+# Memo kinds small enough to persist in the disk cache; row indexes and per-row scores stay in memory
+DISK_CACHED = ("rows", "counts", "group", "size", "stat", "risk_bands", "watchlist", "moments", "quality")
+CACHE_LAYOUT = 2  # bump when code changes how a cached result is computed or laid out
+# Disk cache keys carry a fingerprint of everything else a cached result depends on, so changing a
+# risk weight, a valid range or a derived column never serves results computed under the old values
+CACHE_VERSION = hashlib.sha1(repr((
+    CACHE_LAYOUT, pd.__version__, DERIVED_SQL, NUMERIC_COLUMNS,
+    NUMERIC_FACTORS, CONDITION_FACTORS, MTBF_FACTOR, BAND_WIDTH,
+    VALID_RANGES, OUTLIER_COLUMNS, NUMERIC_FEATURES, CATEGORICAL_FEATURES, MAX_LEVELS,
+)).encode()).hexdigest()[:16]
+
+
+def add_derived_columns(df):
+    """Coerce numeric columns and add the derived columns the page reports on."""
+    for column in NUMERIC_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+    if "Mileage" in df.columns and "Reported_Issues" in df.columns:
+        df["Mean_Time_Between_Failures"] = df["Mileage"] / (df["Reported_Issues"] + 1)
+    return df
+
+
+def _mode_from_counts(counts, column):
+    """Most frequent value in a value-counts frame; ties go to the smallest value, as in pandas."""
+    if counts.empty:
+        return None
+    top = counts[counts['Count'] == counts['Count'].max()]
+    return top[column].sort_values().iloc[0]
+
+
+def _nbytes(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_nbytes(value) for value in obj.values())
+    return sys.getsizeof(obj)
+
+
+def _position_dtype(n_rows):
+    """Smallest integer dtype that can hold a row position of an `n_rows` table."""
+    return np.int32 if n_rows < 2 ** 31 else np.int64
+
+
+def read_csv_sample(path, fraction, seed=0):
+    """Read a reproducible random `fraction` of a CSV's rows; skipped rows are never parsed."""
+    rng = np.random.default_rng(seed)
+    return pd.read_csv(path, skiprows=lambda i: i > 0 and rng.random() >= fraction)
+
+
+def file_signature(path):
+    """Path, size and mtime of a file: changes whenever the file is rewritten."""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def use_disk_cache(cache):
+    """Persist aggregates of every source with a `dataset_key` in `cache` (a disk_cache.DiskCache, or None)."""
+    DataSource.disk_cache = cache
+
+
+def _freeze(where):
+    return tuple(tuple(clause) for clause in where) if where else ()
+
+
+class DataSource:
+    """Aggregation interface shared by all backends.
+
+    Results are memoised per source, and callers receive copies so they can
+    add percentage columns or round values in place.
+    """
+
+    name = "base"
+    load_mode = "full"  # "full", "sampled" or "aggregate-only"; set by the memory governor
+    ingest_quality = None  # data_quality.QualityStats of the rows as loaded, before coercion
+    dataset_key = None  # identifies the rows for the disk cache; None keeps results in memory only
+    disk_cache = None  # shared by all sources; see use_disk_cache()
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self):
+        raise NotImplementedError
+
+    def _memo(self, key, compute, label):
+        with span("aggregation", label, backend=self.name) as fields:
+            with self._lock:
+                if key in self._results:
+                    fields["cache"] = "hit"
+                    result = self._results[key]
+                    return result.copy() if isinstance(result, pd.DataFrame) else result
+            disk_key = self._disk_key(key)
+            result = self.disk_cache.get(disk_key) if disk_key else MISSING
+            if result is not MISSING:
+                fields["cache"] = "disk"
+            else:
+                fields["cache"] = "miss"
+                result = compute()
+                if disk_key:
+                    self.disk_cache.put(disk_key, result)
+            with self._lock:
+                self._results[key] = result
+            return result.copy() if isinstance(result, pd.DataFrame) else result
+
+    def _disk_key(self, key):
+        if self.disk_cache is None or key[0] not in DISK_CACHED:
+            return None
+        dataset = self.dataset_key
+        return (CACHE_VERSION, self.name, dataset, key) if dataset else None
+
+    def clear_cache(self):
+        with self._lock:
+            self._results.clear()
+
+    def evict_caches(self):
+        """Drop every memoised aggregate this source (and anything it wraps) holds."""
+        self.clear_cache()
+
+    def memory_usage(self):
+        """Bytes held in memory by the loaded rows."""
+        return 0
+
+    def cache_usage(self):
+        """Bytes held in memory by memoised aggregate results."""
+        with self._lock:
+            return sum(_nbytes(result) for result in self._results.values())
+
+    def release_rows(self):
+        """Unload raw rows that can be re-read later; returns True when memory was freed."""
+        return False
+
+    def refresh(self):
+        """Pick up changes in the underlying data; returns True when anything changed."""
+        return False
+
+    def partition_values(self):
+        """``{key: [values]}`` for partitioned datasets, empty otherwise."""
+        return {}
+
+    def select(self, selection):
+        """Restrict the source to the partitions in ``{key: [values]}``."""
+        return self
+
+    # --- Public aggregation API ---
+    def row_count(self, where=None):
+        """Number of rows matching `where` (all rows when omitted)."""
+        return self._memo(("rows", _freeze(where)), lambda: self._row_count(where), f"row_count({where or ''})")
+
+    def value_counts(self, column, where=None):
+        """Frame of ``[column, 'Count']`` sorted by descending count."""
+        return self._memo(
+            ("counts", column, _freeze(where)), lambda: self._value_counts(column, where),
+            f"value_counts({column}{', ' + str(where) if where else ''})",
+        )
+
+    def group_agg(self, by, column, how="mean"):
+        """Frame of ``[*by, column]`` with `column` aggregated by `how` ('mean', 'sum' or 'count')."""
+        if how not in GROUP_AGGS:
+            raise ValueError(f"Unsupported aggregation: {how}")
+        by = [by] if isinstance(by, str) else list(by)
+        return self._memo(
+            ("group", tuple(by), column, how), lambda: self._group_agg(by, column, how),
+            f"group_{how}({', '.join(by)} -> {column})",
+        )
+
+    def group_size(self, by, name="Count"):
+        """Frame of ``[*by, name]`` with the number of rows per group."""
+        by = [by] if isinstance(by, str) else list(by)
+        return self._memo(
+            ("size", tuple(by), name), lambda: self._group_size(by, name), f"group_size({', '.join(by)})"
+        )
+
+    def stat(self, column, how):
+        """Scalar statistic of one column: mean, std (sample), sum, count, nunique or mode."""
+        if how not in STATS:
+            raise ValueError(f"Unsupported statistic: {how}")
+        return self._memo(("stat", column, how), lambda: self._stat(column, how), f"{how}({column})")
+
+    # --- Risk scoring ---
+    def risk_scores(self):
+        """Per-row risk scores (see risk.py) as a float32 array in dataset order."""
+        return self._memo(("risk",), self._risk_scores, "risk_scores")
+
+    def risk_bands(self):
+        """Frame of ``['Risk_Band', 'Count']`` over the 0-100 score bands, lowest first."""
+        return self._memo(("risk_bands",), self._risk_bands, "risk_bands")
+
+    def watchlist(self, n=WATCHLIST_SIZE, columns=None):
+        """The `n` highest-risk rows, highest first, with their ``Risk_Score`` in the first column."""
+        columns = list(columns or self.columns)
+        return self._memo(("watchlist", n, tuple(columns)), lambda: self._watchlist(n, columns), f"watchlist({n})")
+
+    def _risk_scores(self):
+        present = [column for column in RISK_COLUMNS if column in self.columns]
+        return score_columns({column: self._column_array(column) for column in present}, self._num_rows())
+
+    def _risk_bands(self):
+        return band_counts(self.risk_scores())
+
+    def _watchlist(self, n, columns):
+        scores = self.risk_scores()
+        positions = top_n(scores, n)
+        frame = self._take(positions, columns).reset_index(drop=True)
+        frame.insert(0, "Risk_Score", scores[positions])
+        return frame
+
+    # --- Data quality ---
+    def quality(self):
+        """`QualityStats` of the dataset's rows (see data_quality.py)."""
+        return self._memo(("quality",), self._quality, "quality")
+
+    def _quality(self):
+        if self.ingest_quality is not None:
+            return self.ingest_quality
+        columns = [c for c in self.columns if c not in DERIVED_SQL]
+        return scan(self.iter_rows(columns=columns, chunk_rows=QUALITY_CHUNK_ROWS))
+
+    # --- Correlation diagnostics ---
+    def moments(self, levels=None):
+        """Mergeable moments of the diagnostic features (see diagnostics.py), accumulated in chunks.
+
+        `levels` are the one-hot levels to encode, by default `category_levels()`.
+        """
+        if levels is None:
+            levels = self.category_levels()
+        return self._memo(
+            ("moments", tuple(sorted(levels.items()))), lambda: self._moments(levels), "moments"
+        )
+
+    def category_levels(self):
+        """One-hot levels of the categorical diagnostic features, from their value counts over all rows."""
+        return choose_levels({
+            column: self.value_counts(column)[column].tolist() for column in CATEGORICAL_FEATURES if column in self.columns
+        })
+
+    def _moments(self, levels):
+        columns = [c for c in NUMERIC_FEATURES + CATEGORICAL_FEATURES if c in self.columns]
+        return moments_of_chunks(self.iter_rows(columns=columns, chunk_rows=MOMENT_CHUNK_ROWS), levels)
+
+    # --- Backend hooks ---
+    def _row_count(self, where):
+        raise NotImplementedError
+
+    def _value_counts(self, column, where):
+        raise NotImplementedError
+
+    def _group_agg(self, by, column, how):
+        raise NotImplementedError
+
+    def _group_size(self, by, name):
+        raise NotImplementedError
+
+    def _stat(self, column, how):
+        raise NotImplementedError
+
+    # --- Raw-row access ---
+    def rows(self, where=None, columns=None, sort=None, ascending=True, offset=0, limit=50):
+        """One page of the rows matching `where`, restricted to `columns` and ordered by `sort`.
+
+        Only the requested page is materialised; rows keep their dataset order
+        when `sort` is omitted.
+        """
+        columns = list(columns or self.columns)
+        if sort is not None and sort not in self.columns:
+            raise KeyError(sort)
+        label = f"rows({where or ''}, sort={sort}, offset={offset})"
+        with span("rows", label, backend=self.name):
+            page = self._rows(list(where or ()), columns, sort, ascending, int(offset), int(limit))
+        return page.reset_index(drop=True)
+
+    def iter_rows(self, where=None, columns=None, chunk_rows=50_000):
+        """Yield every row matching `where` in dataset order, as frames of at most `chunk_rows` rows."""
+        yield from self._iter_rows(list(where or ()), list(columns or self.columns), chunk_rows)
+
+    def _iter_rows(self, where, columns, chunk_rows):
+        positions = self._row_positions(where)
+        total = self._num_rows() if positions is None else len(positions)
+        for start in range(0, total, chunk_rows):
+            stop = min(start + chunk_rows, total)
+            page = np.arange(start, stop) if positions is None else positions[start:stop]
+            yield self._take(page, columns).reset_index(drop=True)
+
+    def _row_positions(self, where):
+        """Ascending positions of the rows matching `where`, or None for every row."""
+        positions, rest = None, []
+        for column, op, value in where:
+            if op == "==" and column in INDEXED_COLUMNS:
+                postings = self._memo(("postings", column), lambda c=column: self._postings(c), f"row_index({column})")
+                match = postings.get(value, np.empty(0, dtype=np.int64))
+            else:
+                rest.append((column, op, value))
+                continue
+            positions = match if positions is None else np.intersect1d(positions, match, assume_unique=True)
+        if rest:
+            matched = np.flatnonzero(self._mask_array(rest))
+            positions = matched if positions is None else np.intersect1d(positions, matched, assume_unique=True)
+        return positions
+
+    def _postings(self, column):
+        """``{value: positions}`` for one column; null values are not indexed."""
+        values = pd.Series(self._column_array(column))
+        dtype = _position_dtype(len(values))
+        return {value: rows.astype(dtype) for value, rows in values.groupby(values, sort=False).indices.items()}
+
+    def _sort_order(self, column, ascending):
+        """Row positions ordered by `column` (stable, nulls last)."""
+        values = pd.Series(self._column_array(column))
+        order = values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+        return order.astype(_position_dtype(len(values)))
+
+    def _rows(self, where, columns, sort, ascending, offset, limit):
+        positions = self._row_positions(where)
+        if sort is None:
+            if positions is None:
+                page = np.arange(offset, min(offset + limit, self._num_rows()))
+            else:
+                page = positions[offset:offset + limit]
+        else:
+            order = self._memo(
+                ("order", sort, ascending), lambda: self._sort_order(sort, ascending), f"sort_index({sort})"
+            )
+            if positions is not None:
+                selected = np.zeros(self._num_rows(), dtype=bool)
+                selected[positions] = True
+                order = order[selected[order]]
+            page = order[offset:offset + limit]
+        return self._take(page, columns)
+
+    # --- Row hooks (in-memory backends) ---
+    def _num_rows(self):
+        raise NotImplementedError
+
+    def _column_array(self, column):
+        raise NotImplementedError
+
+    def _mask_array(self, where):
+        raise NotImplementedError
+
+    def _take(self, positions, columns):
+        raise NotImplementedError
+
+
+# =============================== #
+# pandas backend
+# =============================== #
+class PandasSource(DataSource):
+    """Aggregates over an in-memory DataFrame."""
+
+    name = "pandas"
+
+    def __init__(self, df):
+        super().__init__()
+        self.ingest_quality = scan(chunks(df))
+        self.df = add_derived_columns(df)
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_CSV, sample=None):
+        return cls(read_csv_sample(path, sample) if sample else pd.read_csv(path))
+
+    @property
+    def columns(self):
+        return list(self.df.columns)
+
+    def memory_usage(self):
+        return _nbytes(self.df)
+
+    def _mask(self, where):
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, op, value in where:
+            mask &= FILTER_OPS[op](self.df[column], value).to_numpy()
+        return mask
+
+    def _row_count(self, where):
+        return int(self._mask(where).sum()) if where else len(self.df)
+
+    def _value_counts(self, column, where):
+        series = self.df.loc[self._mask(where), column] if where else self.df[column]
+        counts = series.value_counts().reset_index()
+        counts.columns = [column, 'Count']
+        return counts
+
+    def _group_agg(self, by, column, how):
+        return self.df.groupby(by)[column].agg(how).reset_index()
+
+    def _group_size(self, by, name):
+        return self.df.groupby(by).size().reset_index(name=name)
+
+    def _stat(self, column, how):
+        series = self.df[column]
+        if how == "mode":
+            return series.mode()[0] if not series.isnull().all() else None
+        return getattr(series, how)()
+
+    def _num_rows(self):
+        return len(self.df)
+
+    def _column_array(self, column):
+        return self.df[column].to_numpy()
+
+    def _mask_array(self, where):
+        return self._mask(where)
+
+    def _take(self, positions, columns):
+        return self.df.iloc[positions][columns]
+
+
+# =============================== #
+# Arrow backend
+# =============================== #
+class ArrowSource(DataSource):
+    """Aggregates over an Arrow table with pyarrow.compute (multithreaded kernels)."""
+
+    name = "arrow"
+
+    def __init__(self, data):
+        super().__init__()
+        import pyarrow as pa
+        if isinstance(data, pa.Table):
+            table = data
+            self.ingest_quality = scan(
+                batch.to_pandas() for batch in table.to_batches(max_chunksize=QUALITY_CHUNK_ROWS)
+            )
+        else:
+            table = pa.Table.from_pandas(data, preserve_index=False)
+            self.ingest_quality = scan(chunks(data))
+        self.table = self._add_derived_columns(table)
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_CSV, sample=None):
+        if sample:
+            return cls(read_csv_sample(path, sample))  # parsed by pandas, missing values included
+        import pyarrow.csv as pa_csv
+        # Blank and "NA"-like text fields are nulls, as in pandas, not categories of their own
+        options = pa_csv.ConvertOptions(strings_can_be_null=True, null_values=CSV_NA_VALUES)
+        return cls(pa_csv.read_csv(path, convert_options=options))
+
+    def memory_usage(self):
+        return self.table.nbytes
+
+    @staticmethod
+    def _add_derived_columns(table):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        for column in NUMERIC_COLUMNS:
+            if column in table.column_names:
+                values = table[column]
+                if not (pa.types.is_integer(values.type) or pa.types.is_floating(values.type)):
+                    coerced = pd.to_numeric(values.to_pandas(), errors='coerce')
+                    table = table.set_column(table.column_names.index(column), column, pa.array(coerced))
+        if "Mileage" in table.column_names and "Reported_Issues" in table.column_names:
+            mtbf = pc.divide(pc.cast(table["Mileage"], pa.float64()), pc.add(table["Reported_Issues"], 1))
+            table = table.append_column("Mean_Time_Between_Failures", mtbf)
+        return table
+
+    @property
+    def columns(self):
+        return list(self.table.column_names)
+
+    def _mask(self, where):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        funcs = {"==": pc.equal, "!=": pc.not_equal, ">": pc.greater,
+                 ">=": pc.greater_equal, "<": pc.less, "<=": pc.less_equal}
+        mask = None
+        for column, op, value in where:
+            value = value.item() if isinstance(value, np.generic) else value
+            try:
+                clause = pc.fill_null(funcs[op](self.table[column], value), False)
+            except (pa.ArrowNotImplementedError, pa.ArrowInvalid, pa.ArrowTypeError):
+                # No comparison kernel (e.g. int column vs text): pandas treats that as never equal.
+                clause = pa.chunked_array([pa.array(np.full(len(self.table), op == "!="))])
+            mask = clause if mask is None else pc.and_(mask, clause)
+        return mask
+
+    def _filtered(self, where):
+        return self.table.filter(self._mask(where)) if where else self.table
+
+    def _row_count(self, where):
+        if not where:
+            return self.table.num_rows
+        import pyarrow.compute as pc
+        return int(pc.sum(self._mask(where)).as_py() or 0)
+
+    def _value_counts(self, column, where):
+        import pyarrow.compute as pc
+
+        counts = pc.value_counts(self._filtered(where)[column])
+        values, totals = counts.field("values"), counts.field("counts")
+        valid = pc.is_valid(values)
+        frame = pd.DataFrame({
+            column: values.filter(valid).to_pandas(),
+            'Count': totals.filter(valid).to_pandas(),
+        })
+        return frame.sort_values('Count', ascending=False, kind="stable").reset_index(drop=True)
+
+    def _grouped(self, by, aggregations):
+        import pyarrow.compute as pc
+
+        table = self.table
+        for key in by:
+            table = table.filter(pc.is_valid(table[key]))
+        result = table.group_by(by).aggregate(aggregations)
+        return result.sort_by([(key, "ascending") for key in by])
+
+    def _group_agg(self, by, column, how):
+        import pyarrow.compute as pc
+
+        options = pc.ScalarAggregateOptions(min_count=0) if how == "sum" else None
+        result = self._grouped(by, [(column, how, options)] if options else [(column, how)])
+        frame = result.to_pandas()
+        return frame.rename(columns={f"{column}_{how}": column})[by + [column]]
+
+    def _group_size(self, by, name):
+        frame = self._grouped(by, [([], "count_all")]).to_pandas()
+        return frame.rename(columns={"count_all": name})[by + [name]]
+
+    def _stat(self, column, how):
+        import pyarrow.compute as pc
+
+        values = self.table[column]
+        if how == "mode":
+            # pc.mode has no string kernel; pick the most frequent value from the counts instead.
+            return _mode_from_counts(self._value_counts(column, None), column)
+        if how == "std":
+            result = pc.stddev(values, ddof=1)
+        elif how == "sum":
+            result = pc.sum(values, min_count=0)
+        elif how == "nunique":
+            result = pc.count_distinct(values)
+        else:
+            result = getattr(pc, how)(values)
+        result = result.as_py()
+        return float("nan") if result is None else result
+
+    def _num_rows(self):
+        return self.table.num_rows
+
+    def _column_array(self, column):
+        return self.table[column].to_numpy()
+
+    def _mask_array(self, where):
+        return self._mask(where).to_numpy()
+
+    def _take(self, positions, columns):
+        return self.table.select(columns).take(positions).to_pandas()
+
+
+ENGINES = {"pandas": PandasSource, "arrow": ArrowSource}
+
+
+# =============================== #
+# SQLite backend
+# =============================== #
+class SQLiteSource(DataSource):
+    """Pushes every aggregate down to SQLite as a GROUP BY / COUNT query."""
+
+    name = "sqlite"
+
+    def __init__(self, path, table=SQLITE_TABLE):
+        super().__init__()
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.table = table
+        self.dataset_key = (file_signature(path), table)
+        with self._connect() as con:
+            info = con.execute(f'PRAGMA table_info("{table}")').fetchall()
+        if not info:
+            raise ValueError(f"Table {table!r} not found in {path}")
+        self._columns = [row[1] for row in info]
+        ensure_indexes(path, table, self._columns)
+
+    def _connect(self):
+        # One short-lived read-only connection per query keeps Streamlit's
+        # session threads from sharing a sqlite3 connection.
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    @property
+    def columns(self):
+        return self._columns + [c for c in DERIVED_SQL if c not in self._columns]
+
+    def _expr(self, column):
+        if column in DERIVED_SQL and column not in self._columns:
+            return f"({DERIVED_SQL[column]})"
+        if column not in self._columns:
+            raise KeyError(column)
+        return f'"{column}"'
+
+    def _where(self, where, extra=()):
+        clauses, params = list(extra), []
+        for column, op, value in where or ():
+            clauses.append(f"{self._expr(column)} {SQL_OPS[op]} ?")
+            params.append(value.item() if isinstance(value, np.generic) else value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _query(self, sql, params=()):
+        with self._connect() as con:
+            return pd.read_sql_query(sql, con, params=params)
+
+    def _scalar(self, sql, params=()):
+        with self._connect() as con:
+            return con.execute(sql, params).fetchone()[0]
+
+    def _row_count(self, where):
+        clause, params = self._where(where)
+        return int(self._scalar(f'SELECT COUNT(*) FROM "{self.table}"{clause}', params))
+
+    def _value_counts(self, column, where):
+        expr = self._expr(column)
+        clause, params = self._where(where, extra=[f"{expr} IS NOT NULL"])
+        return self._query(
+            f'SELECT {expr} AS "{column}", COUNT(*) AS "Count" FROM "{self.table}"{clause} '
+            f'GROUP BY 1 ORDER BY 2 DESC, 1',
+            params,
+        )
+
+    def _group_agg(self, by, column, how):
+        func = {"mean": "AVG", "sum": "SUM", "count": "COUNT"}[how]
+        keys = ", ".join(f'{self._expr(b)} AS "{b}"' for b in by)
+        positions = ", ".join(str(i + 1) for i in range(len(by)))
+        clause, _ = self._where(None, extra=[f"{self._expr(b)} IS NOT NULL" for b in by])
+        return self._query(
+            f'SELECT {keys}, {func}({self._expr(column)}) AS "{column}" FROM "{self.table}"{clause} '
+            f'GROUP BY {positions} ORDER BY {positions}'
+        )
+
+    def _group_size(self, by, name):
+        keys = ", ".join(f'{self._expr(b)} AS "{b}"' for b in by)
+        positions = ", ".join(str(i + 1) for i in range(len(by)))
+        clause, _ = self._where(None, extra=[f"{self._expr(b)} IS NOT NULL" for b in by])
+        return self._query(
+            f'SELECT {keys}, COUNT(*) AS "{name}" FROM "{self.table}"{clause} '
+            f'GROUP BY {positions} ORDER BY {positions}'
+        )
+
+    def _stat(self, column, how):
+        expr, table = self._expr(column), self.table
+        if how == "mean":
+            return self._scalar(f'SELECT AVG({expr}) FROM "{table}"')
+        if how == "sum":
+            return self._scalar(f'SELECT SUM({expr}) FROM "{table}"')
+        if how == "count":
+            return int(self._scalar(f'SELECT COUNT({expr}) FROM "{table}"'))
+        if how == "nunique":
+            return int(self._scalar(f'SELECT COUNT(DISTINCT {expr}) FROM "{table}"'))
+        if how == "mode":
+            return self._scalar(
+                f'SELECT {expr} FROM "{table}" WHERE {expr} IS NOT NULL '
+                f'GROUP BY 1 ORDER BY COUNT(*) DESC, 1 LIMIT 1'
+            )
+        # Sample standard deviation in two passes to avoid cancellation error.
+        with self._connect() as con:
+            mean, n = con.execute(f'SELECT AVG({expr}), COUNT({expr}) FROM "{table}"').fetchone()
+            if not n or n < 2:
+                return float("nan")
+            ss = con.execute(f'SELECT SUM(({expr} - ?) * ({expr} - ?)) FROM "{table}"', (mean, mean)).fetchone()[0]
+        return float(np.sqrt(ss / (n - 1)))
+
+    def _moments(self, levels):
+        # Means over the complete rows, then the centred cross-products of the numeric features in
+        # one pass and their sums per combination of categories in another.  The one-hot blocks
+        # follow from those group sums and counts, so SQLite never multiplies one-hot columns.
+        numeric = [c for c in NUMERIC_FEATURES if c in self.columns]
+        categorical = [c for c in CATEGORICAL_FEATURES if c in self.columns and c in levels]
+        onehot = [(c, level) for c in categorical for level in levels[c]]
+        features = tuple(numeric + [f"{c}={level}" for c, level in onehot])
+        k, table = len(numeric), self.table
+        exprs = [self._expr(c) for c in numeric]
+        clause, _ = self._where(None, extra=[f"typeof({expr}) IN ('integer', 'real')" for expr in exprs])
+        mean, comoment = np.zeros(len(features)), np.zeros((len(features), len(features)))
+        with self._connect() as con:
+            total = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            averages = ", ".join(["COUNT(*)"] + [f"AVG({expr})" for expr in exprs])
+            n, *means = con.execute(f'SELECT {averages} FROM "{table}"{clause}').fetchone()
+            if not n:
+                return Moments(features, 0, mean, comoment, total)
+            mean[:k] = means
+            pairs = [(i, j) for i in range(k) for j in range(i, k)]
+            if pairs:
+                centred = ", ".join(f"{expr} - ? AS f{i}" for i, expr in enumerate(exprs))
+                sums = ", ".join(f"SUM(f{i} * f{j})" for i, j in pairs)
+                # LIMIT -1 OFFSET 0 keeps SQLite from flattening the subquery and recomputing each deviation per product
+                row = con.execute(
+                    f'SELECT {sums} FROM (SELECT {centred} FROM "{table}"{clause} LIMIT -1 OFFSET 0)', means
+                ).fetchone()
+                for (i, j), value in zip(pairs, row):
+                    comoment[i, j] = comoment[j, i] = value
+        if onehot:
+            keys = [f'{self._expr(c)} AS "{c}"' for c in categorical]
+            deviations = [f'SUM({expr} - ?) AS "d{i}"' for i, expr in enumerate(exprs)]
+            groups = self._query(
+                f'SELECT {", ".join(keys + ["COUNT(*) AS n"] + deviations)} FROM "{table}"{clause} '
+                f'GROUP BY {", ".join(str(i + 1) for i in range(len(keys)))}',
+                means,
+            )
+            weights = groups["n"].to_numpy(np.float64)
+            indicator = np.column_stack([(groups[c] == level).to_numpy(np.float64) for c, level in onehot])
+            share = indicator.T @ weights / n
+            sums = groups[[f"d{i}" for i in range(k)]].to_numpy(np.float64)
+            cross = indicator.T @ sums - np.outer(share, sums.sum(axis=0))
+            mean[k:] = share
+            comoment[k:, :k], comoment[:k, k:] = cross, cross.T
+            comoment[k:, k:] = (indicator * weights[:, None]).T @ indicator - n * np.outer(share, share)
+        return Moments(features, n, mean, comoment, total - n)
+
+    def _quality(self):
+        # Snapshots built by build_sqlite_snapshot() keep the scan of their CSV
+        try:
+            stored = self._scalar(f'SELECT stats FROM "{self.table}{QUALITY_TABLE_SUFFIX}"')
+        except (sqlite3.OperationalError, TypeError):
+            return super()._quality()
+        return QualityStats.from_json(stored)
+
+    def _risk_expr(self):
+        return risk_sql(self._expr, self.columns)
+
+    def _risk_scores(self):
+        scores = self._query(f'SELECT {self._risk_expr()} AS "Risk_Score" FROM "{self.table}" ORDER BY rowid')
+        return scores["Risk_Score"].to_numpy(np.float32)
+
+    def _risk_bands(self):
+        counts = self._query(
+            f'SELECT MIN(CAST(({self._risk_expr()}) / {BAND_WIDTH} AS INTEGER), {len(BANDS) - 1}) AS band, '
+            f'COUNT(*) AS "Count" FROM "{self.table}" GROUP BY 1'
+        )
+        bands = np.zeros(len(BANDS), dtype=np.int64)
+        bands[counts["band"].to_numpy(np.int64)] = counts["Count"].to_numpy()
+        return pd.DataFrame({"Risk_Band": BANDS, "Count": bands})
+
+    def _watchlist(self, n, columns):
+        select = ", ".join(f'{self._expr(c)} AS "{c}"' for c in columns)
+        frame = self._query(
+            f'SELECT {self._risk_expr()} AS "Risk_Score", {select} FROM "{self.table}" '
+            f'ORDER BY 1 DESC, rowid LIMIT ?',
+            [n],
+        )
+        frame["Risk_Score"] = frame["Risk_Score"].astype(np.float32)
+        return frame
+
+    def _rows(self, where, columns, sort, ascending, offset, limit):
+        select = ", ".join(f'{self._expr(c)} AS "{c}"' for c in columns)
+        clause, params = self._where(where)
+        order = "rowid"
+        if sort is not None:
+            expr = self._expr(sort)
+            order = f"{expr} IS NULL, {expr} {'ASC' if ascending else 'DESC'}, rowid"
+        return self._query(
+            f'SELECT {select} FROM "{self.table}"{clause} ORDER BY {order} LIMIT ? OFFSET ?',
+            params + [limit, offset],
+        )
+
+    def _iter_rows(self, where, columns, chunk_rows):
+        select = ", ".join(f'{self._expr(c)} AS "{c}"' for c in columns)
+        clause, params = self._where(where)
+        with self._connect() as con:
+            yield from pd.read_sql_query(
+                f'SELECT {select} FROM "{self.table}"{clause} ORDER BY rowid', con, params=params, chunksize=chunk_rows
+            )
+
+
+# =============================== #
+# Partitioned dataset backend
+# =============================== #
+def _read_frame(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _read_columns(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def scan_partitions(root):
+    """Map every partition file under `root` to its Hive keys and a change signature."""
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        rel = os.path.relpath(dirpath, root)
+        keys = dict(part.split("=", 1) for part in rel.split(os.sep) if "=" in part)
+        for filename in sorted(filenames):
+            if filename.endswith(PARTITION_SUFFIXES):
+                path = os.path.join(dirpath, filename)
+                stat = os.stat(path)
+                found[path] = (keys, (stat.st_mtime_ns, stat.st_size))
+    return found
+
+
+def _key_matches(raw, op, value):
+    """Compare a partition key (always text in the path) with a filter value."""
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        try:
+            raw = float(raw)
+        except ValueError:
+            return True  # not comparable: keep the partition and let the rows decide
+    return bool(FILTER_OPS[op](raw, value))
+
+
+class Partition:
+    """One partition file; its rows are loaded on first use and aggregated by `make_source`."""
+
+    def __init__(self, path, keys, signature, make_source):
+        self.path = path
+        self.keys = keys
+        self.signature = signature
+        self._make_source = make_source
+        self._source = None
+        self._lock = threading.Lock()
+
+    @property
+    def source(self):
+        with self._lock:
+            if self._source is None:
+                df = _read_frame(self.path)
+                for key, value in self.keys.items():
+                    if key not in df.columns:
+                        df[key] = value
+                self._source = self._make_source(df)
+                self._source.dataset_key = (os.path.abspath(self.path), self.signature, tuple(sorted(self.keys.items())))
+            return self._source
+
+
+class PartitionedSource(DataSource):
+    """Directory of CSV/Parquet partitions with per-partition aggregate caches.
+
+    Filters on partition keys prune whole files, and `refresh()` only reloads
+    partitions whose files were added or changed since the last scan.
+    """
+
+    name = "partitioned"
+
+    def __init__(self, root, make_source=PandasSource, selection=None, partitions=None):
+        super().__init__()
+        self.root = root
+        self.make_source = make_source
+        self.selection = selection or {}
+        self._partitions = {} if partitions is None else partitions
+        self._views = {}
+        self._columns = None
+        if partitions is None:
+            if not os.path.isdir(root):
+                raise FileNotFoundError(root)
+            self.refresh()
+            if not self._partitions:
+                raise ValueError(f"No {'/'.join(PARTITION_SUFFIXES)} partitions under {root}")
+
+    def refresh(self):
+        found = scan_partitions(self.root)
+        changed = False
+        with self._lock:
+            for path in [p for p in self._partitions if p not in found]:
+                del self._partitions[path]
+                changed = True
+            for path, (keys, signature) in found.items():
+                current = self._partitions.get(path)
+                if current is None or current.signature != signature:
+                    self._partitions[path] = Partition(path, keys, signature, self.make_source)
+                    changed = True
+        if changed:
+            self._columns = None
+            self.clear_cache()
+            for view in self._views.values():
+                view._columns = None
+                view.clear_cache()
+        return changed
+
+    @property
+    def dataset_key(self):
+        parts = tuple((os.path.abspath(part.path), part.signature) for part, _ in self._active())
+        return (os.path.abspath(self.root), parts) if parts else None
+
+    def partition_values(self):
+        values = {}
+        for part in list(self._partitions.values()):
+            for key, value in part.keys.items():
+                values.setdefault(key, set()).add(value)
+        return {key: sorted(vals) for key, vals in values.items()}
+
+    def select(self, selection):
+        selection = {k: tuple(sorted(v)) for k, v in selection.items() if v is not None}
+        if not selection:
+            return self
+        frozen = tuple(sorted(selection.items()))
+        with self._lock:
+            if frozen not in self._views:
+                self._views[frozen] = PartitionedSource(
+                    self.root, self.make_source, selection=selection, partitions=self._partitions
+                )
+            return self._views[frozen]
+
+    def _loaded(self):
+        return [part._source for part in list(self._partitions.values()) if part._source is not None]
+
+    def evict_caches(self):
+        self.clear_cache()
+        for view in list(self._views.values()):
+            view.clear_cache()
+        for source in self._loaded():
+            source.evict_caches()
+
+    def memory_usage(self):
+        return sum(source.memory_usage() for source in self._loaded())
+
+    def cache_usage(self):
+        views = sum(DataSource.cache_usage(view) for view in list(self._views.values()))
+        return super().cache_usage() + views + sum(source.cache_usage() for source in self._loaded())
+
+    def release_rows(self):
+        released = False
+        for part in list(self._partitions.values()):
+            with part._lock:
+                if part._source is not None:
+                    part._source = None
+                    released = True
+        return released
+
+    @property
+    def columns(self):
+        if self._columns is None:
+            parts = list(self._partitions.values())
+            columns = _read_columns(parts[0].path) if parts else []
+            keys = [k for part in parts for k in part.keys if k not in columns]
+            self._columns = columns + list(dict.fromkeys(keys)) + [c for c in DERIVED_SQL if c not in columns]
+        return self._columns
+
+    def _active(self, where=None):
+        """Yield ``(partition, remaining_where)`` for partitions surviving the selection and filters."""
+        for part in list(self._partitions.values()):
+            if any(part.keys.get(k) not in allowed for k, allowed in self.selection.items()):
+                continue
+            rest, keep = [], True
+            for column, op, value in where or ():
+                if column in part.keys:
+                    keep = keep and _key_matches(part.keys[column], op, value)
+                else:
+                    rest.append((column, op, value))
+            if keep:
+                yield part, rest
+
+    def _row_count(self, where):
+        return sum(part.source.row_count(rest) for part, rest in self._active(where))
+
+    def _value_counts(self, column, where):
+        frames = [part.source.value_counts(column, rest) for part, rest in self._active(where)]
+        if not frames:
+            return pd.DataFrame({column: [], 'Count': []})
+        merged = pd.concat(frames).groupby(column, sort=False)['Count'].sum()
+        return merged.sort_values(ascending=False, kind="stable").reset_index()
+
+    def _merge_groups(self, by, column, how):
+        frames = [part.source.group_agg(by, column, how) for part, _ in self._active()]
+        if not frames:
+            return pd.DataFrame(columns=by + [column])
+        return pd.concat(frames).groupby(by)[column].sum()
+
+    def _group_agg(self, by, column, how):
+        if how == "mean":
+            merged = self._merge_groups(by, column, "sum") / self._merge_groups(by, column, "count")
+        else:
+            merged = self._merge_groups(by, column, how)
+        return merged.reset_index() if isinstance(merged, pd.Series) else merged
+
+    def _group_size(self, by, name):
+        frames = [part.source.group_size(by, name) for part, _ in self._active()]
+        if not frames:
+            return pd.DataFrame(columns=by + [name])
+        return pd.concat(frames).groupby(by)[name].sum().reset_index()
+
+    def _stat(self, column, how):
+        sources = [part.source for part, _ in self._active()]
+        if how in ("sum", "count"):
+            return reduce(operator.add, (s.stat(column, how) for s in sources), 0)
+        if how == "mean":
+            count = sum(s.stat(column, "count") for s in sources)
+            return sum(s.stat(column, "sum") for s in sources) / count if count else float("nan")
+        if how in ("nunique", "mode"):
+            counts = self._value_counts(column, None)
+            return len(counts) if how == "nunique" else _mode_from_counts(counts, column)
+        # std: combine per-partition (count, mean, M2) with Chan's parallel formula
+        n, mean, m2 = 0, 0.0, 0.0
+        for s in sources:
+            n_b = s.stat(column, "count")
+            if not n_b:
+                continue
+            mean_b = s.stat(column, "mean")
+            m2_b = (s.stat(column, "std") ** 2) * (n_b - 1) if n_b > 1 else 0.0
+            delta = mean_b - mean
+            total = n + n_b
+            mean += delta * n_b / total
+            m2 += m2_b + delta ** 2 * n * n_b / total
+            n = total
+        return float(np.sqrt(m2 / (n - 1))) if n > 1 else float("nan")
+
+    def _risk_scores(self):
+        scores = [part.source.risk_scores() for part, _ in self._active()]
+        return np.concatenate(scores) if scores else np.empty(0, dtype=np.float32)
+
+    def _risk_bands(self):
+        bands = [part.source.risk_bands() for part, _ in self._active()]
+        if not bands:
+            return band_counts(np.empty(0))
+        return pd.concat(bands).groupby("Risk_Band", sort=False)["Count"].sum().reset_index()
+
+    def _watchlist(self, n, columns):
+        # The overall top n lies within the union of every partition's top n
+        frames = [part.source.watchlist(n, columns) for part, _ in self._active()]
+        if not frames:
+            return pd.DataFrame(columns=["Risk_Score"] + columns)
+        merged = pd.concat(frames, ignore_index=True)
+        return merged.iloc[top_n(merged["Risk_Score"].to_numpy(), n)].reset_index(drop=True)
+
+    def _quality(self):
+        sources = [part.source for part, _ in self._active()]
+        if not sources:
+            return QualityStats()
+        with ThreadPoolExecutor(max_workers=min(len(sources), os.cpu_count() or 1)) as pool:
+            return reduce(QualityStats.merge, pool.map(lambda source: source.quality(), sources), QualityStats())
+
+    def _moments(self, levels):
+        # Partitions are summarised in parallel, with the levels of the whole dataset, and keep their
+        # moments across refreshes that do not change those levels
+        sources = [part.source for part, _ in self._active()]
+        if not sources:
+            return empty_moments()
+        with ThreadPoolExecutor(max_workers=min(len(sources), os.cpu_count() or 1)) as pool:
+            return reduce(Moments.merge, pool.map(lambda source: source.moments(levels), sources), empty_moments())
+
+    def _rows(self, where, columns, sort, ascending, offset, limit):
+        active = list(self._active(where))
+        frames = []
+        if sort is None:
+            # Dataset order: skip whole partitions by their (memoised) row counts
+            skip, remaining = offset, limit
+            for part, rest in active:
+                if remaining <= 0:
+                    break
+                n = part.source.row_count(rest)
+                if skip >= n:
+                    skip -= n
+                    continue
+                frames.append(part.source.rows(rest, columns, None, True, skip, remaining))
+                skip, remaining = 0, remaining - len(frames[-1])
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        # The global page lies within the first offset + limit rows of every partition
+        wanted = list(dict.fromkeys(columns + [sort]))
+        frames = [part.source.rows(rest, wanted, sort, ascending, 0, offset + limit) for part, rest in active]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        merged = pd.concat(frames, ignore_index=True)
+        merged = merged.sort_values(sort, ascending=ascending, kind="stable", na_position="last")
+        return merged.iloc[offset:offset + limit][columns]
+
+    def _iter_rows(self, where, columns, chunk_rows):
+        for part, rest in self._active(where):
+            yield from part.source.iter_rows(rest, columns, chunk_rows)
+
+
+def ensure_indexes(path, table=SQLITE_TABLE, columns=None):
+    """Create the single-column indexes the dashboard's GROUP BYs rely on, if writable."""
+    wanted = [c for c in INDEXED_COLUMNS if columns is None or c in columns]
+    try:
+        with sqlite3.connect(path) as con:
+            for column in wanted:
+                con.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table}_{column}" ON "{table}" ("{column}")')
+    except sqlite3.OperationalError:
+        pass  # read-only snapshot: query without the missing indexes
+
+
+def build_sqlite_snapshot(csv_path, db_path, table=SQLITE_TABLE, chunksize=100_000):
+    """Load a CSV into an indexed SQLite table, chunk by chunk, with the data-quality scan of its rows."""
+    quality = QualityStats()
+    with sqlite3.connect(db_path) as con:
+        for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunksize)):
+            quality = quality.merge(scan_chunk(chunk))
+            for column in NUMERIC_COLUMNS:
+                if column in chunk.columns:
+                    chunk[column] = pd.to_numeric(chunk[column], errors='coerce')
+            chunk.to_sql(table, con, if_exists="replace" if i == 0 else "append", index=False)
+        con.execute(f'DROP TABLE IF EXISTS "{table}{QUALITY_TABLE_SUFFIX}"')
+        con.execute(f'CREATE TABLE "{table}{QUALITY_TABLE_SUFFIX}" (stats TEXT)')
+        con.execute(f'INSERT INTO "{table}{QUALITY_TABLE_SUFFIX}" VALUES (?)', (quality.to_json(),))
+    ensure_indexes(db_path, table)
+
+
+def spill_to_sqlite(csv_path, cache_dir=None):
+    """Convert a CSV into an indexed SQLite snapshot in a private cache directory and return its path.
+
+    Snapshots are keyed by the CSV's path, size and mtime, so an unchanged file is
+    converted once and shared by every worker on the host running as the same user.
+    `cache_dir` defaults to a per-user directory and, like it, must not be writable by others.
+    """
+    key = file_signature(csv_path)
+    directory = private_directory(cache_dir or user_cache_dir("snapshots"))
+    db_path = os.path.join(directory, f"eda-{hashlib.sha1(key.encode()).hexdigest()[:16]}.db")
+    if not os.path.exists(db_path):
+        partial = f"{db_path}.{os.getpid()}.tmp"
+        build_sqlite_snapshot(csv_path, partial)
+        os.replace(partial, db_path)
+    return db_path
+
+
+def open_source(uri=DEFAULT_CSV, engine="pandas", sample=None):
+    """Open a data source from a path or URI.
+
+    ``sqlite:///path/to/fleet.db`` or a ``.db``/``.sqlite`` path selects the
+    SQLite backend, a directory is read as a partitioned dataset, and anything
+    else is read as a single CSV.  `engine` ("pandas" or "arrow") picks how
+    file-based sources run their aggregations; SQLite always aggregates in SQL.
+    `sample` reads only that fraction of a single CSV's rows.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {sorted(ENGINES)}")
+    if os.path.isdir(uri):
+        return PartitionedSource(uri, make_source=ENGINES[engine])
+    if uri.startswith("sqlite:///"):
+        return SQLiteSource(uri[len("sqlite:///"):])
+    if uri.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteSource(uri)
+    source = ENGINES[engine].from_csv(uri, sample=sample)
+    source.dataset_key = (file_signature(uri), sample)
+    return source
+
+
+def _normalised(result):
+    """Aggregate result as a frame with a stable row order, for comparing engines."""
+    if isinstance(result, Moments):
+        return pd.DataFrame({"Feature": result.features, "Mean": result.mean, "N": result.n}).sort_values("Feature")
+    if not isinstance(result, pd.DataFrame):
+        result = pd.DataFrame({"Value": [result]})
+    # Keys compare as text: pyarrow parses date columns that pandas leaves as strings
+    keys = [c for c in result.columns if not pd.api.types.is_numeric_dtype(result[c])]
+    result = result.astype({c: str for c in keys})
+    return result.sort_values(keys or list(result.columns[:1])).reset_index(drop=True)
+
+
+def compare_engines(csv_path, engines=("pandas", "arrow")):
+    """Aggregates of a CSV on which `engines` disagree, as ``[(aggregate, message)]``; empty when they all agree.
+
+    Covers row counts, per-column counts and distinct values, the value counts,
+    group sizes and group means of every text column, and the diagnostic moments.
+    """
+    sources = [open_source(csv_path, engine=engine) for engine in engines]
+    text = [c for c in sources[0].columns if c in sources[0].df.columns and sources[0].df[c].dtype == object]
+    checks = {"row_count": lambda s: s.row_count(), "moments": lambda s: s.moments()}
+    for column in sources[0].columns:
+        checks[f"count({column})"] = lambda s, c=column: s.stat(c, "count")
+        checks[f"nunique({column})"] = lambda s, c=column: s.stat(c, "nunique")
+    for column in text:
+        checks[f"value_counts({column})"] = lambda s, c=column: s.value_counts(c)
+        checks[f"group_size({column})"] = lambda s, c=column: s.group_size(c)
+        checks[f"group_mean({column} -> Mileage)"] = lambda s, c=column: s.group_agg(c, "Mileage")
+    differences = []
+    for label, check in checks.items():
+        expected = _normalised(check(sources[0]))
+        for engine, source in zip(engines[1:], sources[1:]):
+            try:
+                pd.testing.assert_frame_equal(expected, _normalised(check(source)), check_dtype=False, rtol=1e-9)
+            except AssertionError as exc:
+                differences.append((f"{label} [{engines[0]} vs {engine}]", str(exc).strip()))
+    return differences
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vehicle dashboard data-source tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build-sqlite", help="Convert a CSV export into an indexed SQLite snapshot")
+    build.add_argument("csv_path")
+    build.add_argument("db_path")
+    build.add_argument("--table", default=SQLITE_TABLE)
+    check = commands.add_parser("check-engines", help="Check that the pandas and arrow engines agree on a CSV")
+    check.add_argument("csv_path")
+    args = parser.parse_args()
+
+    if args.command == "build-sqlite":
+        build_sqlite_snapshot(args.csv_path, args.db_path, args.table)
+        print(f"Wrote {args.db_path} (table {args.table})")
+    elif args.command == "check-engines":
+        differences = compare_engines(args.csv_path)
+        for label, message in differences:
+            print(f"{label}: {message.splitlines()[0]}")
+        print(f"{len(differences)} aggregates differ" if differences else "pandas and arrow engines agree")
+        sys.exit(1 if differences else 0)
@@ -0,0 +1,164 @@
+"""Correlation diagnostics for the vehicle maintenance dashboard.
+
+Numeric columns and one-hot encoded categorical columns are summarised as
+mergeable moments: row count, means and the matrix of centred cross-products
+(co-moments).  Moments of two chunks or partitions combine exactly with
+Chan's parallel formula, the same one `PartitionedSource` uses for standard
+deviations, so a table is summarised chunk by chunk, partitions are
+summarised in parallel and only new partitions are summarised on refresh.
+The one-hot levels are chosen once per dataset from its value counts (see
+`choose_levels`), so every chunk encodes the same columns.
+Covariance, correlation and the association of every feature with
+``Need_Maintenance`` are all derived from the merged moments.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TARGET = "Need_Maintenance"
+NUMERIC_FEATURES = [
+    "Mileage", "Reported_Issues", "Vehicle_Age", "Engine_Size", "Odometer_Reading",
+    "Insurance_Premium", "Service_History", "Accident_History", "Fuel_Efficiency",
+    "Mean_Time_Between_Failures", TARGET,
+]
+CATEGORICAL_FEATURES = [
+    "Vehicle_Model", "Maintenance_History", "Fuel_Type", "Transmission_Type", "Owner_Type",
+    "Tire_Condition", "Brake_Condition", "Battery_Status",
+]
+MAX_LEVELS = 20  # categorical columns with more distinct values are not one-hot encoded
+CHUNK_ROWS = 500_000
+# Relative cutoff for singular values in the partial coefficients: one-hot levels of a column sum to
+# one, and their zero singular values come out as rounding noise that differs between backends
+PINV_RCOND = 1e-10
+
+
+@dataclass
+class Moments:
+    """Count, means and co-moment matrix of named features over the rows seen so far."""
+
+    features: tuple
+    n: int
+    mean: np.ndarray
+    comoment: np.ndarray
+    excluded: int = 0  # rows skipped for a missing or non-numeric value
+
+    def aligned(self, features):
+        """The same moments over `features`; features absent here are one-hot columns that were all zero."""
+        if tuple(features) == self.features:
+            return self
+        index = np.array([self.features.index(f) if f in self.features else -1 for f in features], dtype=np.int64)
+        present, taken = index >= 0, index[index >= 0]
+        mean = np.zeros(len(features))
+        mean[present] = self.mean[taken]
+        comoment = np.zeros((len(features), len(features)))
+        comoment[np.ix_(present, present)] = self.comoment[np.ix_(taken, taken)]
+        return Moments(tuple(features), self.n, mean, comoment, self.excluded)
+
+    def merge(self, other):
+        """Moments of the rows of both (Chan et al.'s pairwise update)."""
+        features = self.features + tuple(f for f in other.features if f not in self.features)
+        a, b = self.aligned(features), other.aligned(features)
+        n = a.n + b.n
+        if not a.n or not b.n:
+            mean, comoment = (b.mean, b.comoment) if not a.n else (a.mean, a.comoment)
+        else:
+            delta = b.mean - a.mean
+            mean = a.mean + delta * (b.n / n)
+            comoment = a.comoment + b.comoment + np.outer(delta, delta) * (a.n * b.n / n)
+        return Moments(features, n, mean, comoment, a.excluded + b.excluded)
+
+    def covariance(self):
+        """Sample covariance matrix as a DataFrame indexed by feature."""
+        values = self.comoment / (self.n - 1) if self.n > 1 else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(values, index=list(self.features), columns=list(self.features))
+
+    def correlation(self):
+        """Pearson correlation matrix; constant features correlate as NaN."""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = self.comoment / np.outer(scale, scale)
+        values[:, scale == 0] = np.nan
+        values[scale == 0, :] = np.nan
+        return pd.DataFrame(values, index=list(self.features), columns=list(self.features))
+
+    def association(self, target=TARGET):
+        """Features ranked by the strength of their association with `target`.
+
+        ``Correlation`` is the pairwise Pearson correlation (point-biserial for
+        numeric features, phi for one-hot levels).  ``Partial_Coefficient`` is
+        the feature's standardised coefficient in a linear model of `target` on
+        all features together, which separates factors that only co-occur.
+        """
+        corr = self.correlation()
+        if target not in corr.columns:
+            return pd.DataFrame(columns=["Feature", "Correlation", "Partial_Coefficient"])
+        usable = [f for f in corr.columns if f != target and not np.isnan(corr.at[f, f])]
+        xx = corr.loc[usable, usable].to_numpy()
+        xy = corr.loc[usable, target].to_numpy()
+        partial = np.linalg.pinv(xx, PINV_RCOND, hermitian=True) @ xy if usable else np.empty(0)  # pinv: one-hot levels are collinear
+        ranking = pd.DataFrame({"Feature": usable, "Correlation": xy, "Partial_Coefficient": partial})
+        order = ranking["Correlation"].abs().sort_values(ascending=False, kind="stable").index
+        return ranking.loc[order].reset_index(drop=True)
+
+
+def empty_moments():
+    return Moments((), 0, np.zeros(0), np.zeros((0, 0)))
+
+
+def choose_levels(values):
+    """One-hot levels ``{column: levels}`` from each categorical column's distinct values in the whole dataset.
+
+    Columns with more than `MAX_LEVELS` values are left out.
+    """
+    return {
+        column: tuple(sorted(found, key=str))
+        for column, found in values.items() if len(found) <= MAX_LEVELS
+    }
+
+
+def encode(frame, levels=None):
+    """Feature matrix of a frame: numeric features as floats, categorical ones one-hot as ``Column=value``.
+
+    `levels` (see `choose_levels`) fixes the one-hot columns for every chunk
+    of a dataset; without it they are chosen from `frame` alone.  Returns
+    ``(features, matrix, excluded_rows)``, leaving out rows with a missing or
+    non-numeric value.
+    """
+    if levels is None:
+        levels = choose_levels({
+            column: pd.unique(frame[column].dropna()) for column in CATEGORICAL_FEATURES if column in frame.columns
+        })
+    names, blocks = [], []
+    for column in NUMERIC_FEATURES:
+        if column in frame.columns:
+            names.append(column)
+            blocks.append(pd.to_numeric(frame[column], errors="coerce").to_numpy(np.float64))
+    for column in CATEGORICAL_FEATURES:
+        if column not in frame.columns or column not in levels:
+            continue
+        values = frame[column].to_numpy()
+        for level in levels[column]:
+            names.append(f"{column}={level}")
+            blocks.append((values == level).astype(np.float64))
+    matrix = np.column_stack(blocks) if blocks else np.empty((len(frame), 0))
+    complete = ~np.isnan(matrix).any(axis=1)
+    return tuple(names), matrix[complete], int(len(frame) - complete.sum())
+
+
+def moments_of(frame, levels=None):
+    """Moments of one frame (or chunk) in a single vectorised pass."""
+    features, matrix, excluded = encode(frame, levels)
+    n = len(matrix)
+    mean = matrix.mean(axis=0) if n else np.zeros(len(features))
+    centred = matrix - mean
+    return Moments(features, n, mean, centred.T @ centred, excluded)
+
+
+def moments_of_chunks(frames, levels=None):
+    """Merged moments of an iterable of frames, one-hot encoded with `levels`."""
+    total = empty_moments()
+    for frame in frames:
+        total = total.merge(moments_of(frame, levels))
+    return total
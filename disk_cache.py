@@ -0,0 +1,202 @@
+"""Disk-backed cache shared by every dashboard process on a host.
+
+Streamlit's in-memory caches are per process and are lost on every deploy.
+`DiskCache` keeps pickled aggregate results and figure dicts in a directory
+instead, so all workers on a host, and the next deploy, reuse each other's
+work.  Callers key entries by anything that identifies the result: the
+dataset's file signature, the filters and the value mode (see
+`DataSource._memo` and `FigureCache`).
+
+* Writes go to a temporary file that is renamed into place, so readers in
+  other processes see either the whole entry or none of it.
+* The directory is kept under `max_bytes` by evicting least recently used
+  entries; a hit refreshes the entry's modification time, which is what
+  eviction orders by, so recency is shared between processes too.  Each
+  writer re-measures the directory every `RESCAN_SECONDS`, so the cap can be
+  overshot by what other processes wrote in between.
+* Each process counts its hits, misses, writes and evictions.
+
+Entries are pickles, so the directory must only be writable by the user the
+dashboard runs as: it is created with mode 0700, and an existing directory
+that is a symlink, belongs to another user or is open to others is refused
+(see `private_directory`).  The default location, `user_cache_dir()`, is per
+user rather than in the shared, world-writable temp directory.
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import threading
+import time
+
+MISSING = object()
+SUFFIX = ".pkl"
+LOW_WATER = 0.9          # eviction frees space down to this fraction of the cap
+MAX_ENTRY_FRACTION = 0.1  # larger values are not worth caching
+STALE_TMP_SECONDS = 3600  # temporary files older than this were left by a crashed writer
+RESCAN_SECONDS = 30  # how often a writer re-measures the directory to see other processes' writes
+
+
+class DiskCache:
+    """Size-capped LRU of pickled values in `directory`, safe to share between processes."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        private_directory(directory)
+        self._bytes = sum(size for _, _, size in self._entries())
+        self._measured = time.monotonic()
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest + SUFFIX)
+
+    def get(self, key, default=MISSING):
+        """The value stored under `key`, or `default`."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as entry:
+                value = pickle.load(entry)
+            os.utime(path)  # mark as recently used for every process
+        except FileNotFoundError:
+            value = default
+        except Exception:  # truncated by a full disk, unreadable after an upgrade, ...
+            value = default
+            with self._lock:
+                self.errors += 1
+        with self._lock:
+            if value is default:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store `value` under `key`; values that cannot be pickled or are too large are skipped."""
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return False
+        if len(data) > self.max_bytes * MAX_ENTRY_FRACTION:
+            return False
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as entry:
+                entry.write(data)
+            replaced = _size(path)
+            os.replace(tmp_path, path)
+        except OSError:
+            with self._lock:
+                self.errors += 1
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        with self._lock:
+            self.writes += 1
+            self._bytes += len(data) - replaced
+            due = self._bytes > self.max_bytes or time.monotonic() - self._measured > RESCAN_SECONDS
+        if due:
+            self.evict()
+        return True
+
+    def _entries(self):
+        """``(mtime, path, size)`` of every entry; also removes stale temporary files."""
+        entries = []
+        now = time.time()
+        with os.scandir(self.directory) as scan:
+            for item in scan:
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:
+                    continue  # evicted by another process meanwhile
+                if item.name.endswith(SUFFIX):
+                    entries.append((stat.st_mtime, item.path, stat.st_size))
+                elif item.name.endswith(".tmp") and now - stat.st_mtime > STALE_TMP_SECONDS:
+                    _remove(item.path)
+        return entries
+
+    def evict(self):
+        """Re-measure the directory; over the cap, remove least recently used entries down to the low-water mark."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, _, size in entries)
+            if total > self.max_bytes:
+                target = self.max_bytes * LOW_WATER
+                for _, path, size in entries:
+                    if total <= target:
+                        break
+                    if _remove(path):
+                        self.evictions += 1
+                    total -= size
+            self._bytes = total
+            self._measured = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            for _, path, _ in self._entries():
+                _remove(path)
+            self._bytes = 0
+
+    def usage(self):
+        """Bytes on disk as last measured by this process, plus its own writes since."""
+        with self._lock:
+            return self._bytes
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits, misses=self.misses, hit_ratio=self.hits / lookups if lookups else None,
+                writes=self.writes, evictions=self.evictions, errors=self.errors,
+                bytes=self._bytes, max_bytes=self.max_bytes,
+            )
+
+
+def user_cache_dir(*parts):
+    """Per-user cache directory: ``$XDG_CACHE_HOME/eda``, by default ``~/.cache/eda``, joined with `parts`."""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(root, "eda", *parts)
+
+
+def private_directory(path):
+    """Create `path` with mode 0700, or check that the existing one is private to this user; returns `path`.
+
+    Raises PermissionError for a symlink or a directory owned by another user
+    or accessible to others: whoever can write there can plant files this
+    process will load.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.name != "posix":
+        return path
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.geteuid() or info.st_mode & 0o077:
+        raise PermissionError(f"{path} must be a directory owned by the current user with mode 0700")
+    return path
+
+
+def _size(path):
+    """Size of the entry at `path`, 0 when there is none."""
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False  # another process got there first
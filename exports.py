@@ -0,0 +1,269 @@
+"""Streaming CSV/Parquet export for the vehicle maintenance dashboard.
+
+`st.download_button` needs the whole file in memory for every request, so
+exports are served by a small HTTP sidecar instead.  The app registers an
+export (rows of a `DataSource` matching some filters, or a small aggregate
+frame) and links to it; when the link is opened the rows are read from the
+source in chunks and encoded chunk by chunk, so memory stays bounded by the
+chunk size whatever the size of the result:
+
+    server = start_export_server(9465, base_url="http://localhost:{port}")
+    url = server.rows_url(source, [("Tire_Condition", "==", "Worn Out")], fmt="parquet")
+
+Export links are unguessable tokens derived from what they export; the sidecar
+binds to localhost unless told otherwise.  Tokens live in the process that
+issued them, so with several workers each one needs its own port and a link
+base that reaches that worker (app.py: ``EDA_EXPORT_PORT`` plus
+``EDA_WORKER_INDEX``, and ``EDA_EXPORT_URL`` with ``{port}`` or ``{worker}``).
+"""
+
+import hashlib
+import io
+import itertools
+import re
+import secrets
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+MAX_JOBS = 256
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+class ExportTooLarge(Exception):
+    pass
+
+
+class _Spool(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def csv_chunks(frames):
+    """Encode DataFrames as one CSV stream: the header once, then each chunk's rows."""
+    header = True
+    for frame in frames:
+        yield frame.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def parquet_chunks(frames):
+    """Encode DataFrames as one Parquet file, one row group per chunk.
+
+    The file's schema comes from the first chunk, with all-null columns
+    written as strings; later chunks are converted to it, so a column that is
+    NaN or null in some chunks becomes nullable rather than failing.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink, writer = _Spool(), None
+    for frame in frames:
+        if writer is None:
+            schema = pa.Table.from_pandas(frame, preserve_index=False).schema
+            schema = pa.schema(
+                [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema],
+                metadata=schema.metadata,
+            )
+            writer = pq.ParquetWriter(sink, schema)
+        writer.write_table(pa.Table.from_pandas(frame, schema=writer.schema, preserve_index=False))
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {"csv": csv_chunks, "parquet": parquet_chunks}
+
+
+def figure_data(title, fig):
+    """Long-format frame of the values drawn in a Plotly figure: one row per bar, slice, point or heatmap cell.
+
+    Series and Category are strings, since charts mix numeric and text axes.
+    """
+    frames = []
+    for trace in fig.data:
+        if getattr(trace, "z", None) is not None:  # heatmap: one row per cell
+            z = np.asarray(trace.z)
+            x = list(trace.x) if trace.x is not None else list(range(z.shape[1]))
+            y = list(trace.y) if trace.y is not None else list(range(z.shape[0]))
+            frames.append(pd.DataFrame({
+                "Chart": title, "Series": np.repeat(y, len(x)), "Category": x * len(y), "Value": z.ravel()
+            }))
+            continue
+        if getattr(trace, "labels", None) is not None:  # pie
+            x, y = trace.labels, trace.values
+        else:
+            x, y = trace.x, trace.y
+        if x is None or y is None:
+            continue
+        frames.append(pd.DataFrame({"Chart": title, "Series": trace.name or "", "Category": list(x), "Value": list(y)}))
+    if not frames:
+        return pd.DataFrame(columns=["Chart", "Series", "Category", "Value"])
+    data = pd.concat(frames, ignore_index=True)
+    return data.astype({"Series": str, "Category": str})
+
+
+class _Job:
+    def __init__(self, filename, fmt, frames, rows):
+        self.filename = filename
+        self.fmt = fmt
+        self.frames = frames  # callable returning an iterator of DataFrames
+        self.rows = rows
+
+
+def _with_columns(frames, columns):
+    """Yield `frames`, or one empty frame with `columns` so headers and schemas are still written."""
+    empty = True
+    for frame in frames:
+        empty = False
+        yield frame
+    if empty:
+        yield pd.DataFrame(columns=columns)
+
+
+def _slug(text):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(text)).strip("_") or "export"
+
+
+class ExportServer:
+    """HTTP sidecar streaming registered exports; limits of 0 mean unlimited."""
+
+    def __init__(self, host, port, base_url, max_rows=0, max_bytes=0, chunk_rows=CHUNK_ROWS):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.chunk_rows = chunk_rows
+        self._secret = secrets.token_bytes(16)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _ExportHandler)
+        self._httpd.exports = self
+        self.port = self._httpd.server_address[1]
+        self.base_url = base_url.format(port=self.port).rstrip("/")
+
+    def serve_in_background(self):
+        threading.Thread(target=self._httpd.serve_forever, name="eda-exports", daemon=True).start()
+        return self
+
+    def too_large(self, rows):
+        return bool(self.max_rows) and rows > self.max_rows
+
+    def _register(self, description, job):
+        token = hashlib.sha256(self._secret + repr(description).encode()).hexdigest()[:32]
+        with self._lock:
+            self._jobs[token] = job
+            self._jobs.move_to_end(token)
+            while len(self._jobs) > MAX_JOBS:
+                self._jobs.popitem(last=False)
+        return f"{self.base_url}/export/{token}/{job.filename}"
+
+    def rows_url(self, source, where=None, columns=None, fmt="csv", name="rows"):
+        """Link streaming the rows of `source` matching `where` (dataset order)."""
+        columns = list(columns or source.columns)
+        where = [tuple(clause) for clause in where or ()]
+        rows = source.row_count(where)
+        frames = lambda: _with_columns(source.iter_rows(where, columns, self.chunk_rows), columns)
+        job = _Job(_slug(name) + FORMATS[fmt][1], fmt, frames, rows)
+        return self._register(("rows", id(source), where, columns, fmt, name), job)
+
+    def frame_url(self, frame, fmt="csv", name="aggregates"):
+        """Link streaming a small, already computed frame such as a chart's aggregates."""
+        digest = hashlib.sha1(pd.util.hash_pandas_object(frame, index=False).values.tobytes()).hexdigest()
+        chunks = lambda: (frame.iloc[i:i + self.chunk_rows] for i in range(0, max(len(frame), 1), self.chunk_rows))
+        job = _Job(_slug(name) + FORMATS[fmt][1], fmt, chunks, len(frame))
+        return self._register(("frame", digest, tuple(frame.columns), fmt, name), job)
+
+    def stream(self, token):
+        """Return ``(job, chunks)`` for a token; raises KeyError or ExportTooLarge."""
+        with self._lock:
+            job = self._jobs[token]
+        if self.too_large(job.rows):
+            raise ExportTooLarge(f"{job.rows:,} rows exceeds the export limit of {self.max_rows:,}")
+        return job, ENCODERS[job.fmt](job.frames())
+
+
+class _ExportHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # chunked transfer encoding
+
+    def do_GET(self):
+        exports = self.server.exports
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if len(parts) < 2 or parts[0] != "export":
+            self.send_error(404)
+            return
+        try:
+            job, chunks = exports.stream(parts[1])
+            first = next(chunks, b"")  # encoding errors in the first chunk still get an error status
+        except KeyError:
+            self.send_error(404, "Unknown or expired export")
+            return
+        except ExportTooLarge as exc:
+            self.send_error(413, str(exc))
+            return
+        except Exception as exc:
+            self.send_error(500, f"Export failed: {exc}")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[job.fmt][0])
+        self.send_header("Content-Disposition", f'attachment; filename="{job.filename}"')
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        for chunk in itertools.chain([first], chunks):
+            if not chunk:
+                continue
+            sent += len(chunk)
+            if exports.max_bytes and sent > exports.max_bytes:
+                # No terminating chunk: the client sees a truncated, failed download
+                self.close_connection = True
+                return
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(chunk), chunk))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_export_server(port, host="127.0.0.1", base_url="http://localhost:{port}", **limits):
+    """Start the export sidecar in a daemon thread; `base_url` may contain ``{port}``.
+
+    Raises OSError when `port` is unavailable: falling back to another port
+    would hand out links that the configured URL, or a proxy routing to this
+    worker, never reaches.
+    """
+    try:
+        server = ExportServer(host, port, base_url, **limits)
+    except OSError as exc:
+        raise OSError(
+            f"Export sidecar cannot listen on {host}:{port} ({exc}); give each worker its own port "
+            f"with EDA_WORKER_INDEX, or set EDA_EXPORT_PORT=0 to disable exports"
+        ) from exc
+    return server.serve_in_background()
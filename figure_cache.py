@@ -0,0 +1,156 @@
+"""In-memory LRU cache for figures built with plotly.express.
+
+Building a Plotly Express figure costs tens of milliseconds even for a handful
+of bars, and the dashboard rebuilds about thirty of them on every rerun from
+aggregates that rarely change.  `FigureCache.wrap(px)` returns a stand-in for
+the ``px`` module whose functions are memoised on their arguments: DataFrames
+are keyed by a hash of their contents, so a figure is only rebuilt when the
+data, columns or options behind it change.
+
+Cached figures are stored as plain dicts and rebuilt without re-validation,
+so callers get an independent figure they can keep updating in place.  Plotly
+stores numeric arrays base64-encoded in those dicts; they are decoded back to
+numpy arrays on a hit so cached traces behave exactly like freshly built ones.
+
+Given a `DiskCache` (disk_cache.py), figure dicts are also shared with the
+other workers on the host and survive restarts: an in-memory miss is looked
+up on disk before the figure is built.  The px call's fingerprint already
+covers the dataset, filters and value mode behind the figure, since those
+only reach a figure through its data and options.  The default template is
+part of the key too: px bakes it into the figure, and the dashboard (under
+Streamlit's template) shares the cache with the report and notebook.
+"""
+
+import base64
+import functools
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from instrumentation import span
+
+
+def _fingerprint(value):
+    """Stable, hashable description of one px argument."""
+    if isinstance(value, pd.DataFrame):
+        digest = hashlib.sha1(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        digest.update(repr(list(value.columns)).encode())
+        return ("frame", digest.hexdigest())
+    if isinstance(value, (list, tuple)):
+        return tuple(_fingerprint(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _fingerprint(v)) for k, v in value.items()))
+    return repr(value)
+
+
+def _decode_arrays(value):
+    """Copy of a figure dict with Plotly's base64 ``{dtype, bdata}`` arrays decoded."""
+    if isinstance(value, dict):
+        if "bdata" in value and "dtype" in value:
+            array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"]).copy()
+            if "shape" in value:
+                array = array.reshape([int(n) for n in str(value["shape"]).split(",")])
+            return array
+        return {k: _decode_arrays(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_arrays(v) for v in value]
+    if isinstance(value, np.ndarray) and value.dtype == object:
+        return value.copy()
+    return value
+
+
+def _dict_size(value):
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_dict_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_dict_size(v) for v in value)
+    return getattr(value, "nbytes", None) or sys.getsizeof(value)
+
+
+class FigureCache:
+    """Bounded LRU of figure dicts keyed by the px call that built them."""
+
+    def __init__(self, max_entries=256, disk=None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, name, build, args, kwargs):
+        key = (name, _fingerprint(pio.templates.default), _fingerprint(args), _fingerprint(kwargs))
+        with span("figure_build", kwargs.get("title") or name) as fields:
+            with self._lock:
+                cached = self._figures.get(key)
+                if cached is not None:
+                    self._figures.move_to_end(key)
+                    self.hits += 1
+            if cached is None and self.disk is not None:
+                cached = self.disk.get(("figure", plotly.__version__, key), None)
+                if cached is not None:
+                    fields["cache"] = "disk"
+                    self._store(key, cached)
+            if cached is not None:
+                fields.setdefault("cache", "hit")
+                fig = go.Figure(_decode_arrays(cached), _validate=False)
+                # The cached dict was valid; validate the caller's updates as usual
+                fig._validate = True
+                for trace in fig.data:
+                    trace._validate = True
+                return fig
+
+            fields["cache"] = "miss"
+            fig = build(*args, **kwargs)
+            stored = fig.to_dict()
+            with self._lock:
+                self.misses += 1
+            self._store(key, stored)
+            if self.disk is not None:
+                self.disk.put(("figure", plotly.__version__, key), stored)
+            return fig
+
+    def _store(self, key, stored):
+        with self._lock:
+            self._figures[key] = stored
+            self._sizes[key] = _dict_size(stored)
+            while len(self._figures) > self.max_entries:
+                old, _ = self._figures.popitem(last=False)
+                self._sizes.pop(old, None)
+
+    def wrap(self, module):
+        """Return a stand-in for `module` whose callables go through this cache."""
+        return _CachedModule(module, self)
+
+    def cache_usage(self):
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def evict_caches(self):
+        with self._lock:
+            self._figures.clear()
+            self._sizes.clear()
+
+
+class _CachedModule:
+    def __init__(self, module, cache):
+        self._module = module
+        self._cache = cache
+
+    def __getattr__(self, attr):
+        value = getattr(self._module, attr)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def cached(*args, **kwargs):
+            return self._cache.get_or_build(attr, value, args, kwargs)
+        return cached
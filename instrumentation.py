@@ -0,0 +1,147 @@
+"""Hot-path timing for dashboard reruns.
+
+Each Streamlit rerun gets a `RerunTimings` bound to the script thread.  Code on
+the hot path records spans into it without passing it around:
+
+    with span("kpi", "Maintenance KPIs"):
+        ...
+
+`DataSource` aggregations, cached figure builds and figure serialisation are
+recorded this way; `enter_section()` marks where each analysis section of the page
+begins.  A finished rerun is appended to a JSON-lines log and can optionally
+be profiled with cProfile.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class RerunTimings:
+    """Spans and per-section wall times recorded during one rerun."""
+
+    def __init__(self, **context):
+        self.context = context
+        self.started = time.time()
+        self.spans = []
+        self.sections = {}
+        self.total_ms = None
+        self.profile = None
+        self._t0 = time.perf_counter()
+        self._open = []
+        self._section = None
+        self._section_t0 = None
+
+    @contextmanager
+    def span(self, kind, name, **fields):
+        """Time the enclosed block; callers may add fields to the yielded dict."""
+        t0 = time.perf_counter()
+        nested = kind in self._open
+        self._open.append(kind)
+        try:
+            yield fields
+        finally:
+            self._open.pop()
+            self.spans.append(dict(
+                kind=kind, name=name, section=self._section, nested=nested,
+                ms=round((time.perf_counter() - t0) * 1000, 3), **fields,
+            ))
+
+    def enter_section(self, name):
+        now = time.perf_counter()
+        self._close_section(now)
+        self._section, self._section_t0 = name, now
+
+    def _close_section(self, now):
+        if self._section is not None:
+            elapsed = (now - self._section_t0) * 1000
+            self.sections[self._section] = round(self.sections.get(self._section, 0.0) + elapsed, 3)
+            self._section = None
+
+    def finish(self):
+        now = time.perf_counter()
+        self._close_section(now)
+        self.total_ms = round((now - self._t0) * 1000, 3)
+        return self
+
+    def totals(self):
+        """Milliseconds per span kind, not double-counting spans nested in one of the same kind."""
+        totals = {}
+        for record in self.spans:
+            if not record["nested"]:
+                totals[record["kind"]] = round(totals.get(record["kind"], 0.0) + record["ms"], 3)
+        return totals
+
+    def to_record(self):
+        return dict(
+            ts=self.started, total_ms=self.total_ms, sections=self.sections,
+            totals=self.totals(), spans=self.spans, **self.context,
+        )
+
+
+def start_rerun(profile=False, **context):
+    """Begin recording a rerun on this thread, optionally under cProfile."""
+    timings = RerunTimings(**context)
+    if profile:
+        timings.profile = cProfile.Profile()
+        timings.profile.enable()
+    _local.current = timings
+    return timings
+
+
+def current():
+    return getattr(_local, "current", None)
+
+
+def finish_rerun(log_path=None):
+    """Stop recording, append the rerun to `log_path` (JSON lines) and return its timings."""
+    timings = current()
+    if timings is None:
+        return None
+    if timings.profile is not None:
+        timings.profile.disable()
+    timings.finish()
+    _local.current = None
+    if log_path:
+        line = json.dumps(timings.to_record(), default=str)
+        with _log_lock:
+            directory = os.path.dirname(log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(log_path, "a", encoding="utf-8") as log:
+                log.write(line + "\n")
+    return timings
+
+
+@contextmanager
+def span(kind, name, **fields):
+    """Record a span in the current rerun; a no-op outside of one."""
+    timings = current()
+    if timings is None:
+        yield fields
+        return
+    with timings.span(kind, name, **fields) as extra:
+        yield extra
+
+
+def enter_section(name):
+    timings = current()
+    if timings is not None:
+        timings.enter_section(name)
+
+
+def profile_report(timings, limit=30):
+    """Top functions of a profiled rerun by cumulative time, as text."""
+    if timings is None or timings.profile is None:
+        return ""
+    out = io.StringIO()
+    pstats.Stats(timings.profile, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,198 @@
+"""Headless multi-session load test for the vehicle maintenance dashboard.
+
+Simulates analysts against one app.py process with Streamlit's AppTest: each
+session logs in, then repeatedly switches "Select Analysis Category:" and
+toggles "Display Value As:", timing every rerun.  Sessions run in threads
+that share the process-wide caches, as sessions on one Streamlit server do.
+For each concurrency level it reports rerun latency percentiles, throughput
+and process memory:
+
+    python load_test.py --sessions 1 5 10 25 50 --actions 20
+    python load_test.py --rows 1M --sessions 10          # synthetic data
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from memory_governor import MB, process_rss
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+CATEGORIES = [
+    "All", "Vehicle Category Analysis", "Maintenance and Condition Analysis",
+    "Fuel and Engine Performance Analysis", "Reported Issue and Risk Analysis",
+    "Descriptive Analysis", "Diagnostic Analysis", "Data Quality",
+]
+VALUE_TYPES = ["Show as Count", "Show as Percentage"]
+
+DEFAULT_SESSIONS = [1, 5, 10, 25]
+DEFAULT_OUTPUT = "load_results.jsonl"
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of `values` (q in 0-100)."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def share_apptest_runtime():
+    """Let AppTest sessions run concurrently in one process.
+
+    Every `AppTest.run()` installs a fresh mock Runtime and patches the config
+    for the duration of the run, then resets both, which breaks any other
+    session running at the same time; it also recompiles the script, and
+    concurrent compiles are not thread-safe on every Python version.  Install
+    one Runtime, config and script cache for the whole process instead, as a
+    real server shares them between all of its sessions.
+    """
+    from contextlib import nullcontext
+    from unittest.mock import MagicMock
+
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    config.set_option("global.appTest", True)
+    app_test.Runtime = type("Runtime", (), {"_instance": None})  # absorbs the per-run install and reset
+    app_test.patch_config_options = lambda overrides: nullcontext()
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+class Session:
+    """One simulated analyst driving its own AppTest instance."""
+
+    def __init__(self, seed, username, password, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.rng = random.Random(seed)
+        self.username = username
+        self.password = password
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.latencies = []
+        self.errors = 0
+
+    def _timed(self, action):
+        t0 = time.perf_counter()
+        action()
+        self.latencies.append((time.perf_counter() - t0) * 1000)
+        if self.at.exception:
+            self.errors += 1
+
+    def login(self):
+        self._timed(self.at.run)
+        self.at.text_input[0].input(self.username)
+        self.at.text_input[1].input(self.password)
+        self._timed(self.at.button[0].click().run)
+        if not self.at.session_state["logged_in"]:
+            raise RuntimeError(f"login as {self.username!r} failed")
+
+    def act(self):
+        """Switch category or toggle the value type, as an analyst would."""
+        if self.rng.random() < 0.5:
+            category = self.at.sidebar.selectbox[0]
+            choice = self.rng.choice([c for c in CATEGORIES if c != category.value])
+            self._timed(category.set_value(choice).run)
+        else:
+            radio = self.at.sidebar.radio[0]
+            choice = VALUE_TYPES[1 - VALUE_TYPES.index(radio.value)]
+            self._timed(radio.set_value(choice).run)
+
+
+def run_level(n_sessions, args):
+    """Run `n_sessions` concurrent sessions; return the level's result record."""
+    barrier = threading.Barrier(n_sessions)
+    sessions = [
+        Session(args.seed + i, args.username, args.password, args.timeout) for i in range(n_sessions)
+    ]
+
+    def drive(session):
+        session.login()
+        session.latencies.clear()  # report steady-state interaction only
+        barrier.wait()
+        for _ in range(args.actions):
+            session.act()
+            if args.think:
+                time.sleep(session.rng.uniform(0, 2 * args.think))
+
+    rss_before = process_rss()
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        t0 = time.perf_counter()
+        list(pool.map(drive, sessions))
+        elapsed = time.perf_counter() - t0
+    rss_after = process_rss()
+
+    latencies = [ms for session in sessions for ms in session.latencies]
+    return dict(
+        sessions=n_sessions,
+        reruns=len(latencies),
+        errors=sum(session.errors for session in sessions),
+        p50_ms=round(percentile(latencies, 50), 1),
+        p95_ms=round(percentile(latencies, 95), 1),
+        p99_ms=round(percentile(latencies, 99), 1),
+        mean_ms=round(statistics.fmean(latencies), 1),
+        throughput_rps=round(len(latencies) / elapsed, 2),
+        rss_bytes=rss_after,
+        rss_per_session_bytes=round((rss_after - rss_before) / n_sessions),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test app.py with concurrent headless sessions")
+    parser.add_argument("--sessions", nargs="+", type=int, default=DEFAULT_SESSIONS, help="concurrency levels")
+    parser.add_argument("--actions", type=int, default=20, help="interactions per session")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between interactions (s)")
+    parser.add_argument("--data", help="dataset for EDA_DATA_SOURCE (default: the app's)")
+    parser.add_argument("--rows", help="use a synthetic dataset of this many rows instead, e.g. 1M")
+    parser.add_argument("--username", default="analyst")
+    parser.add_argument("--password", default="veh2024")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per rerun")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    if args.rows:
+        from benchmark import DEFAULT_DATA_DIR, dataset_path
+        args.data = dataset_path(DEFAULT_DATA_DIR, args.rows, args.seed)
+    if args.data:
+        os.environ["EDA_DATA_SOURCE"] = args.data
+    os.environ.update(EDA_TIMING_LOG="", EDA_METRICS_PORT="0")
+
+    from benchmark import git_revision
+    version = git_revision()
+    share_apptest_runtime()
+
+    # Load the dataset and fill the shared caches before the first measured level
+    warmup = Session(args.seed, args.username, args.password, args.timeout)
+    warmup.login()
+
+    with open(args.output, "a", encoding="utf-8") as output:
+        for n_sessions in args.sessions:
+            record = dict(version=version, ts=time.time(), data=os.environ.get("EDA_DATA_SOURCE"),
+                          actions=args.actions, think=args.think, **run_level(n_sessions, args))
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            print(
+                f"{n_sessions:>4} sessions  p50 {record['p50_ms']:>8,.0f} ms  p95 {record['p95_ms']:>8,.0f} ms  "
+                f"p99 {record['p99_ms']:>8,.0f} ms  {record['throughput_rps']:>6.2f} reruns/s  "
+                f"RSS {record['rss_bytes'] / MB:>7,.0f} MiB ({record['rss_per_session_bytes'] / MB:+.1f}/session)"
+                + (f"  {record['errors']} errors" if record["errors"] else "")
+            )
@@ -0,0 +1,131 @@
+"""Memory budget governor for the vehicle maintenance dashboard.
+
+Every Streamlit session on a server shares one process, so a single oversized
+dataset can take all of them down.  The governor keeps the process inside a
+configured budget in three ways:
+
+* before loading, it estimates a CSV's in-memory size and picks a load mode:
+  ``full``, ``sampled`` (a random fraction of rows) or ``aggregate-only``
+  (the CSV is spilled to an indexed SQLite snapshot and never held as rows);
+* on every rerun, when the process is over the soft limit, it evicts memoised
+  aggregates and any registered caches, then unloads re-readable rows.  RSS
+  rarely drops after an eviction (freed memory stays with the allocator), so
+  it evicts again only once RSS has grown since or the caches have refilled;
+* it refuses raw-row views unless the dataset is fully loaded and memory is
+  under the soft limit.
+"""
+
+import os
+import resource
+from dataclasses import dataclass, field
+
+MB = 1024 * 1024
+
+# Parsed pandas frames with text columns take roughly this many times the CSV size.
+CSV_EXPANSION = 3.0
+MIN_SAMPLE_FRACTION = 0.01
+# Over the soft limit, evict again only when RSS grew by this fraction of the budget since the
+# last eviction, or the caches hold at least this fraction of it.
+EVICT_REGROWTH_RATIO = 0.02
+EVICT_MIN_CACHE_RATIO = 0.05
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024  # KiB on Linux, bytes on macOS
+
+
+def process_rss():
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return peak_rss()  # not Linux: the peak is the best available bound
+
+
+@dataclass
+class MemoryStatus:
+    budget: int
+    rss: int
+    dataset: int
+    caches: int
+    load_mode: str
+    actions: list = field(default_factory=list)
+    raw_rows_allowed: bool = True
+
+    @property
+    def fraction(self):
+        return min(self.rss / self.budget, 1.0) if self.budget else 0.0
+
+
+class MemoryGovernor:
+    """Enforces a per-process memory budget (in bytes) on a data source and its caches.
+
+    `over_budget` picks what happens to a CSV that would not fit: "aggregate"
+    spills it to SQLite so all aggregates stay exact, "sample" loads a random
+    fraction of its rows.
+    """
+
+    def __init__(self, budget, soft_ratio=0.85, over_budget="aggregate"):
+        if over_budget not in ("aggregate", "sample"):
+            raise ValueError(f"over_budget must be 'aggregate' or 'sample', not {over_budget!r}")
+        self.budget = budget
+        self.soft_limit = int(budget * soft_ratio)
+        self.over_budget = over_budget
+        self.caches = []
+        self._evicted_rss = None  # RSS right after the last eviction
+
+    def register_cache(self, cache):
+        """Track an extra cache exposing ``cache_usage()`` and ``evict_caches()``."""
+        self.caches.append(cache)
+
+    def plan_load(self, uri):
+        """Return ``(load_mode, sample_fraction)`` for opening `uri` within the budget."""
+        if not self.budget or not os.path.isfile(uri) or not uri.endswith(".csv"):
+            # SQLite sources never hold rows; partitions load lazily and are governed at runtime.
+            return "full", None
+        estimate = os.path.getsize(uri) * CSV_EXPANSION
+        headroom = self.soft_limit - process_rss()
+        if estimate <= headroom:
+            return "full", None
+        if self.over_budget == "sample" and headroom > 0:
+            return "sampled", max(MIN_SAMPLE_FRACTION, headroom / estimate)
+        return "aggregate-only", None
+
+    def _usage(self, source):
+        caches = source.cache_usage() + sum(cache.cache_usage() for cache in self.caches)
+        return process_rss(), source.memory_usage(), caches
+
+    def _eviction_due(self, rss, caches):
+        """Whether evicting would help: RSS grew since the last eviction, or the caches are big enough to matter."""
+        if self._evicted_rss is None or caches >= self.budget * EVICT_MIN_CACHE_RATIO:
+            return True
+        return rss > self._evicted_rss + self.budget * EVICT_REGROWTH_RATIO
+
+    def enforce(self, source):
+        """Measure usage, degrade until the process fits, and report what was done."""
+        rss, dataset, caches = self._usage(source)
+        actions = []
+        if self.budget and rss > self.soft_limit and self._eviction_due(rss, caches):
+            source.evict_caches()
+            for cache in self.caches:
+                cache.evict_caches()
+            actions.append("evicted cached aggregates and figures")
+            rss, dataset, caches = self._usage(source)
+            self._evicted_rss = rss
+        elif rss <= self.soft_limit:
+            self._evicted_rss = None
+        if self.budget and rss > self.budget and source.release_rows():
+            actions.append("unloaded partition rows (aggregate-only until reloaded)")
+            rss, dataset, caches = self._usage(source)
+        return MemoryStatus(
+            budget=self.budget,
+            rss=rss,
+            dataset=dataset,
+            caches=caches,
+            load_mode=source.load_mode,
+            actions=actions,
+            raw_rows_allowed=source.load_mode == "full" and (not self.budget or rss <= self.soft_limit),
+        )
@@ -0,0 +1,181 @@
+"""Prometheus metrics for the vehicle maintenance dashboard.
+
+Metrics are derived from each finished rerun's `RerunTimings` (see
+instrumentation.py), so the hot path pays nothing extra for them:
+
+* ``eda_rerun_duration_seconds{category}``: rerun latency histogram per
+  analysis category;
+* ``eda_cache_requests_total{cache, result}``: hits and misses of the data,
+  aggregate and figure caches; aggregates and figures found in the shared
+  disk cache after an in-memory miss count as ``result="disk"``;
+* ``eda_disk_cache_*``: lookups, writes, evictions and size of that disk
+  cache (disk_cache.py), as seen by this process;
+* ``eda_dataset_load_duration_seconds``: time spent actually loading a dataset;
+* ``eda_process_resident_memory_bytes``: process RSS at scrape time.
+
+`start_metrics_server()` serves the text exposition format on
+``http://127.0.0.1:<port>/metrics`` from a daemon thread.  Every metric is
+per process, so each worker on a host needs its own port (app.py uses the
+base port plus ``EDA_WORKER_INDEX``) and its own scrape target.
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from memory_governor import process_rss
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOAD_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+
+# Span kinds (instrumentation.py) that are cache lookups, and the cache they report as
+CACHE_SPANS = {"data_load": "data", "aggregation": "aggregate", "figure_build": "figure"}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        counts, total, n = self._series.get(key, ([0] * len(self.buckets), 0.0, 0))
+        counts = [c + (value <= bound) for c, bound in zip(counts, self.buckets)]
+        self._series[key] = (counts, total + value, n + 1)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, n) in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', bound),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {n}")
+            lines.append(f"{self.name}_sum{_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_labels(key)} {n}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._series = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(key)} {value}" for key, value in sorted(self._series.items())]
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metric families, updated once per rerun."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rerun_duration = Histogram(
+            "eda_rerun_duration_seconds", "Dashboard rerun latency by analysis category.", LATENCY_BUCKETS
+        )
+        self.cache_requests = Counter(
+            "eda_cache_requests_total", "Cache lookups by cache (data, aggregate, figure) and result."
+        )
+        self.dataset_load = Histogram(
+            "eda_dataset_load_duration_seconds", "Time spent loading a dataset on a data-cache miss.", LOAD_BUCKETS
+        )
+        self.disk_cache = None
+
+    def register_disk_cache(self, cache):
+        """Report `cache`'s counters (a disk_cache.DiskCache) at scrape time."""
+        self.disk_cache = cache
+
+    def observe_rerun(self, timings):
+        if timings is None or timings.total_ms is None:
+            return
+        with self._lock:
+            category = timings.context.get("category") or "login"
+            self.rerun_duration.observe(timings.total_ms / 1000, category=category)
+            # The data cache only shows a miss through the dataset_load span nested in data_load
+            loaded = any(record["kind"] == "dataset_load" for record in timings.spans)
+            for record in timings.spans:
+                cache = CACHE_SPANS.get(record["kind"])
+                if cache == "data":
+                    self.cache_requests.inc(cache=cache, result="miss" if loaded else "hit")
+                elif cache and "cache" in record:
+                    self.cache_requests.inc(cache=cache, result=record["cache"])
+                if record["kind"] == "dataset_load":
+                    self.dataset_load.observe(record["ms"] / 1000)
+
+    def render(self):
+        with self._lock:
+            lines = self.rerun_duration.render() + self.cache_requests.render() + self.dataset_load.render()
+        lines += [
+            "# HELP eda_process_resident_memory_bytes Resident set size of the dashboard process.",
+            "# TYPE eda_process_resident_memory_bytes gauge",
+            f"eda_process_resident_memory_bytes {process_rss()}",
+        ]
+        if self.disk_cache is not None:
+            stats = self.disk_cache.stats()
+            lines += [
+                "# HELP eda_disk_cache_requests_total Disk cache lookups by result.",
+                "# TYPE eda_disk_cache_requests_total counter",
+                f'eda_disk_cache_requests_total{{result="hit"}} {stats["hits"]}',
+                f'eda_disk_cache_requests_total{{result="miss"}} {stats["misses"]}',
+                "# HELP eda_disk_cache_writes_total Entries written to the disk cache.",
+                "# TYPE eda_disk_cache_writes_total counter",
+                f"eda_disk_cache_writes_total {stats['writes']}",
+                "# HELP eda_disk_cache_evictions_total Least recently used entries evicted from the disk cache.",
+                "# TYPE eda_disk_cache_evictions_total counter",
+                f"eda_disk_cache_evictions_total {stats['evictions']}",
+                "# HELP eda_disk_cache_bytes Size of the disk cache directory as last measured.",
+                "# TYPE eda_disk_cache_bytes gauge",
+                f"eda_disk_cache_bytes {stats['bytes']}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the Streamlit log
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serve ``/metrics`` in a daemon thread; returns the server, or None (with a warning) if the port is taken."""
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as exc:
+        # Usually another worker on this host: its metrics are served, this process's are not
+        logging.getLogger(__name__).warning(
+            "Metrics endpoint not started, %s:%d is unavailable (%s); give each worker its own "
+            "port with EDA_WORKER_INDEX", host, port, exc,
+        )
+        return None
+    threading.Thread(target=server.serve_forever, name="eda-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,221 @@
+"""Static pre-rendered report of the dashboard for read-only viewers.
+
+Runs app.py headlessly once per value mode (Streamlit's AppTest, logged in,
+"All" analysis categories) and writes one self-contained HTML file with the
+same headers, KPI values and Plotly figures, plotly.js embedded.  Viewers can
+be served that file from any static host instead of each holding a live
+Streamlit session:
+
+    python report.py --output report/index.html                 # render once
+    python report.py --watch --every 3600 --serve 8080          # keep it fresh
+
+``--watch`` re-renders when the dataset changes (file size/mtime, or any
+partition of a partitioned dataset) and ``--every`` re-renders on a fixed
+schedule.  Each render runs in a fresh process so the app's in-process caches
+never serve a stale dataset.  Output is written atomically.
+"""
+
+import argparse
+import html
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from data_sources import DEFAULT_CSV, scan_partitions
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(ROOT, "app.py")
+
+VALUE_TYPES = ["Show as Count", "Show as Percentage"]
+DEFAULT_OUTPUT = os.path.join("report", "index.html")
+
+STYLE = """
+body { font-family: "Source Sans Pro", -apple-system, "Segoe UI", Roboto, sans-serif; margin: 0 auto;
+       max-width: 1400px; padding: 1rem 2rem; color: #31333f; }
+h1 { font-size: 2.2rem; } h2 { margin-top: 2.5rem; border-bottom: 1px solid #e6eaf1; } h3 { font-size: 1.2rem; }
+.meta { color: #808495; font-size: 0.9rem; }
+.modes button { font-size: 1rem; padding: 0.4rem 1rem; margin-right: 0.5rem; border: 1px solid #d5dae5;
+                background: #fff; border-radius: 0.5rem; cursor: pointer; }
+.modes button.active { background: #ff4b4b; border-color: #ff4b4b; color: #fff; }
+.mode { display: none; } .mode.active { display: block; }
+.row { display: flex; gap: 1.5rem; } .row > .column { flex: 1 1 0; min-width: 0; }
+.metric .label { font-size: 0.9rem; color: #555867; } .metric .value { font-size: 2rem; }
+.chart { width: 100%; min-height: 450px; }
+.caption { color: #808495; font-size: 0.85rem; }
+"""
+
+SCRIPT = """
+function showMode(index) {
+  document.querySelectorAll('.mode').forEach((el, i) => el.classList.toggle('active', i === index));
+  document.querySelectorAll('.modes button').forEach((el, i) => el.classList.toggle('active', i === index));
+  document.querySelectorAll('.mode.active .chart').forEach(el => Plotly.Plots.resize(el));
+}
+document.querySelectorAll('.chart').forEach(el => {
+  const spec = JSON.parse(el.dataset.spec);
+  Plotly.newPlot(el, spec.data, spec.layout, {responsive: true, displaylogo: false});
+});
+"""
+
+
+def capture(value_type, timeout):
+    """Run app.py for one value mode and return its main element tree."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = "report"
+    at.run()
+    if not at.exception and at.sidebar.radio[0].value != value_type:
+        at.sidebar.radio[0].set_value(value_type).run()
+    if at.exception:
+        raise RuntimeError(f"app.py raised: {at.exception[0].value}")
+    return at.main
+
+
+def render_node(node, out, charts):
+    """Append the HTML for one AppTest element (and its children) to `out`."""
+    kind = getattr(node, "type", None)
+    text = lambda: html.escape(str(node.value))
+    if kind == "title":
+        out.append(f"<h1>{text()}</h1>")
+    elif kind == "header":
+        out.append(f"<h2>{text()}</h2>")
+    elif kind == "subheader":
+        out.append(f"<h3>{text()}</h3>")
+    elif kind == "markdown":
+        out.append(f"<p>{text()}</p>")
+    elif kind == "caption":
+        out.append(f'<p class="caption">{text()}</p>')
+    elif kind == "metric":
+        out.append(
+            f'<div class="metric"><div class="label">{html.escape(node.label)}</div>'
+            f'<div class="value">{text()}</div></div>'
+        )
+    elif kind == "plotly_chart":
+        charts.append(node.proto.spec)
+        out.append(f'<div class="chart" data-spec="{html.escape(node.proto.spec)}"></div>')
+    elif kind == "dataframe":
+        out.append(node.value.to_html(border=0, classes="dataframe"))
+    elif kind == "horizontal":
+        out.append('<div class="row">')
+        for child in node.children.values():
+            render_node(child, out, charts)
+        out.append("</div>")
+    elif kind == "column":
+        out.append('<div class="column">')
+        for child in node.children.values():
+            render_node(child, out, charts)
+        out.append("</div>")
+    elif getattr(node, "children", None):
+        for child in node.children.values():
+            render_node(child, out, charts)
+
+
+def render_report(trees, data_source):
+    """Self-contained HTML for ``{value_type: main element tree}``."""
+    from plotly.offline import get_plotlyjs
+
+    buttons, modes, charts = [], [], []
+    for i, (value_type, tree) in enumerate(trees.items()):
+        active = " active" if i == 0 else ""
+        buttons.append(f'<button class="{active.strip()}" onclick="showMode({i})">{html.escape(value_type)}</button>')
+        body = []
+        render_node(tree, body, charts)
+        modes.append(f'<section class="mode{active}">{"".join(body)}</section>')
+
+    generated = datetime.now().astimezone().strftime("%Y-%m-%d %H:%M %Z")
+    return "\n".join([
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8">',
+        "<title>Vehicle Maintenance - Exploratory Data Analysis</title>",
+        f"<style>{STYLE}</style>",
+        f"<script>{get_plotlyjs()}</script>",
+        "</head><body>",
+        f'<p class="meta">Static report generated {generated} from {html.escape(data_source)} '
+        f"· {len(charts)} charts · for filtering and drill-down use the live dashboard</p>",
+        f'<div class="modes">{"".join(buttons)}</div>',
+        *modes,
+        f"<script>{SCRIPT}</script>",
+        "</body></html>",
+    ])
+
+
+def write_report(output, timeout):
+    """Capture every value mode and atomically replace `output` with the report."""
+    # Render with Plotly's own template: Streamlit's puts theme placeholders in
+    # the figures that only its frontend resolves.
+    import plotly.io as pio
+    import streamlit  # noqa: F401  (installs the streamlit template as the default)
+
+    pio.templates.default = "plotly"
+    os.environ.update(EDA_TIMING_LOG="", EDA_METRICS_PORT="0", EDA_EXPORT_PORT="0")
+    trees = {value_type: capture(value_type, timeout) for value_type in VALUE_TYPES}
+    page = render_report(trees, os.environ.get("EDA_DATA_SOURCE", DEFAULT_CSV))
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write(page)
+    os.replace(tmp_path, output)
+
+
+def data_signature(uri):
+    """Changes whenever the dataset behind `uri` does."""
+    path = uri[len("sqlite:///"):] if uri.startswith("sqlite:///") else uri
+    if os.path.isdir(path):
+        return json.dumps(sorted((p, sig) for p, (_, sig) in scan_partitions(path).items()))
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def serve(directory, port):
+    handler = partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=server.serve_forever, name="eda-report", daemon=True).start()
+    print(f"Serving {directory} on http://0.0.0.0:{port}/", flush=True)
+
+
+def refresh_loop(args):
+    """Re-render in a fresh process on schedule and/or when the data changes."""
+    uri = os.environ.get("EDA_DATA_SOURCE", DEFAULT_CSV)
+    command = [sys.executable, os.path.abspath(__file__), "--output", args.output, "--timeout", str(args.timeout)]
+    rendered_at, rendered_signature = None, None
+    while True:
+        signature = data_signature(uri) if args.watch else None
+        due = rendered_at is None or (args.every and time.time() - rendered_at >= args.every)
+        if due or signature != rendered_signature:
+            started = time.time()
+            done = subprocess.run(command)
+            # A failed render is retried at the next scheduled time or data change
+            rendered_at, rendered_signature = started, signature
+            status = "rendered" if done.returncode == 0 else "FAILED to render"
+            print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {status} {args.output} "
+                  f"in {time.time() - started:.1f} s", flush=True)
+        time.sleep(args.poll)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a static HTML report of the dashboard")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--every", type=float, default=0, help="re-render every N seconds")
+    parser.add_argument("--watch", action="store_true", help="re-render when the dataset changes")
+    parser.add_argument("--poll", type=float, default=30, help="seconds between data-change checks")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="also serve the report directory over HTTP")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per app run")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(os.path.dirname(os.path.abspath(args.output)), args.serve)
+    if args.every or args.watch:
+        refresh_loop(args)
+    else:
+        write_report(args.output, args.timeout)
+        if args.serve:
+            threading.Event().wait()
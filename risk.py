@@ -0,0 +1,88 @@
+"""Per-vehicle maintenance risk scores for the vehicle maintenance dashboard.
+
+A score from 0 (no risk signals) to 100 combines reported issues, accident
+history, tire, brake and battery condition, vehicle age and the derived mean
+time between failures.  Every factor is capped and scaled to 0-1 against
+fixed reference values rather than dataset statistics, so a row's score
+depends only on that row: a table (or each of its chunks or partitions) is
+scored in one vectorised pass, and rows appended later are scored without
+rescoring the rest.
+
+`DataSource.risk_scores()`, `risk_bands()` and `watchlist()` cache the scores
+with the dataset; SQLite snapshots compute the same score in SQL.
+"""
+
+import numpy as np
+import pandas as pd
+
+# (column, weight, cap): counts scaled to 0-1 as min(value, cap) / cap
+NUMERIC_FACTORS = [
+    ("Reported_Issues", 25, 5),
+    ("Accident_History", 15, 3),
+    ("Vehicle_Age", 10, 10),
+]
+# (column, weight, {value: severity 0-1}); other values add nothing
+CONDITION_FACTORS = [
+    ("Tire_Condition", 15, {"Worn Out": 1.0, "Good": 0.3}),
+    ("Brake_Condition", 15, {"Worn Out": 1.0, "Good": 0.3}),
+    ("Battery_Status", 10, {"Weak": 1.0, "Good": 0.3}),
+]
+# (column, weight, reference km): shorter MTBF is riskier, at or above the reference it adds nothing
+MTBF_FACTOR = ("Mean_Time_Between_Failures", 10, 80_000)
+
+RISK_COLUMNS = [c for c, _, _ in NUMERIC_FACTORS + CONDITION_FACTORS] + [MTBF_FACTOR[0]]
+
+BAND_WIDTH = 20
+BANDS = [f"{low}-{low + BAND_WIDTH}" for low in range(0, 100, BAND_WIDTH)]
+HIGH_RISK_SCORE = 60
+WATCHLIST_SIZE = 25
+
+
+def score_columns(columns, n_rows):
+    """Risk scores (float32) for ``{column: array}`` holding `n_rows` rows; missing columns add nothing."""
+    score = np.zeros(n_rows, dtype=np.float64)
+    for column, weight, cap in NUMERIC_FACTORS:
+        if column in columns:
+            values = np.asarray(columns[column], dtype=np.float64)
+            score += weight * np.nan_to_num(np.clip(values / cap, 0, 1))
+    for column, weight, severity in CONDITION_FACTORS:
+        if column in columns:
+            values = np.asarray(columns[column])
+            for value, level in severity.items():
+                score += (weight * level) * (values == value)
+    column, weight, reference = MTBF_FACTOR
+    if column in columns:
+        mtbf = np.asarray(columns[column], dtype=np.float64)
+        score += weight * np.nan_to_num(np.clip(1 - mtbf / reference, 0, 1))
+    return score.astype(np.float32)
+
+
+def risk_sql(expr, columns):
+    """The same score as one SQL expression; `expr` maps a column name to its SQL expression."""
+    terms = []
+    for column, weight, cap in NUMERIC_FACTORS:
+        if column in columns:
+            terms.append(f"{weight} * MIN(MAX(COALESCE({expr(column)} * 1.0 / {cap}, 0), 0), 1)")
+    for column, weight, severity in CONDITION_FACTORS:
+        if column in columns:
+            cases = " ".join(f"WHEN '{value}' THEN {weight * level:g}" for value, level in severity.items())
+            terms.append(f"(CASE {expr(column)} {cases} ELSE 0 END)")
+    column, weight, reference = MTBF_FACTOR
+    if column in columns:
+        terms.append(f"{weight} * MIN(MAX(COALESCE(1 - {expr(column)} / {reference}.0, 0), 0), 1)")
+    return " + ".join(terms) or "0"
+
+
+def top_n(scores, n):
+    """Positions of the `n` highest scores, highest first, found with a partial sort."""
+    n = min(n, len(scores))
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, n - 1)[:n]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def band_counts(scores):
+    """Frame of ``['Risk_Band', 'Count']`` with every band, lowest first."""
+    bands = np.minimum(np.asarray(scores) // BAND_WIDTH, len(BANDS) - 1).astype(np.int64)
+    return pd.DataFrame({"Risk_Band": BANDS, "Count": np.bincount(bands, minlength=len(BANDS))})
@@ -0,0 +1,151 @@
+"""Synthetic vehicle maintenance data for benchmarks and load tests.
+
+Generates rows with the columns, value ranges and category sets of
+``vehicle_maintenance_data.csv``.  Categories are drawn with skewed rather
+than uniform frequencies, age drives odometer and component wear, and
+``Need_Maintenance`` follows the reported issues and component conditions, so
+group-bys and filters see realistic cardinalities and selectivities.
+
+Rows are produced in fixed-size chunks from a seeded generator, so any size
+from 10k to tens of millions of rows can be written with bounded memory:
+
+    python synthetic_data.py 1000000 fleet_1m.csv
+
+``--missing`` leaves a fraction of the category cells blank, as real exports
+do; `data_sources.py check-engines` runs on such a file to check that every
+engine treats them as missing.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = [
+    "Vehicle_Model", "Mileage", "Maintenance_History", "Reported_Issues", "Vehicle_Age",
+    "Fuel_Type", "Transmission_Type", "Engine_Size", "Odometer_Reading", "Last_Service_Date",
+    "Warranty_Expiry_Date", "Owner_Type", "Insurance_Premium", "Service_History",
+    "Accident_History", "Fuel_Efficiency", "Tire_Condition", "Brake_Condition",
+    "Battery_Status", "Need_Maintenance",
+]
+
+# Category values and their relative frequencies
+CATEGORIES = {
+    "Vehicle_Model": {"Car": 0.30, "SUV": 0.22, "Truck": 0.18, "Van": 0.14, "Bus": 0.09, "Motorcycle": 0.07},
+    "Maintenance_History": {"Good": 0.45, "Average": 0.35, "Poor": 0.20},
+    "Fuel_Type": {"Petrol": 0.50, "Diesel": 0.38, "Electric": 0.12},
+    "Transmission_Type": {"Automatic": 0.62, "Manual": 0.38},
+    "Owner_Type": {"First": 0.55, "Second": 0.30, "Third": 0.15},
+}
+ENGINE_SIZES = {800: 0.08, 1000: 0.17, 1500: 0.32, 2000: 0.28, 2500: 0.15}
+CONDITIONS = {
+    "Tire_Condition": ["New", "Good", "Worn Out"],
+    "Brake_Condition": ["New", "Good", "Worn Out"],
+    "Battery_Status": ["New", "Good", "Weak"],
+}
+
+SERVICE_START = np.datetime64("2023-01-01")
+WARRANTY_START = np.datetime64("2024-06-01")
+CHUNK_ROWS = 1_000_000
+
+
+def _choice(rng, frequencies, n):
+    values = list(frequencies)
+    weights = np.array(list(frequencies.values()), dtype=float)
+    return np.array(values)[rng.choice(len(values), size=n, p=weights / weights.sum())]
+
+
+def _condition(rng, values, age, n):
+    """Worn/weak components become likelier with vehicle age."""
+    worn = 0.10 + 0.035 * age
+    new = np.clip(0.45 - 0.04 * age, 0.05, None)
+    draw = rng.random(n)
+    index = np.where(draw < new, 0, np.where(draw < 1 - worn, 1, 2))
+    return np.array(values)[index]
+
+
+def generate_chunk(n, rng):
+    """One DataFrame of `n` synthetic rows drawn from `rng`."""
+    age = rng.integers(1, 11, n)
+    issues = np.minimum(rng.poisson(0.6 + 0.25 * age), 5)
+    accidents = np.minimum(rng.geometric(0.6, n) - 1, 3)
+    conditions = {column: _condition(rng, values, age, n) for column, values in CONDITIONS.items()}
+
+    risk = (
+        -2.0 + 0.55 * issues + 0.35 * accidents + 0.08 * age
+        + 1.2 * (conditions["Tire_Condition"] == "Worn Out")
+        + 1.2 * (conditions["Brake_Condition"] == "Worn Out")
+        + 1.0 * (conditions["Battery_Status"] == "Weak")
+    )
+    need = (rng.random(n) < 1 / (1 + np.exp(-risk))).astype(np.int8)
+
+    df = pd.DataFrame({
+        "Vehicle_Model": _choice(rng, CATEGORIES["Vehicle_Model"], n),
+        "Mileage": rng.integers(30_000, 80_001, n),
+        "Maintenance_History": _choice(rng, CATEGORIES["Maintenance_History"], n),
+        "Reported_Issues": issues,
+        "Vehicle_Age": age,
+        "Fuel_Type": _choice(rng, CATEGORIES["Fuel_Type"], n),
+        "Transmission_Type": _choice(rng, CATEGORIES["Transmission_Type"], n),
+        "Engine_Size": _choice(rng, ENGINE_SIZES, n),
+        "Odometer_Reading": np.clip(age * 9_000 + rng.normal(0, 8_000, n), 1_000, 100_000).astype(np.int64),
+        "Last_Service_Date": SERVICE_START + rng.integers(0, 600, n).astype("timedelta64[D]"),
+        "Warranty_Expiry_Date": WARRANTY_START + rng.integers(0, 900, n).astype("timedelta64[D]"),
+        "Owner_Type": _choice(rng, CATEGORIES["Owner_Type"], n),
+        "Insurance_Premium": np.clip(rng.lognormal(9.6, 0.35, n), 5_000, 30_000).astype(np.int64),
+        "Service_History": rng.integers(1, 11, n),
+        "Accident_History": accidents,
+        "Fuel_Efficiency": rng.uniform(10, 20, n).round(6),
+        **conditions,
+        "Need_Maintenance": need,
+    })
+    return df[COLUMNS]
+
+
+def generate(n_rows, seed=0, chunk_rows=CHUNK_ROWS, missing=0.0):
+    """Yield DataFrames totalling `n_rows` rows; the same seed always gives the same data.
+
+    A `missing` fraction of the category cells is left empty.
+    """
+    rng = np.random.default_rng(seed)
+    remaining = n_rows
+    while remaining > 0:
+        n = min(chunk_rows, remaining)
+        chunk = generate_chunk(n, rng)
+        if missing:
+            for column in [*CATEGORIES, *CONDITIONS]:
+                chunk.loc[rng.random(n) < missing, column] = None
+        yield chunk
+        remaining -= n
+
+
+def write_csv(path, n_rows, seed=0, chunk_rows=CHUNK_ROWS, missing=0.0):
+    """Stream `n_rows` synthetic rows to a CSV at `path` (written atomically)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+        for i, chunk in enumerate(generate(n_rows, seed, chunk_rows, missing)):
+            chunk.to_csv(out, header=i == 0, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def parse_rows(text):
+    """Row counts like ``10k``, ``2.5M`` or ``50000000``."""
+    text = text.strip().lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic vehicle maintenance data as CSV")
+    parser.add_argument("rows", type=parse_rows, help="number of rows, e.g. 10k, 1M, 50M")
+    parser.add_argument("path", nargs="?", default="vehicle_maintenance_data.csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--missing", type=float, default=0.0, help="fraction of category cells left blank")
+    args = parser.parse_args()
+
+    write_csv(args.path, args.rows, args.seed, missing=args.missing)
+    print(f"Wrote {args.rows:,} rows to {args.path}")